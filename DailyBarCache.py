@@ -0,0 +1,120 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import numpy as np
+from datetime import *
+
+from clr import AddReference
+
+AddReference("System")
+AddReference("QuantConnect.Common")
+AddReference("QuantConnect.Algorithm")
+
+from QuantConnect import Resolution
+
+##-------------------Global variables---------------------------------------------------------##
+
+FullHistory = timedelta(days=43000)
+
+
+##-------------------Class to hold one symbol's daily bars in compact arrays-------------------##
+
+class DailyBars:
+
+    def __init__(self, symbol, history, today):
+        self.Symbol = symbol
+        self.LoadedOn = today
+        self.CheckedOn = today
+        self.Time = np.array([], dtype='datetime64[ns]')
+        self.Open = np.array([])
+        self.High = np.array([])
+        self.Low = np.array([])
+        self.Close = np.array([])
+
+        self.Append(history)
+
+    def Append(self, history):
+        if history.empty:
+            return
+
+        # Multi-symbol requests may hold no rows for this symbol
+        try:
+            history = history.loc[self.Symbol]
+        except KeyError:
+            return
+
+        times = history.index.values
+
+        # Top-up requests can overlap the last stored bar
+        if len(self.Time):
+            history = history[times > self.Time[-1]]
+            times = history.index.values
+
+        self.Time = np.concatenate((self.Time, times))
+        self.Open = np.concatenate((self.Open, history['open'].to_numpy(dtype=float)))
+        self.High = np.concatenate((self.High, history['high'].to_numpy(dtype=float)))
+        self.Low = np.concatenate((self.Low, history['low'].to_numpy(dtype=float)))
+        self.Close = np.concatenate((self.Close, history['close'].to_numpy(dtype=float)))
+
+    ##-----------------Returns the slice of bars at or after the start time------------------------##
+
+    def Since(self, start):
+        return slice(np.searchsorted(self.Time, np.datetime64(start), side='left'), len(self.Time))
+
+
+##-------------------Process-wide, symbol keyed cache of daily bars----------------------------##
+
+class DailyBarCache:
+    '''
+    Single loader for the daily OHLC history shared by the alpha and risk models. The full history is
+    requested once per symbol, topped up with the missing bars at most once per day, and reloaded after
+    Invalidate is called on the annual recalculation date so adjusted prices stay consistent. Preload
+    serves several symbols with one History request for the full loads and one for the top-ups.
+    '''
+
+    Bars = {}
+    ValidFrom = None
+
+    def __init__(self):
+        pass
+
+    def Get(algorithm, symbol):
+        DailyBarCache.Preload(algorithm, [symbol])
+
+        return DailyBarCache.Bars[symbol]
+
+    ##-----------------Loads or tops up several symbols with one request of each kind-------------##
+
+    def Preload(algorithm, symbols):
+        today = algorithm.Time.date()
+        missing = []
+        stale = []
+
+        for symbol in symbols:
+            bars = DailyBarCache.Bars.get(symbol)
+
+            if bars is None or (DailyBarCache.ValidFrom is not None and bars.LoadedOn < DailyBarCache.ValidFrom):
+                missing.append(symbol)
+
+            elif bars.CheckedOn != today:
+                (stale if len(bars.Time) else missing).append(symbol)
+
+        if missing:
+            history = algorithm.History(missing, FullHistory, Resolution.Daily)
+            for symbol in missing:
+                DailyBarCache.Bars[symbol] = DailyBars(symbol, history, today)
+
+        if stale:
+            start = min(DailyBarCache.Bars[symbol].Time[-1] for symbol in stale).astype('datetime64[us]').item()
+            history = algorithm.History(stale, start, algorithm.Time, Resolution.Daily)
+            for symbol in stale:
+                DailyBarCache.Bars[symbol].Append(history)
+                DailyBarCache.Bars[symbol].CheckedOn = today
+
+    ##-----------------Forces a reload of every symbol on its next request-------------------------##
+
+    def Invalidate(algorithm):
+        DailyBarCache.ValidFrom = algorithm.Time.date()
+
+    def Reset():
+        DailyBarCache.Bars = {}
+        DailyBarCache.ValidFrom = None
@@ -0,0 +1,55 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+from Global import Global
+
+
+##-------------------Class to track the running peak and drawdown of the equity curve----------##
+
+class EquityTracker:
+    '''
+    Reads the portfolio value once per update, maintains the running peak, gains and drawdown and publishes
+    them with the derived margin multiplier to Global.
+
+        SampleInterval: Optional minimum time between updates. None updates on every slice
+    '''
+
+    def __init__(self, InitialValue, SampleInterval=None):
+        self.InitialValue = float(InitialValue)
+        self.SampleInterval = SampleInterval
+        self.LastSample = None
+
+        self.Peak = float(0)
+        self.Gains = float(0)
+        self.InitialDrawdown = float(0)
+        self.Drawdown = float(0)
+        self.MarginMultiplier = float(1.33)
+
+    def Update(self, time, value):
+        if self.SampleInterval is not None and self.LastSample is not None and time - self.LastSample < self.SampleInterval:
+            return False
+
+        self.LastSample = time
+        value = float(value)
+
+        if value > self.Peak:
+            self.Peak = value
+            gains = round((value / self.InitialValue) - 1, 3)
+
+            if gains > self.Gains:
+                self.InitialDrawdown = min(0, round(self.InitialDrawdown + gains - self.Gains, 3))
+                self.Gains = gains
+
+        else:
+            self.Drawdown = round((value / self.Peak) - 1, 3) + self.InitialDrawdown
+
+        self.MarginMultiplier = max(1.33, 1.33 * (1 + self.Drawdown))
+        self.Publish()
+
+        return True
+
+    def Publish(self):
+        Global.PortfolioHigh = self.Peak
+        Global.PortfolioGains = self.Gains
+        Global.InitialDrawdown = self.InitialDrawdown
+        Global.PortfolioDrawdown = self.Drawdown
+        Global.MarginMultiplier = self.MarginMultiplier
@@ -0,0 +1,51 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+from datetime import *
+
+from clr import AddReference
+
+AddReference("System")
+AddReference("QuantConnect.Common")
+AddReference("QuantConnect.Algorithm")
+
+from QuantConnect import *
+
+from TradingCalendar import TradingCalendar
+
+##-------------------Global variables---------------------------------------------------------##
+
+MaximumMargin = int(10)
+
+
+##-------------------Class to request an exact number of bars in a single History call---------##
+
+class HistoryService:
+    '''
+    Computes the calendar span holding the desired number of bars from the US equity exchange calendar,
+    over-fetches by a bounded margin and trims to size, so every warm-up costs exactly one History request.
+
+    The equity calendar is used for every symbol because the custom CBOE data reports an always-open
+    exchange, which is why bar-count requests for it come back short around weekends and holidays.
+    '''
+
+    def __init__(self):
+        pass
+
+    ##-----------------Returns the last Bars rows of history for the symbol-----------------------##
+
+    def Bars(algorithm, symbol, Bars, resolution=Resolution.Daily):
+        if resolution != Resolution.Daily:
+            return algorithm.History(symbol, Bars, resolution)
+
+        start = HistoryService.SpanStart(algorithm.Time.date(), Bars)
+        history = algorithm.History(symbol, datetime.combine(start, time.min), algorithm.Time, resolution)
+
+        if len(history) < Bars:
+            algorithm.Log(f'History for {symbol} returned {len(history)} of {Bars} requested bars')
+
+        return history.iloc[-Bars:]
+
+    ##-----------------Walks back over trading days to find the first date of the span-----------##
+
+    def SpanStart(end, Bars):
+        return TradingCalendar.Equity().TradingDayBefore(end, Bars + min(Bars // 4 + 2, MaximumMargin))
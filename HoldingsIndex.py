@@ -0,0 +1,55 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+from clr import AddReference
+
+AddReference("System")
+AddReference("QuantConnect.Common")
+
+from QuantConnect.Orders import *
+
+
+##-------------------Class to hold the set of invested symbols---------------------------------##
+
+class HoldingsIndex:
+    '''
+    Set of invested symbols maintained from fill events, so risk models only visit open positions
+    instead of scanning every security and holding on each call.
+
+    The set is built from the portfolio on first use, which also covers holdings restored on a live restart.
+    '''
+
+    Invested = set()
+    Built = False
+
+    def __init__(self):
+        pass
+
+    def Reset():
+        HoldingsIndex.Invested = set()
+        HoldingsIndex.Built = False
+
+    def Rebuild(algorithm):
+        HoldingsIndex.Invested = {x.Key for x in algorithm.Portfolio if x.Value.Invested}
+        HoldingsIndex.Built = True
+
+    def Current(algorithm):
+        if not HoldingsIndex.Built:
+            HoldingsIndex.Rebuild(algorithm)
+
+        return HoldingsIndex.Invested
+
+    ##-----------------Updates the set with the holdings of a filled symbol-----------------------##
+
+    def OnOrderEvent(algorithm, orderEvent):
+        if not (orderEvent.Status == OrderStatus.Filled or orderEvent.Status == OrderStatus.PartiallyFilled):
+            return
+
+        if not HoldingsIndex.Built:
+            HoldingsIndex.Rebuild(algorithm)
+            return
+
+        symbol = orderEvent.Symbol
+        if algorithm.Portfolio[symbol].Invested:
+            HoldingsIndex.Invested.add(symbol)
+        else:
+            HoldingsIndex.Invested.discard(symbol)
@@ -8,8 +8,11 @@ AddReference("QuantConnect.Algorithm.Framework")
 from System import *
 from QuantConnect import *
 from QuantConnect.Orders import *
+from QuantConnect.Securities import *
 from QuantConnect.Algorithm import *
 from Global import Global
+from Profiling import Profiler
+from LogSink import LogSink
 
 
 class ImmediateExecutionModel(ExecutionModel):
@@ -17,39 +20,218 @@ class ImmediateExecutionModel(ExecutionModel):
     Solution 1: Store each order ticket in a dictionary and adjust the quantity of invalid orders until fulfilled
     '''
 
-    def __init__(self):
+    def __init__(self, PriceThreshold=0.005, BisectSizing=True, Asynchronous=False):
+        '''
+            PriceThreshold: Relative price move of any pending target that invalidates the cached margin impact ordering
+            BisectSizing: When True orders are sized to the largest quantity the brokerage model's buying power accepts before
+                          they are submitted, instead of reducing rejected orders by 3% on each call
+            Asynchronous: When True all orders of a time step are submitted without waiting on the brokerage. Their tickets are kept
+                          in a pending table and fills and rejections are reconciled from the order events, or from the
+                          ticket status on the next Execute
+
+            Counters records how often Execute runs and how often the expensive OrderByMarginImpact and Shortable calls are made
+        '''
         self.targetsCollection = PortfolioTargetCollection()
         self.tickets = {}
         self.today = None
 
+        # Per time step caches
+        self.PriceThreshold = PriceThreshold
+        self.Ordering = None
+        self.OrderingPrices = {}
+        self.ShortableCache = {}
+        self.ShortableTime = None
+        self.Counters = {'Execute': 0, 'OrderByMarginImpact': 0, 'Shortable': 0, 'BuyingPower': 0}
+        self.BisectSizing = BisectSizing
+
+        # Asynchronous submission
+        self.Asynchronous = Asynchronous
+        self.Rejected = {}
+
+    @Profiler.Timed('ImmediateExecution.Execute')
     def Execute(self, algorithm, targets):
+        self.Counters['Execute'] += 1
+
+        # New targets change the margin impact ordering
+        if targets:
+            self.Ordering = None
 
         # For performance we check count value, OrderByMarginImpact and ClearFulfilled are expensive to call
         self.targetsCollection.AddRange(targets)
         if self.targetsCollection.Count > 0:  # and Global.MarketIsOpen:
-            for target in self.targetsCollection.OrderByMarginImpact(algorithm):
+            submitted = []
+
+            for target in self.OrderedTargets(algorithm):
                 symbol = target.Symbol
 
+                # Asynchronous tickets stay pending until their status shows they are closed
+                if self.Asynchronous:
+                    self.Reconcile(symbol, self.tickets.get(symbol))
+                    if symbol in self.tickets:
+                        continue
+                    rejected = self.Rejected.pop(symbol, False)
+
+                else:
+                    ticket = self.tickets.pop(symbol, None)
+                    rejected = ticket is not None and ticket.Status == OrderStatus.Invalid
+
                 # If the last ticket for this symbol was Invalid
                 # We will redefine the target and update it in the collection
-                ticket = self.tickets.pop(symbol, None)
-                if ticket and ticket.Status == OrderStatus.Invalid:
+                if rejected and self.BisectSizing:
+                    remaining = OrderSizing.GetUnorderedQuantity(algorithm, target)
+                    if remaining != 0:
+                        target = self.ResizeTarget(algorithm, target, remaining)
+
+                elif rejected:
                     target = PortfolioTarget(symbol, target.Quantity * 0.97)
                     Global.ShortUVXY = Global.ShortUVXY * 0.97
                     self.targetsCollection.Add(target)
-                    algorithm.Log(
-                        f'Initial margin requirements require a reduction in position size. Reducing current order for {symbol} by 3%.  Previous Short%: {Global.ShortUVXY / 0.97} - Current Short%: {Global.ShortUVXY}')
+                    self.Ordering = None
+                    LogSink.Log(algorithm, 'Margin',
+                        'Initial margin requirements require a reduction in position size. Reducing current order for {0} by 3%.  Previous Short%: {1} - Current Short%: {2}',
+                        symbol, Global.ShortUVXY / 0.97, Global.ShortUVXY)
 
                 # Calculate remaining quantity to be ordered. If the order is being dynamically adjusted do to broker margin constraints, remove the target as soon as the majority of the order fills.
                 quantity = OrderSizing.GetUnorderedQuantity(algorithm, target)
-                if quantity > 0 or algorithm.Shortable(target.Symbol, quantity):
-                    self.tickets[symbol] = algorithm.MarketOrder(symbol, quantity)
-                    if algorithm.LiveMode:
-                        algorithm.Log(f'Order submitted for {target.Symbol} at {algorithm.Time.time()}')
+                if quantity == 0:
+                    continue
+
+                # Solve for the largest order the margin model accepts so the order is only submitted once
+                if self.BisectSizing:
+                    sized = self.MaximumQuantity(algorithm, symbol, quantity)
+                    if sized != quantity:
+                        target = self.ResizeTarget(algorithm, target, quantity, sized)
+                        quantity = sized
+
+                    if quantity == 0:
+                        continue
 
-                if not algorithm.Shortable(target.Symbol, quantity) and algorithm.Time.day != self.today:
-                    algorithm.Log(f'Not enough shares of {symbol} available to short. Order not placed.')
+                shortable = self.IsShortable(algorithm, symbol, quantity)
+                if quantity > 0 or shortable:
+                    self.tickets[symbol] = algorithm.MarketOrder(symbol, quantity, self.Asynchronous)
+                    submitted.append(symbol)
+
+                if not shortable and algorithm.Time.day != self.today:
+                    LogSink.Log(algorithm, 'Orders', 'Not enough shares of {0} available to short. Order not placed.', symbol)
                     self.today = algorithm.Time.day
 
+            if submitted and algorithm.LiveMode:
+                LogSink.Log(algorithm, 'Orders', lambda: f'Orders submitted for {[str(x) for x in submitted]} at {algorithm.Time.time()}')
+
             self.targetsCollection.ClearFulfilled(algorithm)
 
+    def OnOrderEvent(self, algorithm, orderEvent):
+        # Fills change holdings and margin usage, so the ordering must be rebuilt
+        if orderEvent.Status == OrderStatus.Filled or orderEvent.Status == OrderStatus.PartiallyFilled:
+            self.Ordering = None
+
+        if not self.Asynchronous:
+            return
+
+        ticket = self.tickets.get(orderEvent.Symbol)
+        if ticket is not None and ticket.OrderId == orderEvent.OrderId:
+            self.Reconcile(orderEvent.Symbol, ticket, orderEvent.Status)
+
+    def Reconcile(self, symbol, ticket, status=None):
+        '''
+        Drops a closed ticket from the pending table. Rejected symbols are resized on the next Execute
+        '''
+        if ticket is None:
+            return
+
+        status = ticket.Status if status is None else status
+
+        if status == OrderStatus.Invalid:
+            self.tickets.pop(symbol)
+            self.Rejected[symbol] = True
+
+        elif status == OrderStatus.Filled or status == OrderStatus.Canceled:
+            self.tickets.pop(symbol)
+
+    ##-----------------Margin impact ordering, reused until targets, fills or prices change-------------------------##
+
+    def OrderedTargets(self, algorithm):
+        if self.Ordering is None or self.PricesMoved(algorithm):
+            self.Counters['OrderByMarginImpact'] += 1
+            ordered = list(self.targetsCollection.OrderByMarginImpact(algorithm))
+            self.Ordering = [target.Symbol for target in ordered]
+            self.OrderingPrices = {symbol: float(algorithm.Securities[symbol].Price) for symbol in self.Ordering}
+            return ordered
+
+        return [self.targetsCollection[symbol] for symbol in self.Ordering if self.targetsCollection.ContainsKey(symbol)]
+
+    def PricesMoved(self, algorithm):
+        for symbol, price in self.OrderingPrices.items():
+            if price == 0 or abs(float(algorithm.Securities[symbol].Price) / price - 1) > self.PriceThreshold:
+                return True
+
+        return False
+
+    ##-----------------Shortability, cached for the current time step-----------------------------------------------##
+
+    def IsShortable(self, algorithm, symbol, quantity):
+        if self.ShortableTime != algorithm.UtcTime:
+            self.ShortableCache = {}
+            self.ShortableTime = algorithm.UtcTime
+
+        key = (symbol, quantity)
+        if key not in self.ShortableCache:
+            self.Counters['Shortable'] += 1
+            self.ShortableCache[key] = algorithm.Shortable(symbol, quantity)
+
+        return self.ShortableCache[key]
+
+    ##-----------------Margin constrained sizing--------------------------------------------------------------------##
+
+    def MaximumQuantity(self, algorithm, symbol, quantity):
+        '''
+        Bisects over whole lots for the largest order, with the sign of quantity and no larger than it, that has sufficient buying power
+        '''
+        security = algorithm.Securities[symbol]
+
+        if self.HasBuyingPower(algorithm, security, quantity):
+            return quantity
+
+        lot = float(security.SymbolProperties.LotSize)
+        sign = 1 if quantity > 0 else -1
+        low, high = 0, int(abs(quantity) // lot)
+
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.HasBuyingPower(algorithm, security, sign * middle * lot):
+                low = middle
+            else:
+                high = middle
+
+        return sign * low * lot
+
+    def HasBuyingPower(self, algorithm, security, quantity):
+        self.Counters['BuyingPower'] += 1
+        order = MarketOrder(security.Symbol, quantity, algorithm.UtcTime)
+        parameters = HasSufficientBuyingPowerForOrderParameters(algorithm.Portfolio, security, order)
+
+        return security.BuyingPowerModel.HasSufficientBuyingPowerForOrder(parameters).IsSufficient
+
+    def ResizeTarget(self, algorithm, target, quantity, sized=None):
+        '''
+        Shrinks the target so that its unordered quantity becomes the sized quantity. Only this order is resized, the shared
+        Global.ShortUVXY weight is left as it is so later targets are sized from the model's weight again.
+        When the brokerage rejected an order the margin model accepted, falls back to a 3% reduction in whole lots.
+        '''
+        symbol = target.Symbol
+
+        if sized is None:
+            sized = self.MaximumQuantity(algorithm, symbol, quantity)
+            if sized == quantity:
+                lot = float(algorithm.Securities[symbol].SymbolProperties.LotSize)
+                sized = (1 if quantity > 0 else -1) * (abs(quantity) * 0.97 // lot) * lot
+
+        resized = PortfolioTarget(symbol, target.Quantity - (quantity - sized))
+        self.targetsCollection.Add(resized)
+        self.Ordering = None
+
+        LogSink.Log(algorithm, 'Margin',
+            'Initial margin requirements require a reduction in position size. Reducing current order for {0} from {1} to {2}.',
+            symbol, quantity, sized)
+
+        return resized
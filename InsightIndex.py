@@ -0,0 +1,127 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import heapq
+
+
+##-------------------Reversed heap order so the newest insight sits on top-------------------##
+
+class Newest:
+    '''
+    Orders insights by generation time, newest first, with ties going to the last added
+    '''
+    __slots__ = ('Time', 'Sequence')
+
+    def __init__(self, time, sequence):
+        self.Time = time
+        self.Sequence = sequence
+
+    def __lt__(self, other):
+        return (self.Time, self.Sequence) > (other.Time, other.Sequence)
+
+
+##-------------------Class to index insights by symbol and source model-----------------------##
+
+class InsightIndex:
+    '''
+    Keeps a heap of the insights of each symbol and of each (symbol, source model) pair with the last generated
+    insight on top, plus a min-heap of close times, so expiring insights and finding the latest active insight
+    per symbol are incremental instead of a group-and-sort over the whole collection.
+
+    Removed insights stay in the heaps and are dropped lazily once they reach the top, which keeps every top valid.
+    '''
+
+    def __init__(self):
+        self.Symbols = {}
+        self.Sources = {}
+        self.Counts = {}
+        self.Members = {}
+        self.Expiries = []
+        self.Sequence = 0
+
+    ##-----------------Adds insights with the newest of each key on top--------------------------##
+
+    def Add(self, insight):
+        if str(insight.Id) in self.Members:
+            return
+
+        sequence = self.Sequence
+        rank = Newest(insight.GeneratedTimeUtc, sequence)
+        self.Sequence += 1
+        self.Members[str(insight.Id)] = sequence
+
+        for heaps, key, count in self.Heaps(insight):
+            heapq.heappush(heaps.setdefault(key, []), (rank, insight))
+            self.Counts[count] = self.Counts.get(count, 0) + 1
+
+        heapq.heappush(self.Expiries, (insight.CloseTimeUtc, sequence, insight))
+
+    def AddRange(self, insights):
+        for insight in insights:
+            self.Add(insight)
+
+    def Remove(self, insight):
+        if self.Members.pop(str(insight.Id), None) is None:
+            return False
+
+        for heaps, key, count in self.Heaps(insight):
+            self.Counts[count] -= 1
+
+            if self.Counts[count] == 0:
+                self.Counts.pop(count)
+                heaps.pop(key)
+            else:
+                heap = heaps[key]
+                while not self.Indexed(heap[0][1], heap[0][0].Sequence):
+                    heapq.heappop(heap)
+
+        if not self.Sources[insight.SourceModel]:
+            self.Sources.pop(insight.SourceModel)
+
+        return True
+
+    def Heaps(self, insight):
+        '''
+        The heaps an insight belongs to, with the key of its live count
+        '''
+        symbols = self.Sources.setdefault(insight.SourceModel, {})
+
+        return [(self.Symbols, insight.Symbol, insight.Symbol),
+                (symbols, insight.Symbol, (insight.Symbol, insight.SourceModel))]
+
+    def Indexed(self, insight, sequence):
+        return self.Members.get(str(insight.Id)) == sequence
+
+    ##-----------------Removes and returns the insights that expired before utcTime--------------##
+
+    def RemoveExpired(self, utcTime):
+        expired = []
+
+        while self.Expiries and self.Expiries[0][0] < utcTime:
+            closeTime, sequence, insight = heapq.heappop(self.Expiries)
+            if self.Indexed(insight, sequence) and self.Remove(insight):
+                expired.append(insight)
+
+        return expired
+
+    def NextExpiryTime(self):
+        while self.Expiries and not self.Indexed(self.Expiries[0][2], self.Expiries[0][1]):
+            heapq.heappop(self.Expiries)
+
+        return self.Expiries[0][0] if self.Expiries else None
+
+    ##-----------------Queries over the insights that have not been removed---------------------##
+
+    def HasActiveInsights(self, symbol):
+        return symbol in self.Symbols
+
+    def LatestActive(self, SourceModel=None):
+        '''
+        Returns the last generated insight of each symbol, optionally restricted to one source model.
+        Call RemoveExpired first so that every indexed insight is active.
+        '''
+        heaps = self.Symbols if SourceModel is None else self.Sources.get(SourceModel, {})
+
+        return [heap[0][1] for heap in heaps.values()]
+
+    def Count(self):
+        return len(self.Members)
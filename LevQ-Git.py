@@ -18,6 +18,13 @@ from QuantConnect.Algorithm.Framework.Alphas import *
 
 from Global import VixHandler
 from Global import Global
+from HistoryService import HistoryService
+from VectorIndicators import VectorIndicators
+from DailyBarCache import DailyBarCache
+from StatisticsStore import StatisticsStore
+from RecalcScheduler import RecalcScheduler
+from TradingCalendar import TradingCalendar
+from Profiling import Profiler
 
 ##-------------------Global variables------------------------------------------##
 
@@ -51,16 +58,13 @@ class TQQQ(AlphaModel):
         # Lists
         self.TimeBounds = [time(9,31), time(15,55), time(9,31), time(9,32), time(15,59), time(16,00)]
 
-        # Booleans
-        self.Reset = True
-        self.OnStartUp = True
-
     '''
     Section 1-A:  TQQQ insight generation
     '''
 
 ##-----------------Update-------------------------------------------------------##
 
+    @Profiler.Timed('TQQQ.Update')
     def Update(self, algorithm, data):
 
         SQQQ = SymbolCache.GetSymbol("SQQQ")
@@ -68,12 +72,6 @@ class TQQQ(AlphaModel):
         insights = []
 
 
-##-----------------Update various statistics annually----------------------------##
-
-        self.AnnualRecalc(algorithm)
-
-
-
 ##-----------------Generate insights---------------------------------------------------##
 
         for symbol, symbolData in self.TQQQ.items():
@@ -141,10 +139,10 @@ class TQQQ(AlphaModel):
                 # Create indicators
                 symbolData = SymbolData(added, self.Name, self.RSIDeviationRange)
                 symbolData.InitializeIndicators(algorithm, self.FastPeriod, self.SlowPeriod, self.resolution)
-                symbolData.StatBounds(algorithm, self.FastPeriod, self.SlowPeriod, self.StatPeriod, self.resolution)
-                symbolData.GetGapSignal(algorithm)
+                symbolData.LoadStatistics(algorithm, self.FastPeriod, self.SlowPeriod, self.StatPeriod, self.resolution)
 
                 self.TQQQ[added.Symbol] = symbolData
+                RecalcScheduler.Register(self.Name, self.AnnualRecalc)
 
             else:
                 continue
@@ -158,19 +156,9 @@ class TQQQ(AlphaModel):
 
     def AnnualRecalc(self, algorithm):
 
-        # Once per year update the VIX statistics with the previuos 4000 days data
-        if algorithm.Time.date() == MiscMethods.GetNextWeekday(date(algorithm.Time.year, 1, 3)) and self.TimeBounds[2] <= algorithm.Time.time() <= self.TimeBounds[3]:
-            self.Reset = True
-
-        if (self.Reset and algorithm.Time.date() == MiscMethods.GetNextWeekday(date(algorithm.Time.year, 1, 3)) + OneDay) or self.OnStartUp:
-
-            if not self.OnStartUp:
-                for symbol, symbolData in self.TQQQ.items():
-                    symbolData.StatBounds(algorithm, self.FastPeriod, self.SlowPeriod, self.StatPeriod, self.resolution)
-                    symbolData.GetGapSignal(algorithm)
-
-            self.Reset = False
-            self.OnStartUp = False
+        # Called by RecalcScheduler on the first trading day of the year
+        for symbol, symbolData in self.TQQQ.items():
+            symbolData.RecalcStatistics(algorithm, self.FastPeriod, self.SlowPeriod, self.StatPeriod, self.resolution)
 
 
 '''
@@ -199,28 +187,19 @@ class SQQQ(AlphaModel):
         # Lists
         self.TimeBounds = [time(9,31), time(15,55), time(9,31), time(9,32), time(15,59), time(16,00)]
 
-        # Booleans
-        self.Reset = True
-        self.OnStartUp = True
-
     '''
     Section 2-A:  SQQQ insight generation
     '''
 
 ##-----------------Update-------------------------------------------------------##
 
+    @Profiler.Timed('SQQQ.Update')
     def Update(self, algorithm, data):
 
         TQQQ = SymbolCache.GetSymbol("TQQQ")
         insights = []
 
 
-##-----------------Update various statistics annually----------------------------##
-
-        self.AnnualRecalc(algorithm)
-
-
-
 ##-----------------Generate insights---------------------------------------------------##
 
         for symbol, symbolData in self.SQQQ.items():
@@ -293,10 +272,10 @@ class SQQQ(AlphaModel):
                 # Create indicators
                 symbolData = SymbolData(added, self.Name, self.RSIDeviationRange)
                 symbolData.InitializeIndicators(algorithm, self.FastPeriod, self.SlowPeriod, self.resolution)
-                symbolData.StatBounds(algorithm, self.FastPeriod, self.SlowPeriod, self.StatPeriod, self.resolution)
-                symbolData.GetGapSignal(algorithm)
+                symbolData.LoadStatistics(algorithm, self.FastPeriod, self.SlowPeriod, self.StatPeriod, self.resolution)
 
                 self.SQQQ[added.Symbol] = symbolData
+                RecalcScheduler.Register(self.Name, self.AnnualRecalc)
 
             else:
                 continue
@@ -309,19 +288,9 @@ class SQQQ(AlphaModel):
 
     def AnnualRecalc(self, algorithm):
 
-        # Once per year update the VIX statistics with the previuos 4000 days data
-        if algorithm.Time.date() == MiscMethods.GetNextWeekday(date(algorithm.Time.year, 1, 3)) and self.TimeBounds[2] <= algorithm.Time.time() <= self.TimeBounds[3]:
-            self.Reset = True
-
-        if (self.Reset and algorithm.Time.date() == MiscMethods.GetNextWeekday(date(algorithm.Time.year, 1, 3)) + OneDay) or self.OnStartUp:
-
-            if not self.OnStartUp:
-                for symbol, symbolData in self.SQQQ.items():
-                    symbolData.StatBounds(algorithm, self.FastPeriod, self.SlowPeriod, self.StatPeriod, self.resolution)
-                    symbolData.GetGapSignal(algorithm)
-
-            self.Reset = False
-            self.OnStartUp = False
+        # Called by RecalcScheduler on the first trading day of the year
+        for symbol, symbolData in self.SQQQ.items():
+            symbolData.RecalcStatistics(algorithm, self.FastPeriod, self.SlowPeriod, self.StatPeriod, self.resolution)
 
 
 
@@ -358,25 +327,38 @@ class SymbolData:
 
     def InitializeIndicators(self, algorithm, FastPeriod, SlowPeriod, resolution):
 
-        EMAWarmupHistory = self.DesiredHistory(algorithm, self.Symbol, SlowPeriod+1, resolution)
+        EMAWarmup = SlowPeriod+1
+        RSIWarmup = 60
+
+        # One history request covers both warm-up windows when they share the daily resolution
+        if resolution == Resolution.Daily:
+            Times, Closes = self.WarmupArrays(self.DesiredHistory(algorithm, self.Symbol, max(EMAWarmup, RSIWarmup), resolution))
+            RSITimes, RSICloses = Times, Closes
+
+        else:
+            Times, Closes = self.WarmupArrays(self.DesiredHistory(algorithm, self.Symbol, EMAWarmup, resolution))
+            RSITimes, RSICloses = self.WarmupArrays(self.DesiredHistory(algorithm, self.Symbol, RSIWarmup, Resolution.Daily))
 
         EMAFast = algorithm.EMA(self.Symbol, FastPeriod, resolution)
         EMASlow = algorithm.EMA(self.Symbol, SlowPeriod, resolution)
 
-        for time, row in EMAWarmupHistory.loc[self.Symbol].iterrows():
-            EMAFast.Update(time, row["close"])
-            EMASlow.Update(time, row["close"])
+        for time, close in zip(Times[-EMAWarmup:], Closes[-EMAWarmup:]):
+            EMAFast.Update(time, close)
+            EMASlow.Update(time, close)
 
         self.EMACross = IndicatorExtensions.Over( EMAFast, EMASlow )
         self.EMACross.Updated += self.EMACrossUpdated
 
-        RSIWarmupHistory = self.DesiredHistory(algorithm, self.Symbol, 60, Resolution.Daily)
-
         self.RSI = algorithm.RSI(self.Symbol, 14, MovingAverageType.Simple, Resolution.Daily)
         self.RSI.Updated += self.RSIUpdated
 
-        for time, row in RSIWarmupHistory.loc[self.Symbol].iterrows():
-            self.RSI.Update(time, row["close"])
+        for time, close in zip(RSITimes[-RSIWarmup:], RSICloses[-RSIWarmup:]):
+            self.RSI.Update(time, close)
+
+    def WarmupArrays(self, history):
+        history = history.loc[self.Symbol]
+
+        return history.index.to_pydatetime().tolist(), history['close'].to_numpy(dtype=float).tolist()
 
     def EMACrossUpdated(self, sender, updated):
         self.CrossWindow.Add(updated)
@@ -389,29 +371,68 @@ class SymbolData:
     Section 3-B: Perform stat analysis on moving average indicators
     '''
 
+##-----------------Restores the annual statistics from the store or recomputes them------------##
+
+    def LoadStatistics(self, algorithm, FastPeriod, SlowPeriod, StatPeriod, resolution):
+        Snapshot = StatisticsStore.Load(algorithm, self.Name, self.Symbol, self.StatisticsKey(FastPeriod, SlowPeriod, StatPeriod, resolution))
+
+        if Snapshot is None:
+            self.RecalcStatistics(algorithm, FastPeriod, SlowPeriod, StatPeriod, resolution)
+            return
+
+        self.Mean = Snapshot['Mean']
+        self.STD = Snapshot['STD']
+        self.GapSignal = Snapshot['GapSignal']
+        self.GapDownSignal = Snapshot['GapDownSignal']
+        self.MeanRSI = Snapshot['MeanRSI']
+        self.STDRSI = Snapshot['STDRSI']
+        self.RSIDeviations = Snapshot['RSIDeviations']
+
+    def RecalcStatistics(self, algorithm, FastPeriod, SlowPeriod, StatPeriod, resolution):
+        # Without bars the previous statistics are kept and nothing is stored for the year
+        if not self.StatBounds(algorithm, FastPeriod, SlowPeriod, StatPeriod, resolution):
+            return
+
+        self.GetGapSignal(algorithm)
+
+        StatisticsStore.Save(algorithm, self.Name, self.Symbol, self.StatisticsKey(FastPeriod, SlowPeriod, StatPeriod, resolution),
+                             {'Mean': self.Mean, 'STD': self.STD,
+                              'GapSignal': self.GapSignal, 'GapDownSignal': self.GapDownSignal,
+                              'MeanRSI': self.MeanRSI, 'STDRSI': self.STDRSI, 'RSIDeviations': self.RSIDeviations})
+
+    def StatisticsKey(self, FastPeriod, SlowPeriod, StatPeriod, resolution):
+        return f'{FastPeriod}-{SlowPeriod}-{StatPeriod.days}-{int(resolution)}-{self.RSIDevRange.start}-{self.RSIDevRange.stop}'
+
+
 ##-----------------Updates historical indicator statstics over the StatPeriod------------------##
 
     def StatBounds(self, algorithm, FastPeriod, SlowPeriod, StatPeriod, resolution):
-        StatHistory = algorithm.History(self.Symbol, StatPeriod, resolution)
+        if resolution == Resolution.Daily:
+            Bars = DailyBarCache.Get(algorithm, self.Symbol)
 
-        FastValues = []
-        SlowValues = []
+            Closes = Bars.Close[Bars.Since(algorithm.Time - StatPeriod)]
 
-        fast = algorithm.EMA(self.Symbol, FastPeriod, resolution)
-        slow = algorithm.EMA(self.Symbol, SlowPeriod, resolution)
+            # Short calendar periods hold no bars after weekends and holidays, fall back to the last completed session
+            if len(Closes) == Zero:
+                Closes = Bars.Close[-1:]
 
-        for time, row in StatHistory.loc[self.Symbol].iterrows():
-            fast.Update(time, row["close"])
-            FastValues.append(fast.Current.Value)
+        else:
+            StatHistory = algorithm.History(self.Symbol, StatPeriod, resolution)
+            Closes = StatHistory.loc[self.Symbol]['close'].to_numpy(dtype=float) if not StatHistory.empty else np.array([])
 
-            slow.Update(time, row["close"])
-            SlowValues.append(slow.Current.Value)
+        if len(Closes) == Zero:
+            algorithm.Log(f"{self.Name}: No bars for the cross statistics of {self.Symbol}. Keeping Average Cross: {self.Mean} || STD Cross: {self.STD}")
+            return False
 
-        self.Mean = round(np.mean(np.array(FastValues)/np.array(SlowValues)),4)
-        self.STD = round(np.std(np.array(FastValues)/np.array(SlowValues)),4)
+        Ratio = VectorIndicators.EMA(Closes, FastPeriod) / VectorIndicators.EMA(Closes, SlowPeriod)
+
+        self.Mean = round(float(np.mean(Ratio)),4)
+        self.STD = round(float(np.std(Ratio)),4)
 
         algorithm.Log("{2}: Average Cross: {0} || STD Cross: {1}".format(self.Mean, self.STD, self.Name))
 
+        return True
+
 
     '''
     Section 3-C: Perform stat analysis on price data
@@ -420,41 +441,31 @@ class SymbolData:
 ##-----------------Captures Gap stats for the symbol-------------------------------------------##
 
     def GetGapSignal(self, algorithm):
-        history = algorithm.History(self.Symbol, timedelta(days=43000), Resolution.Daily)
-
-        GapArray = [Zero]
-        for i in range(1, len(history)):
-            value = round(history['open'][i]/history['close'][i-1]-1,5)
-            GapArray.append(value)
+        Bars = DailyBarCache.Get(algorithm, self.Symbol)
 
-        GapAnalysis = pd.DataFrame(index=history.index, columns = ['Gap'])
-        GapAnalysis['Gap'] = GapArray
+        # Overnight gap of each open against the previous close
+        ReturnsArray = np.round(Bars.Open[1:] / Bars.Close[:-1] - 1, 5)
 
-        ReturnsArray = np.array(GapAnalysis['Gap'])
+        MeanPositiveGap, STDPositiveGap = self.MeanSTD(ReturnsArray[ReturnsArray > 0])
+        MeanNegativeGap, STDNegativeGap = self.MeanSTD(ReturnsArray[ReturnsArray < 0])
 
-        PositiveReturnsArray = ReturnsArray[ReturnsArray>0]
-        NegativeReturnsArray = ReturnsArray[ReturnsArray<0]
+        Steps = np.arange(1, 7)
 
-        MeanPositiveGap = round(np.mean(PositiveReturnsArray),3)
-        STDPositiveGap = round(np.std(PositiveReturnsArray),3)
+        self.GapSignal = np.round(MeanPositiveGap + Steps * STDPositiveGap, 3).tolist()
+        self.GapDownSignal = np.round(MeanNegativeGap - Steps * STDNegativeGap, 3).tolist()
 
-        MeanNegativeGap = round(np.mean(NegativeReturnsArray),3)
-        STDNegativeGap= round(np.std(NegativeReturnsArray),3)
+        self.RSIBounds(algorithm, Bars.Close)
 
-        PositiveDeviations = []
-        NegativeDeviations = []
+        algorithm.Log("{2}: GapUpSignal: {0} || GapDownSignal: {1}".format(self.GapSignal, self.GapDownSignal, self.Name))
 
-        for i in range (1, 7):
-            PositiveDeviations.append(float(round(MeanPositiveGap+i*STDPositiveGap,3)))
-        for i in range (-1, -7, -1):
-            NegativeDeviations.append(float(round(MeanNegativeGap+i*STDNegativeGap,3)))
 
-        self.GapSignal = PositiveDeviations
-        self.GapDownSignal = NegativeDeviations
+##-----------------Mean and population STD, NaN when there are no gaps like the baseline------##
 
-        self.RSIBounds(algorithm, history)
+    def MeanSTD(self, values):
+        if len(values) == Zero:
+            return np.nan, np.nan
 
-        algorithm.Log("{2}: GapUpSignal: {0} || GapDownSignal: {1}".format(self.GapSignal, self.GapDownSignal, self.Name))
+        return round(float(np.mean(values)), 3), round(float(np.std(values)), 3)
 
 
     '''
@@ -462,23 +473,15 @@ class SymbolData:
     '''
 ##-----------------Derives RSI boundaries------------------------------------------------------##
 
-    def RSIBounds(self, algorithm, history):
-
-        rsi = algorithm.RSI(self.Symbol, 124, MovingAverageType.Simple, Resolution.Daily)
-        RSIValues = []
-
-        for time, row in history.loc[self.Symbol].iterrows():
-            rsi.Update(time, row["close"])
-            RSIValues.append(rsi.Current.Value)
+    def RSIBounds(self, algorithm, Closes):
 
+        RSIValues = VectorIndicators.RSI(Closes, 124)
 
         Average_RSI_Daily = round(float(np.mean(RSIValues)),4)
         STD_RSI_Daily = round(float(np.std(RSIValues)),4)
-        Deviations_RSI_Daily = []
 
         # Standard Deviations
-        for i in self.RSIDevRange:
-            Deviations_RSI_Daily.append(round(Average_RSI_Daily + i*STD_RSI_Daily,4))
+        Deviations_RSI_Daily = np.round(Average_RSI_Daily + np.array(self.RSIDevRange)*STD_RSI_Daily, 4).tolist()
 
         self.MeanRSI = Average_RSI_Daily
         self.STDRSI = STD_RSI_Daily
@@ -494,14 +497,7 @@ class SymbolData:
 ##-------------------Method to capture the desired amount of history---------------------------##
 
     def DesiredHistory(self, algorithm, symbol, Days, resolution):
-        startingDays = Days
-        history = algorithm.History(symbol, Days, resolution)
-
-        while len(history) < Days:
-            startingDays = startingDays + 1
-            history = algorithm.History(symbol, startingDays, resolution)
-
-        return history
+        return HistoryService.Bars(algorithm, symbol, Days, resolution)
 
 
 '''
@@ -515,17 +511,12 @@ class MiscMethods:
 
 
     '''
-    Section 4-A:  Takes a random date and returns the next weekday from that date
+    Section 4-A:  Takes a random date and returns the next trading day from that date
     '''
-##-----------------Return the next weekday from specified date--------------------------------##
+##-----------------Return the next trading day from specified date----------------------------##
 
     def GetNextWeekday(RandomDate):
-        RandomDate += OneDay
-
-        while RandomDate.weekday() > int(4): # Mon-Fri are 0-4
-            RandomDate += OneDay
-
-        return RandomDate
+        return TradingCalendar.Equity().NextTradingDay(RandomDate)
 
 
 
@@ -534,10 +525,7 @@ class MiscMethods:
     '''
 ##-----------------Return current open, current close, and next open from specified time------##
     def MarketHours(algorithm, symbol, offset=timedelta(minutes=0)):
-        hours = algorithm.Securities[symbol].Exchange.Hours
-        CurrentOpen = hours.GetNextMarketOpen(algorithm.Time, False)
-        CurrentClose = hours.GetNextMarketClose(CurrentOpen, False)
-        NextOpen = hours.GetNextMarketOpen(CurrentClose, False)
-        OpenOffset = hours.GetNextMarketOpen(algorithm.Time, False) + offset
+        CurrentOpen, CurrentClose, NextOpen = TradingCalendar.For(algorithm, symbol).Session(algorithm.Time)
+        OpenOffset = CurrentOpen + offset
 
         return [CurrentOpen, CurrentClose, NextOpen, OpenOffset]
\ No newline at end of file
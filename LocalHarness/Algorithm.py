@@ -0,0 +1,712 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import json
+import os
+import numpy as np
+from datetime import *
+from zoneinfo import ZoneInfo
+
+from .Types import *
+
+##-------------------Global variables---------------------------------------------------------##
+
+Zero = int(0)
+NewYork = ZoneInfo('America/New_York')
+Utc = ZoneInfo('UTC')
+
+
+'''
+Section 1:  Securities and holdings
+'''
+
+class Security:
+
+    def __init__(self, symbol, resolution, hours, leverage=2):
+        self.Symbol = symbol
+        self.Type = symbol.SecurityType
+        self.Resolution = resolution
+        self.Exchange = Exchange(hours)
+        self.SymbolProperties = SymbolProperties()
+        self.Leverage = leverage
+        self.BuyingPowerModel = BuyingPowerModel(self)
+        self.FeeModel = FeeModel()
+        self.Holdings = SecurityHolding(self)
+        self.IsTradable = symbol.SecurityType != SecurityType.Index
+        self.HasData = False
+        self.Open = self.High = self.Low = self.Close = self.Price = float(0)
+        self.Volume = float(0)
+
+    def SetMarketPrice(self, bar):
+        self.Open, self.High, self.Low, self.Close, self.Volume = bar.Open, bar.High, bar.Low, bar.Close, bar.Volume
+        self.Price = bar.Close
+        self.HasData = True
+
+    def SetLeverage(self, leverage):
+        self.Leverage = leverage
+
+
+class SecurityHolding:
+
+    def __init__(self, security):
+        self.Security = security
+        self.Symbol = security.Symbol
+        self.Quantity = Zero
+        self.AveragePrice = float(0)
+        self.TotalFees = float(0)
+
+    @property
+    def Price(self):
+        return self.Security.Price
+
+    @property
+    def Invested(self):
+        return self.Quantity != 0
+
+    @property
+    def IsLong(self):
+        return self.Quantity > 0
+
+    @property
+    def IsShort(self):
+        return self.Quantity < 0
+
+    @property
+    def HoldingsValue(self):
+        return self.Quantity * self.Security.Price * self.Security.SymbolProperties.ContractMultiplier
+
+    @property
+    def AbsoluteHoldingsValue(self):
+        return abs(self.HoldingsValue)
+
+    @property
+    def HoldingsCost(self):
+        return self.Quantity * self.AveragePrice * self.Security.SymbolProperties.ContractMultiplier
+
+    @property
+    def UnrealizedProfit(self):
+        return self.HoldingsValue - self.HoldingsCost
+
+    @property
+    def UnrealizedProfitPercent(self):
+        cost = abs(self.HoldingsCost)
+        return self.UnrealizedProfit / cost if cost else float(0)
+
+    def Fill(self, quantity, price):
+        '''
+        Applies a fill and returns the realized profit
+        '''
+        realized = float(0)
+
+        if self.Quantity == 0 or (self.Quantity > 0) == (quantity > 0):
+            total = self.Quantity + quantity
+            self.AveragePrice = (self.AveragePrice * self.Quantity + price * quantity) / total
+            self.Quantity = total
+            return realized
+
+        closed = min(abs(quantity), abs(self.Quantity)) * (1 if self.Quantity > 0 else -1)
+        realized = closed * (price - self.AveragePrice) * self.Security.SymbolProperties.ContractMultiplier
+        self.Quantity += quantity
+
+        if self.Quantity == 0:
+            self.AveragePrice = float(0)
+        elif (self.Quantity > 0) == (quantity > 0):
+            self.AveragePrice = price
+
+        return realized
+
+
+class KeyValuePair:
+
+    def __init__(self, key, value):
+        self.Key = key
+        self.Value = value
+
+
+class SecurityManager(dict):
+
+    @property
+    def Keys(self):
+        return list(self.keys())
+
+    @property
+    def Values(self):
+        return list(self.values())
+
+    def ContainsKey(self, symbol):
+        return symbol in self
+
+    def __iter__(self):
+        return (KeyValuePair(symbol, security) for symbol, security in list(self.items()))
+
+
+class SecurityPortfolioManager:
+
+    def __init__(self, securities, settings):
+        self.Securities = securities
+        self.Settings = settings
+        self.Cash = float(100000)
+        self.TotalFees = float(0)
+        self.TotalProfit = float(0)
+
+    def __getitem__(self, symbol):
+        return self.Securities[symbol].Holdings
+
+    def __iter__(self):
+        return (KeyValuePair(symbol, security.Holdings) for symbol, security in list(self.Securities.items()))
+
+    def ContainsKey(self, symbol):
+        return symbol in self.Securities
+
+    @property
+    def Keys(self):
+        return list(self.Securities.keys())
+
+    @property
+    def Values(self):
+        return [x.Holdings for x in self.Securities.values()]
+
+    @property
+    def Invested(self):
+        return any(x.Holdings.Quantity != 0 for x in self.Securities.values())
+
+    @property
+    def TotalHoldingsValue(self):
+        return sum(x.Holdings.HoldingsValue for x in self.Securities.values() if x.Holdings.Quantity != 0)
+
+    @property
+    def TotalAbsoluteHoldingsCost(self):
+        return sum(abs(x.Holdings.HoldingsCost) for x in self.Securities.values() if x.Holdings.Quantity != 0)
+
+    @property
+    def TotalPortfolioValue(self):
+        return self.Cash + self.TotalHoldingsValue
+
+    @property
+    def TotalPortfolioValueLessFreeBuffer(self):
+        return self.TotalPortfolioValue - float(self.Settings.FreePortfolioValue)
+
+    @property
+    def TotalMarginUsed(self):
+        return sum(x.Holdings.AbsoluteHoldingsValue / x.Leverage for x in self.Securities.values() if x.Holdings.Quantity != 0)
+
+    @property
+    def MarginRemaining(self):
+        return self.TotalPortfolioValue - self.TotalMarginUsed
+
+    def SetCash(self, cash):
+        self.Cash = float(cash)
+
+
+'''
+Section 2:  Orders
+'''
+
+class SecurityTransactionManager:
+    '''
+    Market orders fill at the security price. Synchronous orders fill on submission, asynchronous ones at the start of the
+    next time step so their tickets are seen as open in between. Orders the buying power model rejects are Invalid.
+    '''
+
+    def __init__(self, algorithm):
+        self.Algorithm = algorithm
+        self.Tickets = []
+        self.Pending = []
+        self.Fills = []
+        self.NextId = 1
+
+    def Submit(self, symbol, quantity, asynchronous, tag):
+        algorithm = self.Algorithm
+        order = MarketOrder(symbol, quantity, algorithm.UtcTime, tag)
+        order.Id = self.NextId
+        self.NextId += 1
+
+        ticket = OrderTicket(order)
+        self.Tickets.append(ticket)
+        security = algorithm.Securities[symbol]
+
+        if quantity == 0 or not security.HasData or security.Price <= 0:
+            return self.Reject(ticket, 'The security has no price or the quantity is zero')
+
+        result = security.BuyingPowerModel.HasSufficientBuyingPowerForOrder(
+            HasSufficientBuyingPowerForOrderParameters(algorithm.Portfolio, security, order))
+
+        if not result.IsSufficient:
+            return self.Reject(ticket, result.Reason)
+
+        ticket.Status = OrderStatus.Submitted
+        self.Algorithm.Dispatch(OrderEvent(ticket, OrderStatus.Submitted, algorithm.UtcTime))
+
+        if asynchronous:
+            self.Pending.append(ticket)
+        else:
+            self.Fill(ticket)
+
+        return ticket
+
+    def Reject(self, ticket, message):
+        ticket.Status = OrderStatus.Invalid
+        ticket.Message = message
+        self.Algorithm.Dispatch(OrderEvent(ticket, OrderStatus.Invalid, self.Algorithm.UtcTime, message=message))
+
+        return ticket
+
+    def Fill(self, ticket):
+        algorithm = self.Algorithm
+        security = algorithm.Securities[ticket.Symbol]
+        price = float(security.Price)
+        fee = security.FeeModel.GetOrderFee(OrderFeeParameters(security, ticket.Order)).Value.Amount
+
+        algorithm.Portfolio.TotalProfit += security.Holdings.Fill(ticket.Quantity, price)
+        algorithm.Portfolio.Cash -= ticket.Quantity * price * security.SymbolProperties.ContractMultiplier + fee
+        algorithm.Portfolio.TotalFees += fee
+        security.Holdings.TotalFees += fee
+
+        ticket.Status = OrderStatus.Filled
+        ticket.QuantityFilled = ticket.Quantity
+        ticket.AverageFillPrice = price
+        self.Fills.append((algorithm.Time, ticket.Symbol, ticket.Quantity, price, fee))
+
+        algorithm.Dispatch(OrderEvent(ticket, OrderStatus.Filled, algorithm.UtcTime, price, ticket.Quantity))
+
+    def ProcessPending(self):
+        pending, self.Pending = self.Pending, []
+
+        for ticket in pending:
+            if ticket.Status == OrderStatus.Submitted:
+                self.Fill(ticket)
+
+    ##-----------------Queries used by the models-------------------------------------------------##
+
+    def GetOpenOrders(self, symbol=None):
+        return [x.Order for x in self.Pending if symbol is None or x.Symbol == symbol]
+
+    def GetOpenOrderTickets(self, symbol=None):
+        return [x for x in self.Pending if symbol is None or x.Symbol == symbol]
+
+    def GetOpenOrdersRemainingQuantity(self, symbol):
+        return sum(float(x.Quantity) for x in self.Pending if x.Symbol == symbol)
+
+    def GetOrderTickets(self):
+        return list(self.Tickets)
+
+    def CancelOpenOrders(self, symbol=None, tag=''):
+        canceled = [x for x in self.Pending if symbol is None or x.Symbol == symbol]
+        self.Pending = [x for x in self.Pending if x not in canceled]
+
+        for ticket in canceled:
+            ticket.Status = OrderStatus.Canceled
+            self.Algorithm.Dispatch(OrderEvent(ticket, OrderStatus.Canceled, self.Algorithm.UtcTime, message=tag))
+
+        return canceled
+
+
+'''
+Section 3:  Scheduling
+'''
+
+class DateRule:
+
+    def __init__(self, name, matches):
+        self.Name = name
+        self.Matches = matches
+
+
+class TimeRule:
+
+    def __init__(self, name, times):
+        self.Name = name
+        self.Times = times
+
+
+class DateRules:
+
+    def __init__(self, algorithm):
+        self.Algorithm = algorithm
+
+    def Hours(self, symbol):
+        if symbol is None:
+            return MarketHoursDatabase.Hours
+
+        return self.Algorithm.Securities[self.Algorithm.Symbol(symbol)].Exchange.Hours
+
+    def EveryDay(self, symbol=None):
+        hours = self.Hours(symbol)
+        return DateRule('EveryDay', lambda day: hours.IsDateOpen(day))
+
+    def MonthStart(self, symbol=None, daysOffset=0):
+        hours = self.Hours(symbol)
+
+        def matches(day):
+            if not hours.IsDateOpen(day):
+                return False
+
+            first = date(day.year, day.month, 1)
+            open = [first + timedelta(days=i) for i in range(31) if (first + timedelta(days=i)).month == day.month
+                    and hours.IsDateOpen(first + timedelta(days=i))]
+
+            return len(open) > daysOffset and open[daysOffset] == day
+
+        return DateRule('MonthStart', matches)
+
+    def On(self, year, month, day):
+        target = date(year, month, day)
+        return DateRule('On', lambda day: day == target)
+
+
+class TimeRules:
+
+    def __init__(self, algorithm):
+        self.Algorithm = algorithm
+
+    def AfterMarketOpen(self, symbol, minutesAfterOpen=0, extendedMarketOpen=False):
+        hours = self.Algorithm.Securities[self.Algorithm.Symbol(symbol)].Exchange.Hours
+        return TimeRule('AfterMarketOpen', lambda day: [hours.GetNextMarketOpen(datetime.combine(day, time.min)) + timedelta(minutes=minutesAfterOpen)])
+
+    def BeforeMarketClose(self, symbol, minutesBeforeClose=0, extendedMarketClose=False):
+        hours = self.Algorithm.Securities[self.Algorithm.Symbol(symbol)].Exchange.Hours
+        return TimeRule('BeforeMarketClose', lambda day: [hours.GetNextMarketClose(datetime.combine(day, time.min)) - timedelta(minutes=minutesBeforeClose)])
+
+    def At(self, hour, minute=0, second=0):
+        return TimeRule('At', lambda day: [datetime.combine(day, time(hour, minute, second))])
+
+    def Every(self, interval):
+        return TimeRule('Every', lambda day: [datetime.combine(day, time.min) + i * interval for i in range(int(timedelta(days=1) / interval))])
+
+
+class ScheduledEvent:
+
+    def __init__(self, dateRule, timeRule, callback, sequence):
+        self.DateRule = dateRule
+        self.TimeRule = timeRule
+        self.Callback = callback
+        self.Sequence = sequence
+
+
+class ScheduleManager:
+
+    def __init__(self, algorithm):
+        self.Events = []
+
+    def On(self, dateRule, timeRule, callback):
+        event = ScheduledEvent(dateRule, timeRule, callback, len(self.Events))
+        self.Events.append(event)
+        return event
+
+    def Remove(self, event):
+        if event in self.Events:
+            self.Events.remove(event)
+
+    def Day(self, day):
+        '''
+        Returns the (time, sequence, callback) of every event firing on the day, in firing order
+        '''
+        fires = []
+
+        for event in self.Events:
+            if event.DateRule.Matches(day):
+                fires.extend((x, event.Sequence, event.Callback) for x in event.TimeRule.Times(day))
+
+        return sorted(fires, key=lambda x: (x[0], x[1]))
+
+
+'''
+Section 4:  Object store, settings and subscriptions
+'''
+
+class ObjectStore:
+    '''
+    In memory, optionally mirrored to a folder so snapshots survive between local runs
+    '''
+
+    def __init__(self, folder=None):
+        self.Folder = folder
+        self.Values = {}
+
+        if folder and os.path.exists(os.path.join(folder, 'objectstore.json')):
+            with open(os.path.join(folder, 'objectstore.json')) as file:
+                self.Values = json.load(file)
+
+    def ContainsKey(self, key):
+        return key in self.Values
+
+    def Read(self, key):
+        return self.Values[key]
+
+    def Save(self, key, value):
+        self.Values[key] = value
+
+        if self.Folder:
+            os.makedirs(self.Folder, exist_ok=True)
+            with open(os.path.join(self.Folder, 'objectstore.json'), 'w') as file:
+                json.dump(self.Values, file)
+
+        return True
+
+    def Delete(self, key):
+        return self.Values.pop(key, None) is not None
+
+    @property
+    def Keys(self):
+        return list(self.Values)
+
+
+class AlgorithmSettings:
+
+    def __init__(self):
+        self.FreePortfolioValuePercentage = 0.0025
+        self.FreePortfolioValue = 0
+        self.MinAbsolutePortfolioTargetPercentage = 0.0000000001
+        self.MaxAbsolutePortfolioTargetPercentage = 1000000000
+        self.RebalancePortfolioOnInsightChanges = True
+        self.RebalancePortfolioOnSecurityChanges = True
+
+
+class SubscriptionManager:
+
+    def __init__(self):
+        self.Consolidators = {}
+
+    def AddConsolidator(self, symbol, consolidator):
+        self.Consolidators.setdefault(symbol, []).append(consolidator)
+
+    def RemoveConsolidator(self, symbol, consolidator):
+        if consolidator in self.Consolidators.get(symbol, []):
+            self.Consolidators[symbol].remove(consolidator)
+
+
+'''
+Section 5:  Algorithm
+'''
+
+class QCAlgorithm:
+    '''
+    Local stand-in for the parts of QCAlgorithm the project uses. LocalHarness.Harness drives the time loop,
+    the framework models and the data feed; the algorithm holds the state they read and write.
+    '''
+
+    def __init__(self):
+        self.Securities = SecurityManager()
+        self.Settings = AlgorithmSettings()
+        self.Portfolio = SecurityPortfolioManager(self.Securities, self.Settings)
+        self.Transactions = SecurityTransactionManager(self)
+        self.Schedule = ScheduleManager(self)
+        self.DateRules = DateRules(self)
+        self.TimeRules = TimeRules(self)
+        self.ObjectStore = ObjectStore()
+        self.SubscriptionManager = SubscriptionManager()
+        self.BrokerageModel = DefaultBrokerageModel()
+
+        self.Alphas = []
+        self.PortfolioConstruction = PortfolioConstructionModel()
+        self.Execution = ExecutionModel()
+        self.RiskManagement = NullRiskManagementModel()
+        self.UniverseSelection = []
+        self.Indicators = []
+
+        self.LiveMode = False
+        self.IsWarmingUp = False
+        self.StartDate = datetime(1998, 1, 1)
+        self.EndDate = None
+        self.Time = self.StartDate
+        self.UtcTime = self.ToUtc(self.Time)
+
+        self.Logs = []
+        self.Plots = {}
+        self.Parameters = {}
+        self.Verbose = False
+        self.Harness = None
+        self.DataFeed = None
+        self.FeeModel = lambda quantity, price: float(0)
+
+    ##-----------------Time------------------------------------------------------------------------##
+
+    def ToUtc(self, time):
+        return time.replace(tzinfo=NewYork).astimezone(Utc)
+
+    def SetDateTime(self, time):
+        self.Time = time
+        self.UtcTime = self.ToUtc(time)
+
+    def SetStartDate(self, year, month=None, day=None):
+        start = year if month is None else datetime(year, month, day)
+
+        if self.Harness is not None and self.Harness.Start is not None:
+            start = self.Harness.Start
+
+        self.StartDate = datetime.combine(start, time.min) if not isinstance(start, datetime) else start
+        self.SetDateTime(self.StartDate)
+
+    def SetEndDate(self, year, month=None, day=None):
+        end = year if month is None else datetime(year, month, day)
+
+        if self.Harness is not None and self.Harness.End is not None:
+            end = self.Harness.End
+
+        self.EndDate = datetime.combine(end, time.min) if not isinstance(end, datetime) else end
+
+    def SetCash(self, cash):
+        if self.Harness is not None and self.Harness.Cash is not None:
+            cash = self.Harness.Cash
+
+        self.Portfolio.SetCash(cash)
+
+    def SetWarmup(self, period, resolution=None):
+        pass
+
+    def SetWarmUp(self, period, resolution=None):
+        pass
+
+    def GetParameter(self, name, defaultValue=None):
+        return self.Parameters.get(name, defaultValue)
+
+    ##-----------------Subscriptions---------------------------------------------------------------##
+
+    def Symbol(self, ticker):
+        return ticker if isinstance(ticker, Symbol) else SymbolCache.GetSymbol(ticker)
+
+    def AddSecurity(self, symbol, resolution, hours, ticker):
+        if symbol not in self.Securities:
+            self.Securities[symbol] = Security(symbol, resolution, hours)
+            self.Securities[symbol].FeeModel = FeeModel(lambda quantity, price: self.FeeModel(quantity, price))
+            SymbolCache.Set(ticker, symbol)
+
+        return self.Securities[symbol]
+
+    def AddEquity(self, ticker, resolution=Resolution.Minute, market=None, fillDataForward=True, leverage=2, extendedMarketHours=False):
+        security = self.AddSecurity(Symbol(ticker, SecurityType.Equity), resolution, MarketHoursDatabase.Hours, ticker)
+        security.Leverage = leverage
+        return security
+
+    def AddIndex(self, ticker, resolution=Resolution.Minute, market=None, fillDataForward=True):
+        return self.AddSecurity(Symbol(ticker, SecurityType.Index), resolution, MarketHoursDatabase.Hours, ticker)
+
+    def AddData(self, type, ticker, resolution=Resolution.Daily, *args):
+        value = f'{ticker}.{type.__name__}'
+        return self.AddSecurity(Symbol(value, SecurityType.Base), Resolution.Daily, ExchangeHours(AlwaysOpen=True), value)
+
+    def AddUniverseSelection(self, model):
+        self.UniverseSelection.append(model)
+
+    def SetUniverseSelection(self, model):
+        self.UniverseSelection = [model]
+
+    ##-----------------Framework models------------------------------------------------------------##
+
+    def AddAlpha(self, model):
+        self.Alphas.append(model)
+
+    def SetAlpha(self, model):
+        self.Alphas = [model]
+
+    def SetPortfolioConstruction(self, model):
+        self.PortfolioConstruction = model
+
+    def SetExecution(self, model):
+        self.Execution = model
+
+    def SetRiskManagement(self, model):
+        self.RiskManagement = model
+
+    def AddRiskManagement(self, model):
+        self.RiskManagement = model
+
+    def SetBrokerageModel(self, model, *args):
+        self.BrokerageModel = model
+
+    ##-----------------Indicators updated automatically by the harness-----------------------------##
+
+    def RegisterIndicator(self, symbol, indicator, resolution=None):
+        resolution = self.Securities[symbol].Resolution if resolution is None else resolution
+        self.Indicators.append((symbol, Resolution.Daily if resolution == Resolution.Daily else Resolution.Minute, indicator))
+
+        return indicator
+
+    def EMA(self, symbol, period, resolution=None, selector=None):
+        return self.RegisterIndicator(symbol, ExponentialMovingAverage(f'EMA{period}_{symbol}', period), resolution)
+
+    def SMA(self, symbol, period, resolution=None, selector=None):
+        return self.RegisterIndicator(symbol, SimpleMovingAverage(f'SMA{period}_{symbol}', period), resolution)
+
+    def RSI(self, symbol, period, movingAverageType=MovingAverageType.Simple, resolution=None, selector=None):
+        return self.RegisterIndicator(symbol, RelativeStrengthIndex(f'RSI{period}_{symbol}', period, movingAverageType), resolution)
+
+    ##-----------------Data and orders-------------------------------------------------------------##
+
+    def History(self, symbols, periodOrStart, resolutionOrEnd=None, resolution=None):
+        '''
+        Supports History(symbols, bars, resolution), History(symbols, timedelta, resolution) and
+        History(symbols, start, end, resolution). Only bars ending at or before the current time are returned
+        '''
+        symbols = [self.Symbol(x) for x in (symbols if isinstance(symbols, (list, tuple, set)) else [symbols])]
+
+        if isinstance(periodOrStart, int):
+            resolution = resolutionOrEnd if resolutionOrEnd is not None else self.Securities[symbols[0]].Resolution
+            return self.DataFeed.History(symbols, None, self.Time, resolution, count=periodOrStart)
+
+        if isinstance(periodOrStart, timedelta):
+            resolution = resolutionOrEnd if resolutionOrEnd is not None else self.Securities[symbols[0]].Resolution
+            return self.DataFeed.History(symbols, self.Time - periodOrStart, self.Time, resolution)
+
+        resolution = resolution if resolution is not None else self.Securities[symbols[0]].Resolution
+        return self.DataFeed.History(symbols, periodOrStart, min(resolutionOrEnd, self.Time), resolution)
+
+    def MarketOrder(self, symbol, quantity, asynchronous=False, tag=''):
+        return self.Transactions.Submit(self.Symbol(symbol), quantity, asynchronous, tag)
+
+    def Liquidate(self, symbol=None, tag='Liquidated'):
+        tickets = []
+
+        for security in list(self.Securities.values()):
+            if (symbol is None or security.Symbol == symbol) and security.Holdings.Quantity != 0:
+                tickets.append(self.MarketOrder(security.Symbol, -security.Holdings.Quantity, False, tag))
+
+        return tickets
+
+    def SetHoldings(self, symbol, percent, liquidateExistingHoldings=False, tag=''):
+        target = PortfolioTarget.Percent(self, self.Symbol(symbol), percent)
+        if target is not None:
+            quantity = OrderSizing.GetUnorderedQuantity(self, target)
+            if quantity != 0:
+                self.MarketOrder(target.Symbol, quantity, False, tag)
+
+    def Shortable(self, symbol, shortQuantity=None):
+        return True
+
+    def ShortableQuantity(self, symbol):
+        return None
+
+    def Dispatch(self, orderEvent):
+        # Like LEAN, order events only reach the algorithm. Framework models receive them when the algorithm forwards them
+        self.OnOrderEvent(orderEvent)
+
+    def OnOrderEvent(self, orderEvent):
+        pass
+
+    def OnData(self, data):
+        pass
+
+    def OnEndOfDay(self, symbol=None):
+        pass
+
+    def OnEndOfAlgorithm(self):
+        pass
+
+    ##-----------------Logging and charting--------------------------------------------------------##
+
+    def Log(self, message):
+        self.Logs.append((self.Time, str(message)))
+
+        if self.Verbose:
+            print(f'{self.Time} {message}')
+
+    def Debug(self, message):
+        self.Log(message)
+
+    def Error(self, message):
+        self.Log(message)
+
+    def Plot(self, chart, series, value=None):
+        self.Plots.setdefault((chart, series), []).append((self.Time, float(value) if value is not None else float(0)))
+
+    def Record(self, series, value):
+        self.Plot(series, series, value)
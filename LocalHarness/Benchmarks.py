@@ -0,0 +1,485 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time as clock
+import tracemalloc
+import warnings
+import numpy as np
+from datetime import *
+
+from .Types import *
+from .Harness import Harness
+from .Loader import Loader
+from .SyntheticData import SyntheticData
+
+##-------------------Global variables---------------------------------------------------------##
+
+Version = 1
+DataStart = date(1998, 1, 1)
+DataEnd = date(2021, 12, 31)
+MinuteStart = date(2021, 1, 1)
+MinuteTickers = ('UVXY', 'SPXL', 'SPXS', 'TQQQ', 'SQQQ', 'VIX')
+OneYear = timedelta(days=365)
+
+# Absolute slowdown ignored on top of the tolerance, the timer noise of the shortest benchmarks
+TimerSlack = 0.01
+
+# Layout of the baseline file. Results are stored as multiples of the calibration workload from format 2 on
+BaselineFormat = 2
+
+# Reference results committed with the suite, as multiples of the calibration time. Runs fail when it is missing rather than
+# writing a new one
+DefaultBaseline = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+
+##-------------------One timed benchmark-------------------------------------------------------##
+
+class Benchmark:
+    '''
+    Setup builds the state outside of the timed region and returns it, Run takes that state and returns the
+    number of bars it processed, so throughput is reported in bars per second
+    '''
+
+    def __init__(self, Name, Setup, Run):
+        self.Name = Name
+        self.Setup = Setup
+        self.Run = Run
+
+    def Measure(self, Repeat):
+        '''
+        Returns the fastest of Repeat timed runs, the bars of that run and the peak traced memory of one extra run
+        '''
+        timings = []
+
+        for i in range(Repeat):
+            state = self.Setup()
+            started = clock.perf_counter()
+            bars = self.Run(state)
+            timings.append((clock.perf_counter() - started, bars))
+
+        state = self.Setup()
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        self.Run(state)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        seconds, bars = min(timings)
+        return {'Seconds': round(seconds, 4), 'Bars': bars, 'BarsPerSecond': round(bars / seconds, 1) if seconds else float(0),
+                'PeakMemoryMB': round(peak / 2 ** 20, 2)}
+
+
+##-------------------Machine speed measured in the same process-------------------------------##
+
+class Calibration:
+    '''
+    Fixed interpreter and numpy workload timed before and after the benchmarks. Results are compared as multiples of it,
+    so a baseline recorded on one machine holds on a faster or slower one, and a runner slowed down by other load slows
+    the calibration as well
+    '''
+
+    def __init__(self):
+        pass
+
+    def Setup():
+        return np.random.default_rng(1).standard_normal(200000)
+
+    def Run(values):
+        # Dictionary, list and float work like the per bar models, then array passes like the statistics
+        state = {}
+        for i, value in enumerate(values[:50000].tolist()):
+            key = i % 64
+            state[key] = state.get(key, float(0)) * 0.9 + value
+
+        for i in range(20):
+            np.cumsum(np.abs(np.diff(values)) / (np.abs(values[1:]) + 1))
+            np.sort(values)
+
+        return len(values)
+
+
+##-------------------Benchmarks of the startup and per bar hot paths---------------------------##
+
+class BenchmarkSuite:
+    '''
+    Times the algorithm's hot paths on synthetic data: 24 years of daily bars for every ticker and one year of minute
+    bars for the traded tickers and the VIX index, written once to DataFolder and reused.
+
+        Repeat: Timed runs per benchmark, the fastest is kept
+        Tolerance: Allowed relative slowdown against the baseline, in multiples of the calibration time, before a benchmark fails
+        MemoryTolerance: Allowed relative growth of the peak memory against the baseline
+        Days: Minute sessions replayed by the per bar benchmarks
+    '''
+
+    def __init__(self, DataFolder=None, Repeat=3, Tolerance=0.25, MemoryTolerance=0.25, Days=5):
+        self.DataFolder = DataFolder or os.path.join(tempfile.gettempdir(), f'AdvancedIndexingBenchmarks-v{Version}')
+        self.Repeat = Repeat
+        self.Tolerance = Tolerance
+        self.MemoryTolerance = MemoryTolerance
+        self.Days = Days
+        self.Start = datetime(2021, 1, 4)
+
+        self.Benchmarks = [
+            Benchmark('Initialize', self.SetupHarness, self.RunInitialize),
+            Benchmark('QCVix', self.SetupQCVix, self.RunQCVix),
+            Benchmark('AnnualRecalc', self.SetupAlgorithm, self.RunAnnualRecalc),
+            Benchmark('GetGapSignal', self.SetupSymbolData, self.RunGetGapSignal),
+            Benchmark('StatBounds', self.SetupSymbolData, self.RunStatBounds),
+            Benchmark('RSIBounds', self.SetupSymbolData, self.RunRSIBounds),
+            Benchmark('CreateTargets', self.SetupReplay, self.RunCreateTargets),
+            Benchmark('Execute', self.SetupReplay, self.RunExecute),
+            Benchmark('ManageDrawdownRisk', self.SetupInvested, self.RunManageDrawdownRisk),
+            Benchmark('TrailingStop', self.SetupInvested, self.RunTrailingStop),
+            Benchmark('Pipeline', self.SetupPipeline, self.RunPipeline)]
+
+    def PrepareData(self):
+        if not os.path.exists(os.path.join(self.DataFolder, 'complete')):
+            SyntheticData.Write(self.DataFolder, start=DataStart, end=DataEnd, MinuteTickers=MinuteTickers, MinuteStart=MinuteStart)
+            open(os.path.join(self.DataFolder, 'complete'), 'w').close()
+
+    ##-----------------Shared setups-----------------------------------------------------------------##
+
+    def SetupHarness(self, Start=None):
+        return Harness(self.DataFolder, Start=Start or self.Start)
+
+    def SetupAlgorithm(self, Start=None):
+        harness = self.SetupHarness(Start)
+        harness.Create()
+        return harness
+
+    def SetupSymbolData(self):
+        harness = self.SetupAlgorithm()
+        alpha = next(x for x in harness.Algorithm.Alphas if getattr(x, 'Name', '') == 'TQQQ Alpha Model')
+
+        return harness, alpha, next(iter(alpha.TQQQ.values()))
+
+    def SetupReplay(self):
+        '''
+        An initialized algorithm with the market open and the minute bars of the replayed sessions
+        '''
+        harness = self.SetupAlgorithm()
+        algorithm = harness.Algorithm
+        steps = []
+        day = self.Start.date()
+
+        while len({x[0].date() for x in steps}) < self.Days:
+            if MarketHoursDatabase.Hours.IsDateOpen(day):
+                sessions = {x.Symbol: Harness.Grid(harness.Feed.SessionBars(x.Symbol, day), day) for x in algorithm.Securities.values()
+                            if x.Resolution != Resolution.Daily and harness.Feed.SessionBars(x.Symbol, day) is not None}
+
+                for i in range(390):
+                    step = datetime.combine(day, MarketOpen) + timedelta(minutes=i + 1)
+                    steps.append((step, {symbol: TradeBar(step - timedelta(minutes=1), symbol, *grid[i])
+                                         for symbol, grid in sessions.items() if grid[i] is not None}))
+
+            day += timedelta(days=1)
+
+        sys.modules['Global'].Global.MarketIsOpen = True
+        return harness, steps
+
+    def SetupInvested(self):
+        '''
+        The replay with a long position in the long ETFs and short positions in the inverse ETFs and UVXY
+        '''
+        harness, steps = self.SetupReplay()
+        algorithm = harness.Algorithm
+        Replay.Prices(algorithm, *steps[0])
+
+        for security in list(algorithm.Securities.values()):
+            if security.Type == SecurityType.Equity and security.Price > 0:
+                side = -1 if str(security.Symbol) in ('UVXY', 'SPXS', 'SQQQ') else 1
+                algorithm.MarketOrder(security.Symbol, side * int(50000 / security.Price))
+
+        return harness, steps
+
+    def SetupQCVix(self):
+        '''
+        An algorithm started in 2005 and the slices of the following daily VIX closes
+        '''
+        harness = self.SetupAlgorithm(datetime(2005, 1, 3))
+        algorithm = harness.Algorithm
+        vix = SymbolCache.GetSymbol('VIX.CBOE')
+        series = harness.Feed.Load(vix, Resolution.Daily)
+        first = series.Before(algorithm.Time)
+
+        slices = []
+        for i in range(first, len(series)):
+            end = series.Time[i].astype('datetime64[us]').item()
+            bar = TradeBar(end - timedelta(days=1), vix, *series.Bar(i), period=timedelta(days=1))
+            slices.append(Slice(end, {vix: bar}))
+
+        return algorithm, slices
+
+    def SetupPipeline(self):
+        harness = self.SetupHarness()
+        harness.End = self.Start + timedelta(days=self.Days * 7 // 5)
+        harness.Create()
+        return harness
+
+    ##-----------------Startup and annual paths------------------------------------------------------##
+
+    def RunInitialize(self, harness):
+        harness.Create()
+        return harness.Feed.HistoryBars
+
+    def RunQCVix(self, state):
+        algorithm, slices = state
+
+        for data in slices:
+            algorithm.SetDateTime(data.Time)
+            algorithm.QCVix(data)
+
+        return len(slices)
+
+    def RunAnnualRecalc(self, harness, Count=10):
+        algorithm = harness.Algorithm
+        vix = SymbolCache.GetSymbol('VIX.CBOE')
+        bars = harness.Feed.HistoryBars
+
+        for i in range(Count):
+            algorithm.AnnualRecalc(vix)
+
+        return harness.Feed.HistoryBars - bars
+
+    def RunGetGapSignal(self, state, Count=200):
+        harness, alpha, symbolData = state
+
+        for i in range(Count):
+            symbolData.GetGapSignal(harness.Algorithm)
+
+        return Count * len(sys.modules['DailyBarCache'].DailyBarCache.Get(harness.Algorithm, symbolData.Symbol).Close)
+
+    def RunStatBounds(self, state, Count=2000):
+        '''
+        Over a year of closes, so the timing reflects the array work of the alpha's periods rather than the call overhead
+        '''
+        harness, alpha, symbolData = state
+        algorithm = harness.Algorithm
+
+        for i in range(Count):
+            symbolData.StatBounds(algorithm, alpha.FastPeriod, alpha.SlowPeriod, OneYear, alpha.resolution)
+
+        Bars = sys.modules['DailyBarCache'].DailyBarCache.Get(algorithm, symbolData.Symbol)
+        return Count * len(Bars.Close[Bars.Since(algorithm.Time - OneYear)])
+
+    def RunRSIBounds(self, state, Count=200):
+        harness, alpha, symbolData = state
+        Closes = sys.modules['DailyBarCache'].DailyBarCache.Get(harness.Algorithm, symbolData.Symbol).Close
+
+        for i in range(Count):
+            symbolData.RSIBounds(harness.Algorithm, Closes)
+
+        return Count * len(Closes)
+
+    ##-----------------Per bar paths------------------------------------------------------------------##
+
+    def RunCreateTargets(self, state):
+        harness, steps = state
+        algorithm = harness.Algorithm
+        model = algorithm.PortfolioConstruction
+
+        for i, (step, bars) in enumerate(steps):
+            Replay.Prices(algorithm, step, bars)
+            model.CreateTargets(algorithm, Replay.Insights(algorithm, i))
+
+        return sum(len(x[1]) for x in steps)
+
+    def RunExecute(self, state):
+        harness, steps = state
+        algorithm = harness.Algorithm
+        model = algorithm.Execution
+
+        for i, (step, bars) in enumerate(steps):
+            Replay.Prices(algorithm, step, bars)
+            model.Execute(algorithm, Replay.Targets(algorithm, i))
+
+        return sum(len(x[1]) for x in steps)
+
+    def RunManageDrawdownRisk(self, state):
+        return self.RunRisk(state, sys.modules['RiskManagement'].ManageDrawdownRisk())
+
+    def RunTrailingStop(self, state):
+        model = sys.modules['RiskManagement'].TrailingStop(DynamicDrawdown=False, Deviations=1, MinimumRiskTolerance=0.05)
+        model.OnSecuritiesChanged(state[0].Algorithm, SecurityChanges(list(state[0].Algorithm.Securities.values()), []))
+
+        return self.RunRisk(state, model)
+
+    def RunRisk(self, state, model):
+        harness, steps = state
+        algorithm = harness.Algorithm
+
+        for step, bars in steps:
+            Replay.Prices(algorithm, step, bars)
+            model.ManageRisk(algorithm, [])
+
+        return sum(len(x[1]) for x in steps)
+
+    def RunPipeline(self, harness):
+        return harness.Run().Statistics['Bars']
+
+    ##-----------------Running and comparing against the baseline-----------------------------------##
+
+    def Run(self, Names=None):
+        '''
+        Returns the calibration time and the result of each benchmark, with its time as a multiple of the calibration
+        '''
+        self.PrepareData()
+        Loader.Install()
+        calibration = Benchmark('Calibration', Calibration.Setup, Calibration.Run)
+        samples = []
+        results = {}
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+
+            # The calibration is sampled next to every benchmark and the fastest sample kept, like the benchmarks themselves
+            for benchmark in self.Benchmarks:
+                if Names and benchmark.Name not in Names:
+                    continue
+
+                samples.append(calibration.Measure(self.Repeat)['Seconds'])
+                results[benchmark.Name] = benchmark.Measure(self.Repeat)
+
+        samples.append(calibration.Measure(self.Repeat)['Seconds'])
+        seconds = min(samples)
+
+        for name, result in results.items():
+            result['Relative'] = round(result['Seconds'] / seconds, 3)
+            print(BenchmarkSuite.Row(name, result), flush=True)
+
+        print(f'{"Calibration":<20} {seconds:>10.4f}s', flush=True)
+        return seconds, results
+
+    def Row(name, result):
+        return (f"{name:<20} {result['Seconds']:>10.4f}s {result['Relative']:>9.2f}x {result['BarsPerSecond']:>14,.0f} bars/s "
+                f"{result['PeakMemoryMB']:>9.2f} MB")
+
+    def Compare(self, calibration, results, baseline):
+        '''
+        Returns a message for every benchmark slower, relative to the calibration, or larger than the baseline allows
+        '''
+        if baseline.get('Format') != BaselineFormat:
+            return [f'The baseline has format {baseline.get("Format")} instead of {BaselineFormat}. Record a new one with --save']
+
+        regressions = []
+        slack = TimerSlack / calibration
+
+        for name, result in results.items():
+            base = baseline.get('Results', {}).get(name)
+            if base is None:
+                regressions.append(f'{name} has no baseline entry. Record one with --save')
+                continue
+
+            if result['Relative'] > base['Relative'] * (1 + self.Tolerance) + slack:
+                regressions.append(f"{name} took {result['Relative']}x the calibration against a baseline of {base['Relative']}x")
+
+            if result['PeakMemoryMB'] > base['PeakMemoryMB'] * (1 + self.MemoryTolerance) + 1:
+                regressions.append(f"{name} peaked at {result['PeakMemoryMB']} MB against a baseline of {base['PeakMemoryMB']} MB")
+
+        return regressions
+
+    def Baseline(self, calibration, results):
+        '''
+        Only Relative times are compared. Seconds, Machine and Calibration record where the baseline was made
+        '''
+        return {'Format': BaselineFormat, 'Version': Version, 'Machine': platform.platform(), 'Python': platform.python_version(),
+                'Created': datetime.now().isoformat(timespec='seconds'), 'Calibration': calibration, 'Results': results}
+
+
+##-------------------Replays minute bars into the models under test-------------------------##
+
+class Replay:
+
+    def __init__(self):
+        pass
+
+    def Prices(algorithm, step, bars):
+        algorithm.SetDateTime(step)
+        algorithm.Transactions.ProcessPending()
+
+        for symbol, bar in bars.items():
+            algorithm.Securities[symbol].SetMarketPrice(bar)
+
+    def Insights(algorithm, i):
+        '''
+        A new insight every 30 minutes, rotating over the traded tickers and both directions
+        '''
+        if i % 30:
+            return []
+
+        tickers = ['SPXL', 'TQQQ', 'UVXY', 'SPXS', 'SQQQ']
+        ticker = tickers[(i // 30) % len(tickers)]
+        direction = InsightDirection.Down if ticker == 'UVXY' else InsightDirection.Up
+
+        insight = Insight.Price(SymbolCache.GetSymbol(ticker), timedelta(hours=2), direction, None, None, f'{ticker} Alpha Model')
+        insight.SetTimes(algorithm.UtcTime)
+        return [insight]
+
+    def Targets(algorithm, i):
+        '''
+        Every 30 minutes, targets that flip between 20% and 10% of the portfolio in each traded ticker
+        '''
+        if i % 30:
+            return []
+
+        weight = 0.2 if (i // 30) % 2 == 0 else 0.1
+        targets = []
+
+        for ticker in ['SPXL', 'TQQQ', 'UVXY']:
+            target = PortfolioTarget.Percent(algorithm, SymbolCache.GetSymbol(ticker), -weight if ticker == 'UVXY' else weight)
+            if target is not None:
+                targets.append(target)
+
+        return targets
+
+
+##-------------------Command line entry point--------------------------------------------------##
+
+def Main():
+    parser = argparse.ArgumentParser(prog='python -m LocalHarness.Benchmarks', description='Benchmarks the algorithm hot paths')
+    parser.add_argument('--data', help='Folder for the synthetic data. Written on first use')
+    parser.add_argument('--baseline', default=DefaultBaseline, help='Baseline file compared against. Defaults to the committed LocalHarness/benchmark_baseline.json')
+    parser.add_argument('--save', action='store_true', help='Write these results as the baseline instead of comparing against it')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--days', type=int, default=5, help='Minute sessions replayed by the per bar benchmarks')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--memory-tolerance', type=float, default=0.25)
+    parser.add_argument('--strict', action='store_true', help='Exit with 1 on a regression. Without it regressions are only reported')
+    parser.add_argument('names', nargs='*', help='Only run these benchmarks')
+    args = parser.parse_args()
+
+    # A missing baseline is an error, otherwise a fresh checkout would record its own and never report a regression
+    if not args.save and not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}. Record one with --save')
+        return 2
+
+    suite = BenchmarkSuite(args.data, args.repeat, args.tolerance, args.memory_tolerance, args.days)
+    calibration, results = suite.Run(args.names)
+
+    if args.save:
+        with open(args.baseline, 'w') as file:
+            json.dump(suite.Baseline(calibration, results), file, indent=2)
+        print(f'Baseline written to {args.baseline}')
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+
+    regressions = suite.Compare(calibration, results, baseline)
+    for message in regressions:
+        print(f'REGRESSION: {message}')
+
+    if not regressions:
+        print(f"No regressions against the baseline of {baseline.get('Created')}")
+
+    # Timings remain noisy on shared runners even relative to the calibration, so only --strict runs fail on them
+    return 1 if regressions and args.strict else 0
+
+
+if __name__ == '__main__':
+    sys.exit(Main())
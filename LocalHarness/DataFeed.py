@@ -0,0 +1,259 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import os
+import numpy as np
+import pandas as pd
+from datetime import *
+
+from .Types import Resolution, MarketOpen, MarketClose
+
+##-------------------Global variables---------------------------------------------------------##
+
+Columns = ['open', 'high', 'low', 'close', 'volume']
+MinutesPerSession = 390
+DailyEnd = timedelta(days=1)
+
+
+##-------------------Bars of one ticker and resolution held in arrays--------------------------##
+
+class BarSeries:
+    '''
+    Bar end times as datetime64 plus one float array per column, sorted by time
+    '''
+
+    def __init__(self, frame, resolution):
+        times = pd.to_datetime(frame['time']).to_numpy(dtype='datetime64[ns]')
+
+        # Daily rows are dated and their bar ends at midnight, as in LEAN history frames. Minute rows are stamped with the bar start
+        self.Period = np.timedelta64(DailyEnd if resolution == Resolution.Daily else timedelta(minutes=1))
+
+        if resolution == Resolution.Daily:
+            times = times.astype('datetime64[D]').astype('datetime64[ns]')
+
+        times = times + self.Period
+
+        order = np.argsort(times, kind='stable')
+        self.Time = times[order]
+        self.Values = {column: frame[column].to_numpy(dtype=float)[order] if column in frame else np.zeros(len(order))
+                       for column in Columns}
+
+    def __len__(self):
+        return len(self.Time)
+
+    def Range(self, start, end):
+        '''
+        Positions of the bars ending in [start, end]
+        '''
+        return (np.searchsorted(self.Time, np.datetime64(start, 'ns'), side='left'),
+                np.searchsorted(self.Time, np.datetime64(end, 'ns'), side='right'))
+
+    def Before(self, end):
+        '''
+        Position after the last bar ending at or before end
+        '''
+        return np.searchsorted(self.Time, np.datetime64(end, 'ns'), side='right')
+
+    def Bar(self, i):
+        return tuple(float(self.Values[column][i]) for column in Columns)
+
+    def Days(self):
+        '''
+        Session date of each bar
+        '''
+        return (self.Time - self.Period).astype('datetime64[D]')
+
+    def Position(self, day):
+        '''
+        Position of the daily bar of the session date, or None
+        '''
+        end = np.datetime64(datetime.combine(day, time.min), 'ns') + self.Period
+        i = np.searchsorted(self.Time, end, side='left')
+
+        return i if i < len(self.Time) and self.Time[i] == end else None
+
+
+##-------------------Loads bars from disk and answers History requests-----------------------##
+
+class DataFeed:
+    '''
+    Reads <folder>/daily/<ticker>.csv|.parquet and <folder>/minute/<ticker>.csv|.parquet with a time column and
+    open, high, low, close and volume. Tickers are the lower case symbol value before any '.', so the custom
+    'VIX.CBOE' data and the 'VIX' index share vix.csv.
+
+    Minute bars are synthesized from the daily bar when a minute file is missing: the path runs open, low, high,
+    close on up days and open, high, low, close on down days, and volume is spread evenly over the session.
+    '''
+
+    def __init__(self, folder):
+        self.Folder = folder
+        self.Series = {}
+        self.HistoryRequests = 0
+        self.HistoryBars = 0
+        self.SynthesizedDays = {}
+
+    def Ticker(symbol):
+        return str(symbol).split('.')[0].lower()
+
+    def Load(self, symbol, resolution):
+        key = (DataFeed.Ticker(symbol), Resolution.Daily if resolution == Resolution.Daily else Resolution.Minute)
+
+        if key not in self.Series:
+            folder = os.path.join(self.Folder, 'daily' if key[1] == Resolution.Daily else 'minute')
+            self.Series[key] = None
+
+            for extension in ('.parquet', '.csv'):
+                path = os.path.join(folder, key[0] + extension)
+                if os.path.exists(path):
+                    frame = pd.read_parquet(path) if extension == '.parquet' else pd.read_csv(path)
+                    frame.columns = [str(x).lower() for x in frame.columns]
+                    self.Series[key] = BarSeries(frame, key[1])
+                    break
+
+        return self.Series[key]
+
+    def HasMinuteData(self, symbol):
+        return self.Load(symbol, Resolution.Minute) is not None
+
+    ##-----------------History frames indexed by (symbol, time) like the LEAN python wrapper----##
+
+    def History(self, symbols, start, end, resolution, count=None):
+        '''
+        Bars ending in [start, end], or the last count bars ending at or before end. Minute requests without
+        minute files are answered from synthesized bars
+        '''
+        self.HistoryRequests += 1
+        frames = []
+
+        for symbol in symbols:
+            if resolution == Resolution.Daily or self.HasMinuteData(symbol):
+                series = self.Load(symbol, resolution)
+                if series is None:
+                    continue
+
+                if count is None:
+                    first, last = series.Range(start, end)
+                else:
+                    last = series.Before(end)
+                    first = max(last - count, 0)
+
+                times, values = series.Time[first:last], {column: series.Values[column][first:last] for column in Columns}
+
+            else:
+                times, values = self.SynthesizedRange(symbol, start, end, count)
+
+            if len(times) == 0:
+                continue
+
+            self.HistoryBars += len(times)
+            index = pd.MultiIndex.from_arrays([[symbol] * len(times), pd.DatetimeIndex(times)], names=['symbol', 'time'])
+            frames.append(pd.DataFrame(values, index=index))
+
+        if not frames:
+            return pd.DataFrame(columns=Columns)
+
+        return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+    ##-----------------Minute bars for one session----------------------------------------------##
+
+    def SessionBars(self, symbol, day):
+        '''
+        Returns (end times, open, high, low, close, volume) arrays of the session, or None without data for the day
+        '''
+        minute = self.Load(symbol, Resolution.Minute)
+
+        if minute is not None:
+            first, last = minute.Range(datetime.combine(day, MarketOpen), datetime.combine(day, MarketClose))
+            if first == last:
+                return None
+
+            return (minute.Time[first:last],) + tuple(minute.Values[column][first:last] for column in Columns)
+
+        key = (DataFeed.Ticker(symbol), day)
+        if key not in self.SynthesizedDays:
+            # Only the current session is kept
+            if len(self.SynthesizedDays) > 64:
+                self.SynthesizedDays = {}
+
+            self.SynthesizedDays[key] = self.Synthesize(symbol, day)
+
+        return self.SynthesizedDays[key]
+
+    def Synthesize(self, symbol, day):
+        daily = self.Load(symbol, Resolution.Daily)
+        if daily is None:
+            return None
+
+        i = daily.Position(day)
+        if i is None:
+            return None
+
+        o, h, l, c, v = daily.Bar(i)
+        anchors = [o, l, h, c] if c >= o else [o, h, l, c]
+        path = np.interp(np.arange(MinutesPerSession + 1), [0, 130, 260, MinutesPerSession], anchors)
+
+        opens, closes = path[:-1], path[1:]
+        times = np.datetime64(datetime.combine(day, MarketOpen), 'ns') + np.arange(1, MinutesPerSession + 1) * np.timedelta64(1, 'm')
+
+        return (times, opens, np.maximum(opens, closes), np.minimum(opens, closes), closes,
+                np.full(MinutesPerSession, v / MinutesPerSession))
+
+    def SynthesizedRange(self, symbol, start, end, count):
+        daily = self.Load(symbol, Resolution.Daily)
+        if daily is None:
+            return np.array([], dtype='datetime64[ns]'), {}
+
+        if count is not None:
+            last = daily.Before(end)
+            first = max(last - (count // MinutesPerSession + 2), 0)
+        else:
+            first, last = daily.Range(datetime.combine(start.date(), time.min) + DailyEnd, datetime.combine(end.date(), time.min) + DailyEnd)
+
+        sessions = [self.Synthesize(symbol, x.item()) for x in daily.Days()[first:last]]
+        sessions = [x for x in sessions if x is not None]
+        if not sessions:
+            return np.array([], dtype='datetime64[ns]'), {}
+
+        times = np.concatenate([x[0] for x in sessions])
+        values = {column: np.concatenate([x[i + 1] for x in sessions]) for i, column in enumerate(Columns)}
+
+        keep = times <= np.datetime64(end, 'ns')
+        if count is None:
+            keep &= times >= np.datetime64(start, 'ns')
+
+        times, values = times[keep], {column: array[keep] for column, array in values.items()}
+        if count is not None:
+            times, values = times[-count:], {column: array[-count:] for column, array in values.items()}
+
+        return times, values
+
+    ##-----------------Calendar derived from the loaded equity data-----------------------------##
+
+    def TradingDays(self, symbols=None):
+        '''
+        Dates holding a daily bar for any of the symbols, or for any daily file when symbols is None
+        '''
+        if symbols is None:
+            folder = os.path.join(self.Folder, 'daily')
+            symbols = sorted({os.path.splitext(x)[0] for x in os.listdir(folder)}) if os.path.isdir(folder) else []
+
+        days = set()
+
+        for symbol in symbols:
+            daily = self.Load(symbol, Resolution.Daily)
+            if daily is not None:
+                days.update(x.item() for x in np.unique(daily.Days()))
+
+        return days
+
+    def DailyBar(self, symbol, day):
+        daily = self.Load(symbol, Resolution.Daily)
+        if daily is None:
+            return None
+
+        i = daily.Position(day)
+        return daily.Bar(i) if i is not None else None
+
+    def LastDay(self, symbols):
+        days = [self.Load(symbol, Resolution.Daily).Days()[-1].item() for symbol in symbols
+                if self.Load(symbol, Resolution.Daily) is not None and len(self.Load(symbol, Resolution.Daily))]
+        return max(days) if days else None
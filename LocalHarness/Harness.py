@@ -0,0 +1,321 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import sys
+import time as clock
+import numpy as np
+from datetime import *
+
+from .Types import *
+from .DataFeed import DataFeed
+from .Algorithm import ObjectStore
+from .Loader import Loader, Root
+
+##-------------------Global variables---------------------------------------------------------##
+
+Zero = int(0)
+
+
+##-------------------Summary of one local run--------------------------------------------------##
+
+class BacktestResult:
+
+    def __init__(self, algorithm, statistics, equity):
+        self.Algorithm = algorithm
+        self.Statistics = statistics
+        self.Equity = equity
+        self.Logs = algorithm.Logs
+        self.Plots = algorithm.Plots
+        self.Fills = algorithm.Transactions.Fills
+
+    def Summary(self):
+        return ' | '.join(f'{key}: {value}' for key, value in self.Statistics.items())
+
+
+##-------------------Drives the algorithm over the bars on disk--------------------------------##
+
+class Harness:
+    '''
+    Runs a QCAlgorithm subclass, by default main.AdvancedIndexing, through the framework pipeline of LEAN on local bars:
+    scheduled events, OnData, alpha Update, CreateTargets, ManageRisk and Execute at every time step, with fills at the
+    security price and order events sent to the algorithm, which forwards them to its models.
+
+        DataFolder: Folder holding the daily and minute bar files read by DataFeed
+        Start, End: Override the dates set in Initialize. Runs end at the last loaded daily bar at the latest
+        Cash: Overrides SetCash
+        StepResolution: Resolution.Minute steps every minute of each session, Resolution.Daily only the close
+        Parameters: Values returned by GetParameter
+        ObjectStoreFolder: Mirrors the ObjectStore to a folder so snapshots survive between runs
+        FeePerShare, MinimumFee: Interactive Brokers style fees. Zero by default
+        Verbose: Print logs as they are written
+    '''
+
+    def __init__(self, DataFolder, Start=None, End=None, Cash=None, StepResolution=Resolution.Minute, Parameters=None,
+                 ObjectStoreFolder=None, FeePerShare=0, MinimumFee=0, Verbose=False, AlgorithmClass=None, Root=Root):
+        self.DataFolder = DataFolder
+        self.Start = Harness.AsDateTime(Start)
+        self.End = Harness.AsDateTime(End)
+        self.Cash = Cash
+        self.StepResolution = StepResolution
+        self.Parameters = Parameters or {}
+        self.ObjectStoreFolder = ObjectStoreFolder
+        self.FeePerShare = FeePerShare
+        self.MinimumFee = MinimumFee
+        self.Verbose = Verbose
+        self.Root = Root
+        self.AlgorithmClass = AlgorithmClass
+
+        self.Algorithm = None
+        self.Feed = None
+        self.Steps = 0
+        self.Bars = 0
+        self.Insights = 0
+        self.Targets = 0
+
+    def AsDateTime(value):
+        if value is None or isinstance(value, datetime):
+            return value
+
+        if isinstance(value, date):
+            return datetime.combine(value, time.min)
+
+        return datetime.fromisoformat(str(value))
+
+    ##-----------------Builds and initializes the algorithm----------------------------------------##
+
+    def Create(self):
+        '''
+        Resets the process wide state, creates the algorithm and runs Initialize. Returns the algorithm
+        '''
+        Loader.Install(self.Root)
+        Harness.ResetState()
+
+        if self.AlgorithmClass is None:
+            self.AlgorithmClass = Loader.LoadAlgorithm(self.Root)
+
+        self.Feed = DataFeed(self.DataFolder)
+        self.Steps = self.Bars = self.Insights = self.Targets = 0
+
+        algorithm = self.AlgorithmClass()
+        algorithm.Harness = self
+        algorithm.DataFeed = self.Feed
+        algorithm.Parameters = dict(self.Parameters)
+        algorithm.Verbose = self.Verbose
+        algorithm.FeeModel = self.Fee
+        algorithm.ObjectStore = ObjectStore(self.ObjectStoreFolder)
+
+        if self.Start is not None:
+            algorithm.SetDateTime(self.Start)
+
+        # The exchange calendar follows the days of the data, which Initialize already relies on
+        ExchangeHours.SetTradingDays(self.Feed.TradingDays())
+
+        self.Algorithm = algorithm
+        algorithm.Initialize()
+
+        # LEAN fixes the free buffer from the starting portfolio value once Initialize returns
+        algorithm.Settings.FreePortfolioValue = float(algorithm.Portfolio.TotalPortfolioValue) * float(algorithm.Settings.FreePortfolioValuePercentage)
+
+        self.Universe = self.UniverseSecurities(algorithm)
+        changes = SecurityChanges(self.Universe, [])
+
+        for model in algorithm.Alphas + [algorithm.PortfolioConstruction, algorithm.RiskManagement, algorithm.Execution]:
+            model.OnSecuritiesChanged(algorithm, changes)
+
+        return algorithm
+
+    def ResetState():
+        '''
+        Clears the class level state that outlives an algorithm in this process
+        '''
+        SymbolCache.Reset()
+        ExchangeHours.SetTradingDays([])
+
+        for name, attribute in (('TradingCalendar', 'Calendars'), ('RecalcScheduler', 'Providers')):
+            if name in sys.modules:
+                setattr(getattr(sys.modules[name], name), attribute, {})
+
+    def UniverseSecurities(self, algorithm):
+        symbols = []
+        for model in algorithm.UniverseSelection:
+            symbols.extend(x for x in model.Symbols if x not in symbols)
+
+        # Securities added directly are part of the user defined universe
+        symbols.extend(x for x in algorithm.Securities.keys() if x not in symbols)
+
+        return [algorithm.Securities[x] for x in symbols]
+
+    def Fee(self, quantity, price):
+        if not self.FeePerShare:
+            return float(0)
+
+        return max(float(self.MinimumFee), abs(quantity) * float(self.FeePerShare))
+
+    ##-----------------Time loop--------------------------------------------------------------------##
+
+    def Run(self):
+        algorithm = self.Create() if self.Algorithm is None else self.Algorithm
+        started = clock.perf_counter()
+
+        # Runs stop at the last loaded daily bar
+        end = self.End or algorithm.EndDate
+        lastDay = self.Feed.LastDay([x.Symbol for x in algorithm.Securities.values()])
+
+        if lastDay is not None and (end is None or end.date() > lastDay):
+            end = datetime.combine(lastDay, time.min)
+        elif end is None:
+            end = algorithm.Time
+
+        equity = []
+        day = algorithm.Time.date()
+
+        while day <= end.date():
+            if MarketHoursDatabase.Hours.IsDateOpen(day):
+                self.RunDay(algorithm, day)
+                equity.append((day, float(algorithm.Portfolio.TotalPortfolioValue)))
+
+            day += timedelta(days=1)
+
+        algorithm.OnEndOfAlgorithm()
+        elapsed = clock.perf_counter() - started
+
+        statistics = {
+            'Days': len(equity),
+            'Steps': self.Steps,
+            'Bars': self.Bars,
+            'Insights': self.Insights,
+            'Targets': self.Targets,
+            'Orders': len(algorithm.Transactions.Tickets),
+            'Fills': len(algorithm.Transactions.Fills),
+            'History Requests': self.Feed.HistoryRequests,
+            'Seconds': round(elapsed, 3),
+            'Bars/Second': round(self.Bars / elapsed, 1) if elapsed else float(0),
+            'Final Value': round(float(algorithm.Portfolio.TotalPortfolioValue), 2),
+            'Fees': round(algorithm.Portfolio.TotalFees, 2)}
+
+        return BacktestResult(algorithm, statistics, equity)
+
+    def RunDay(self, algorithm, day):
+        events = algorithm.Schedule.Day(day)
+        close = datetime.combine(day, MarketClose)
+
+        # Session bars of every minute subscription, aligned on the minute grid
+        sessions = {}
+        if self.StepResolution != Resolution.Daily:
+            for security in algorithm.Securities.values():
+                if security.Resolution != Resolution.Daily:
+                    bars = self.Feed.SessionBars(security.Symbol, day)
+                    if bars is not None:
+                        sessions[security.Symbol] = Harness.Grid(bars, day)
+
+            steps = [datetime.combine(day, MarketOpen) + timedelta(minutes=i) for i in range(1, 391)]
+        else:
+            steps = [close]
+
+        for i, step in enumerate(steps):
+            events = self.FireEvents(algorithm, events, step)
+            bars = {}
+
+            for symbol, session in sessions.items():
+                if session[i] is not None:
+                    bars[symbol] = TradeBar(step - timedelta(minutes=1), symbol, *session[i])
+
+            if step == close:
+                bars.update(self.CloseBars(algorithm, day, sessions))
+
+            self.Step(algorithm, step, bars)
+
+        self.FireEvents(algorithm, events, datetime.combine(day, time.max))
+
+    def Grid(bars, day):
+        '''
+        Maps the session bars onto the 390 minute steps. Minutes without a bar hold None
+        '''
+        times, opens, highs, lows, closes, volumes = bars
+        grid = [None] * 390
+        start = np.datetime64(datetime.combine(day, MarketOpen), 'ns')
+        positions = ((times - start) // np.timedelta64(1, 'm')).astype(int) - 1
+
+        for j, position in enumerate(positions):
+            if 0 <= position < 390:
+                grid[position] = (float(opens[j]), float(highs[j]), float(lows[j]), float(closes[j]), float(volumes[j]))
+
+        return grid
+
+    def CloseBars(self, algorithm, day, sessions):
+        '''
+        Daily bars of the daily subscriptions, and of every symbol when stepping daily
+        '''
+        bars = {}
+
+        for security in algorithm.Securities.values():
+            if security.Symbol in sessions:
+                continue
+
+            bar = self.Feed.DailyBar(security.Symbol, day)
+            if bar is not None:
+                bars[security.Symbol] = TradeBar(datetime.combine(day, time.min), security.Symbol, *bar, period=timedelta(days=1))
+
+        return bars
+
+    def FireEvents(self, algorithm, events, until):
+        while events and events[0][0] <= until:
+            when, sequence, callback = events.pop(0)
+            algorithm.SetDateTime(when)
+            callback()
+
+        return events
+
+    def Step(self, algorithm, step, bars):
+        algorithm.SetDateTime(step)
+        algorithm.Transactions.ProcessPending()
+
+        for symbol, bar in bars.items():
+            algorithm.Securities[symbol].SetMarketPrice(bar)
+
+            for consolidator in algorithm.SubscriptionManager.Consolidators.get(symbol, []):
+                consolidator.Update(bar)
+
+        self.UpdateIndicators(algorithm, step, bars)
+
+        self.Steps += 1
+        self.Bars += len(bars)
+
+        algorithm.OnData(Slice(step, bars))
+
+        # Framework pipeline
+        insights = []
+        for alpha in algorithm.Alphas:
+            for insight in alpha.Update(algorithm, Slice(step, bars)) or []:
+                if insight.SourceModel is None:
+                    insight.SourceModel = getattr(alpha, 'Name', type(alpha).__name__)
+                insight.SetTimes(algorithm.UtcTime)
+                insights.append(insight)
+
+        self.Insights += len(insights)
+
+        targets = algorithm.PortfolioConstruction.CreateTargets(algorithm, insights) or []
+        riskTargets = algorithm.RiskManagement.ManageRisk(algorithm, targets) or []
+
+        # Risk targets replace the targets of the same symbols
+        if riskTargets:
+            risked = {x.Symbol for x in riskTargets}
+            targets = [x for x in targets if x.Symbol not in risked] + list(riskTargets)
+
+        self.Targets += len(targets)
+        algorithm.Execution.Execute(algorithm, targets)
+
+    def UpdateIndicators(self, algorithm, step, bars):
+        if not algorithm.Indicators:
+            return
+
+        for symbol, resolution, indicator in algorithm.Indicators:
+            if resolution == Resolution.Daily:
+                if step.time() != MarketClose:
+                    continue
+
+                bar = self.Feed.DailyBar(symbol, step.date())
+                if bar is not None:
+                    indicator.Update(step, bar[3])
+
+            elif symbol in bars:
+                indicator.Update(bars[symbol].EndTime, bars[symbol].Close)
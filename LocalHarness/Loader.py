@@ -0,0 +1,147 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import builtins
+import importlib.util
+import os
+import sys
+import types
+from datetime import timedelta
+
+from . import Types
+from . import Algorithm
+
+##-------------------Global variables---------------------------------------------------------##
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+Namespaces = [
+    'System', 'QuantConnect', 'QuantConnect.Algorithm', 'QuantConnect.Algorithm.Framework', 'QuantConnect.Algorithm.Framework.Alphas',
+    'QuantConnect.Algorithm.Framework.Portfolio', 'QuantConnect.Algorithm.Framework.Risk', 'QuantConnect.Algorithm.Framework.Execution',
+    'QuantConnect.Algorithm.Framework.Selection', 'QuantConnect.Data', 'QuantConnect.Data.Market', 'QuantConnect.Data.Custom',
+    'QuantConnect.Data.Custom.CBOE', 'QuantConnect.Data.Consolidators', 'QuantConnect.Data.UniverseSelection', 'QuantConnect.Orders',
+    'QuantConnect.Orders.Fees', 'QuantConnect.Securities', 'QuantConnect.Indicators', 'QuantConnect.Brokerages', 'AlgorithmImports']
+
+# Modules imported under a name that differs from their file
+Aliases = {
+    'LevQ': 'LevQ-Git.py',
+    'ImmediateExecution': 'Immediate Execution.py'}
+
+
+##-------------------Installs the QuantConnect stand-ins and the project modules--------------##
+
+class Loader:
+    '''
+    Registers fake clr, System and QuantConnect modules that all expose every stand-in name, and publishes the same
+    names as builtins because the cloud injects them into modules, such as Global.py, that import nothing.
+
+    Project files whose module name differs from the file name are loaded by path, and the private modules main.py
+    imports but the repository does not hold (LevSpy, LevVix, LimitOrderExecutionModel, ProfitCapture) are
+    replaced by placeholders when their files are missing.
+    '''
+
+    Installed = False
+
+    def __init__(self):
+        pass
+
+    def Names():
+        modules = (Types.__name__, Algorithm.__name__)
+        names = {name: value for module in (Types, Algorithm) for name, value in vars(module).items()
+                 if not name.startswith('_') and getattr(value, '__module__', None) in modules}
+        names['Object'] = object
+        names['QCAlgorithm'] = Algorithm.QCAlgorithm
+
+        return names
+
+    def Install(root=Root):
+        if Loader.Installed:
+            return
+
+        names = Loader.Names()
+
+        clr = types.ModuleType('clr')
+        clr.AddReference = lambda *args: None
+        sys.modules['clr'] = clr
+
+        for namespace in Namespaces:
+            module = types.ModuleType(namespace)
+            module.__dict__.update(names)
+            sys.modules[namespace] = module
+
+        for name, value in names.items():
+            if not hasattr(builtins, name):
+                setattr(builtins, name, value)
+
+        if root not in sys.path:
+            sys.path.insert(0, root)
+
+        for name, file in Aliases.items():
+            if name not in sys.modules and os.path.exists(os.path.join(root, file)):
+                Loader.LoadFile(name, os.path.join(root, file))
+
+        Loader.InstallPlaceholders(root)
+        Loader.Installed = True
+
+    def LoadFile(name, path):
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+
+        return module
+
+    def LoadAlgorithm(root=Root, module='main', name='AdvancedIndexing'):
+        Loader.Install(root)
+
+        if module not in sys.modules:
+            Loader.LoadFile(module, os.path.join(root, module + '.py'))
+
+        return getattr(sys.modules[module], name)
+
+    ##-----------------Placeholders for the private modules---------------------------------------##
+
+    def InstallPlaceholders(root):
+        placeholders = {
+            'LevSpy': {'SPXL': Loader.DailyInsightAlpha('SPXL', Types.InsightDirection.Up, 'SPXL Alpha Model'),
+                       'SPXS': Loader.DailyInsightAlpha(None, None, 'SPXS Alpha Model')},
+            'LevVix': {'ShortVol': Loader.DailyInsightAlpha('UVXY', Types.InsightDirection.Down, 'Short UVXY Alpha Model'),
+                       'LongVol': Loader.DailyInsightAlpha(None, None, 'Long UVXY Alpha Model')},
+            'LimitOrderExecutionModel': {'LimitOrderExecutionModel': None},
+            'ProfitCapture': {'ProfitCapture': Types.NullRiskManagementModel}}
+
+        for name, classes in placeholders.items():
+            if name in sys.modules or os.path.exists(os.path.join(root, name + '.py')):
+                continue
+
+            module = types.ModuleType(name)
+            module.__dict__.update(classes)
+
+            # The limit order model stands in as the immediate execution model
+            if name == 'LimitOrderExecutionModel':
+                module.LimitOrderExecutionModel = sys.modules['ImmediateExecution'].ImmediateExecutionModel if 'ImmediateExecution' in sys.modules else Types.ExecutionModel
+
+            sys.modules[name] = module
+
+    def DailyInsightAlpha(ticker, direction, name):
+        '''
+        Builds a placeholder alpha that emits one insight on the ticker shortly after each open, or none without a ticker.
+        It only exercises portfolio construction, execution and risk; it is not the strategy of the private models
+        '''
+
+        class DailyInsightAlpha(Types.AlphaModel):
+
+            def __init__(self, *args):
+                self.Name = name
+                self.Day = None
+
+            def Update(self, algorithm, data):
+                Global = sys.modules['Global'].Global
+
+                if ticker is None or not Global.MarketIsOpen or algorithm.Time.date() == self.Day:
+                    return []
+
+                self.Day = algorithm.Time.date()
+                return [Types.Insight.Price(Types.SymbolCache.GetSymbol(ticker), timedelta(hours=6), direction)]
+
+        DailyInsightAlpha.__name__ = name.replace(' ', '')
+        return DailyInsightAlpha
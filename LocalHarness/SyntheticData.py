@@ -0,0 +1,123 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import os
+import numpy as np
+import pandas as pd
+from datetime import *
+
+##-------------------Global variables---------------------------------------------------------##
+
+# Annual drift and volatility of the synthetic underlyings and the leverage of each traded ticker
+Underlyings = {'SPX': (0.07, 0.18), 'NDX': (0.09, 0.24)}
+Tickers = {
+    'SPXL': ('SPX', 3), 'SPXS': ('SPX', -3), 'TQQQ': ('NDX', 3), 'SQQQ': ('NDX', -3)}
+
+
+##-------------------Writes reproducible bar files for the local harness-----------------------##
+
+class SyntheticData:
+    '''
+    Daily bars for the leveraged ETFs from two geometric Brownian motion underlyings, a mean reverting VIX
+    that rises when the S&P falls, and UVXY as a decaying leveraged VIX future. The same seed always writes the
+    same files, so local runs and benchmarks are comparable. Minute files are only written on request because
+    the harness otherwise synthesizes minute bars from the daily ones.
+    '''
+
+    def __init__(self):
+        pass
+
+    def Days(start, end):
+        days = pd.bdate_range(start, end)
+
+        # Fixed date holidays keep the calendar from being pure weekdays
+        return days[~((days.month == 1) & (days.day == 1)) & ~((days.month == 12) & (days.day == 25))
+                    & ~((days.month == 7) & (days.day == 4))]
+
+    def Write(folder, start=date(1998, 1, 1), end=date(2021, 12, 31), seed=7, MinuteTickers=(), MinuteStart=None, Format='csv'):
+        '''
+        Writes <folder>/daily/<ticker>.<Format> for VIX, UVXY and the leveraged ETFs, plus minute files for MinuteTickers
+        covering the sessions from MinuteStart, or every session when it is None. Returns the trading days written
+        '''
+        rng = np.random.default_rng(seed)
+        days = SyntheticData.Days(start, end)
+        count = len(days)
+        dt = 1 / 252
+
+        returns = {}
+        for name, (drift, volatility) in Underlyings.items():
+            returns[name] = (drift - volatility ** 2 / 2) * dt + volatility * np.sqrt(dt) * rng.standard_normal(count)
+
+        # VIX mean reverts around 19 and moves against the S&P
+        vix = np.empty(count)
+        vix[0] = 19
+        shocks = rng.standard_normal(count)
+        for i in range(1, count):
+            vix[i] = max(9, vix[i - 1] + 4 * (19 - vix[i - 1]) * dt - 120 * returns['SPX'][i] + 1.2 * shocks[i] * np.sqrt(vix[i - 1]) * np.sqrt(dt) * 4)
+
+        closes = {'VIX': vix}
+        for ticker, (underlying, leverage) in Tickers.items():
+            closes[ticker] = 50 * np.exp(np.cumsum(np.clip(leverage * returns[underlying], -0.95, None)))
+
+        # UVXY follows 1.5x the VIX moves with a contango decay, priced back from its last close like split adjusted data
+        path = np.cumsum(1.5 * np.concatenate(([0], np.diff(np.log(vix)))) - 0.001)
+        closes['UVXY'] = 20 * np.exp(path - path[-1])
+
+        frames = {}
+        for ticker, close in closes.items():
+            frames[ticker] = SyntheticData.DailyFrame(rng, days, close)
+            SyntheticData.Save(frames[ticker], os.path.join(folder, 'daily'), ticker, Format)
+
+        for ticker in MinuteTickers:
+            daily = frames[ticker] if MinuteStart is None else frames[ticker][days >= pd.Timestamp(MinuteStart)]
+            SyntheticData.Save(SyntheticData.MinuteFrame(rng, daily), os.path.join(folder, 'minute'), ticker, Format)
+
+        return days
+
+    def DailyFrame(rng, days, close):
+        previous = np.concatenate(([close[0]], close[:-1]))
+        open = previous * np.exp(0.004 * rng.standard_normal(len(close)))
+        spread = np.abs(0.012 * rng.standard_normal(len(close)))
+
+        return pd.DataFrame({
+            'time': days.strftime('%Y-%m-%d'),
+            'open': np.round(open, 4),
+            'high': np.round(np.maximum(open, close) * (1 + spread), 4),
+            'low': np.round(np.minimum(open, close) * (1 - spread), 4),
+            'close': np.round(close, 4),
+            'volume': rng.integers(1000000, 5000000, len(close))})
+
+    def MinuteFrame(rng, daily):
+        '''
+        A Brownian bridge from each open to each close over the 390 minutes of the session, stamped with the bar start
+        '''
+        minutes = 390
+        frames = []
+
+        for row in daily.itertuples(index=False):
+            steps = rng.standard_normal(minutes) * 0.0006
+            walk = np.cumsum(steps)
+            bridge = walk - np.linspace(0, 1, minutes) * walk[-1]
+            path = np.exp(np.linspace(np.log(row.open), np.log(row.close), minutes + 1)[1:] + bridge)
+            opens = np.concatenate(([row.open], path[:-1]))
+
+            start = np.datetime64(row.time + 'T09:30')
+            frames.append(pd.DataFrame({
+                'time': start + np.arange(minutes) * np.timedelta64(1, 'm'),
+                'open': np.round(opens, 4),
+                'high': np.round(np.maximum(opens, path), 4),
+                'low': np.round(np.minimum(opens, path), 4),
+                'close': np.round(path, 4),
+                'volume': np.full(minutes, row.volume // minutes)}))
+
+        return pd.concat(frames, ignore_index=True)
+
+    def Save(frame, folder, ticker, Format):
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, ticker.lower() + '.' + Format)
+
+        if Format == 'parquet':
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False)
+
+        return path
@@ -0,0 +1,61 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import os
+import sys
+import tempfile
+from datetime import *
+
+from ..Harness import Harness
+from ..Loader import Loader
+from ..SyntheticData import SyntheticData
+from ..Types import TradeBar
+
+##-------------------Global variables---------------------------------------------------------##
+
+Version = 1
+DataStart = date(2014, 1, 1)
+DataEnd = date(2021, 3, 31)
+Start = datetime(2021, 1, 4)
+
+
+##-------------------Shared synthetic data and project modules for the tests--------------------##
+
+class Fixtures:
+    '''
+    Daily synthetic bars written once to the temporary folder and reused by every test run
+    '''
+
+    def __init__(self):
+        pass
+
+    def DataFolder():
+        folder = os.path.join(tempfile.gettempdir(), f'AdvancedIndexingTests-v{Version}')
+
+        if not os.path.isdir(os.path.join(folder, 'daily')):
+            SyntheticData.Write(folder, start=DataStart, end=DataEnd)
+
+        return folder
+
+    def Module(name):
+        '''
+        Returns a project module loaded against the QuantConnect stand-ins
+        '''
+        Loader.Install()
+        __import__(name)
+
+        return sys.modules[name]
+
+    def Algorithm(Start=Start):
+        '''
+        Returns an initialized algorithm with every security priced at the close of the last trading day before Start
+        '''
+        harness = Harness(Fixtures.DataFolder(), Start=Start)
+        algorithm = harness.Create()
+        previous = max(day for day in harness.Feed.TradingDays() if day < Start.date())
+
+        for security in algorithm.Securities.values():
+            bar = harness.Feed.DailyBar(security.Symbol, previous)
+            if bar:
+                security.SetMarketPrice(TradeBar(datetime.combine(previous, time.min), security.Symbol, *bar, period=timedelta(days=1)))
+
+        return algorithm
@@ -0,0 +1,4 @@
+'''
+Behaviour tests of the optimized components against the implementations they replaced, run from the project folder with
+python -m pytest LocalHarness/Tests or python -m unittest discover -s LocalHarness/Tests -t .
+'''
@@ -0,0 +1,120 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import unittest
+import numpy as np
+from datetime import *
+from itertools import groupby
+
+from .Fixtures import Fixtures
+from ..Types import Insight, InsightCollection, InsightDirection, Symbol
+
+##-------------------Global variables---------------------------------------------------------##
+
+Tickers = ('SPXL', 'SPXS', 'TQQQ', 'UVXY')
+Models = ('SPXL Alpha Model', 'TQQQ Alpha Model', 'Short UVXY Alpha Model')
+
+
+##-------------------InsightIndex against the group-and-sort over an InsightCollection---------##
+
+class TestInsightIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.Index = Fixtures.Module('InsightIndex').InsightIndex
+        self.Random = np.random.default_rng(11)
+        self.Start = datetime(2021, 1, 4, 14, 30)
+
+    def Baseline(collection, utcTime, SourceModel=None):
+        '''
+        Latest active insight of each symbol the way the portfolio construction model used to find it
+        '''
+        active = [x for x in collection.GetActiveInsights(utcTime) if SourceModel is None or x.SourceModel == SourceModel]
+        active = sorted(active, key=lambda x: str(x.Symbol))
+
+        return [sorted(g, key=lambda x: x.GeneratedTimeUtc)[-1] for symbol, g in groupby(active, lambda x: x.Symbol)]
+
+    def NewInsights(self, utcTime):
+        insights = []
+
+        for i in range(self.Random.integers(0, 4)):
+            insight = Insight.Price(Symbol(str(self.Random.choice(Tickers))),
+                                    timedelta(minutes=int(self.Random.integers(1, 90))), InsightDirection.Up, None, None,
+                                    str(self.Random.choice(Models)))
+            # Generated between the steps so no close time falls on a step
+            insight.SetTimes(utcTime - timedelta(seconds=10))
+            insights.append(insight)
+
+        return insights
+
+    def Ids(insights):
+        return sorted(str(x.Id) for x in insights)
+
+    def testMatchesCollection(self):
+        index = self.Index()
+        collection = InsightCollection()
+
+        for step in range(600):
+            utcTime = self.Start + timedelta(minutes=step)
+
+            self.assertEqual(TestInsightIndex.Ids(index.RemoveExpired(utcTime)),
+                             TestInsightIndex.Ids(collection.RemoveExpiredInsights(utcTime)))
+
+            insights = self.NewInsights(utcTime)
+            index.AddRange(insights)
+            collection.AddRange(insights)
+
+            self.assertEqual(index.Count(), len(collection))
+            self.assertEqual(index.NextExpiryTime(), collection.GetNextExpiryTime())
+            self.assertEqual(TestInsightIndex.Ids(index.LatestActive()),
+                             TestInsightIndex.Ids(TestInsightIndex.Baseline(collection, utcTime)))
+
+            for model in Models:
+                self.assertEqual(TestInsightIndex.Ids(index.LatestActive(model)),
+                                 TestInsightIndex.Ids(TestInsightIndex.Baseline(collection, utcTime, model)))
+
+            for ticker in Tickers:
+                symbol = Symbol(ticker)
+                self.assertEqual(index.HasActiveInsights(symbol), collection.HasActiveInsights(symbol, utcTime))
+
+    def testSameGenerationTimeKeepsLastAdded(self):
+        index = self.Index()
+        first, second = [Insight.Price(Symbol('TQQQ'), timedelta(hours=1), InsightDirection.Up, None, None, Models[1])
+                         for i in range(2)]
+        first.SetTimes(self.Start)
+        second.SetTimes(self.Start)
+        index.AddRange([first, second, first])
+
+        self.assertEqual(index.Count(), 2)
+        self.assertIs(index.LatestActive()[0], second)
+
+    def testRemove(self):
+        index = self.Index()
+        insight = Insight.Price(Symbol('SPXL'), timedelta(hours=1), InsightDirection.Up, None, None, Models[0])
+        insight.SetTimes(self.Start)
+        index.Add(insight)
+
+        self.assertTrue(index.Remove(insight))
+        self.assertFalse(index.Remove(insight))
+        self.assertEqual(index.LatestActive(), [])
+        self.assertIsNone(index.NextExpiryTime())
+
+    def testRemoveLatestRestoresPrevious(self):
+        index = self.Index()
+        insights = [Insight.Price(Symbol('TQQQ'), timedelta(hours=1), InsightDirection.Up, None, None, Models[1])
+                    for i in range(3)]
+        for i, insight in enumerate(insights):
+            insight.SetTimes(self.Start + timedelta(minutes=i))
+        index.AddRange(insights)
+
+        index.Remove(insights[2])
+        self.assertIs(index.LatestActive(Models[1])[0], insights[1])
+
+        # Re-adding a removed insight indexes it again instead of reviving its stale entries
+        index.Remove(insights[1])
+        index.Add(insights[2])
+        self.assertIs(index.LatestActive()[0], insights[2])
+        self.assertEqual(index.RemoveExpired(self.Start + timedelta(hours=2)), [insights[0], insights[2]])
+        self.assertFalse(index.HasActiveInsights(Symbol('TQQQ')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import unittest
+from datetime import *
+
+from .Fixtures import Fixtures
+from ..Types import Insight, InsightDirection, PortfolioTarget, SymbolCache
+
+
+##-------------------Equal weights shared across source models---------------------------------##
+
+class TestSourceModelPortfolioConstruction(unittest.TestCase):
+    '''
+    Each source model's targets are sized from a weight shared by every model, so an insight from one model has to resize
+    the targets of the others when it arrives and again when it expires
+    '''
+
+    def setUp(self):
+        self.Algorithm = Fixtures.Algorithm()
+        self.Model = self.Algorithm.PortfolioConstruction
+        self.Global = Fixtures.Module('Global').Global
+        self.Global.MarketIsOpen = True
+
+    def Insight(self, ticker, period, SourceModel, direction=InsightDirection.Up):
+        insight = Insight.Price(SymbolCache.GetSymbol(ticker), period, direction, None, None, SourceModel)
+        insight.SetTimes(self.Algorithm.UtcTime)
+
+        return insight
+
+    def CreateTargets(self, insights):
+        return {str(x.Symbol): x.Quantity for x in self.Model.CreateTargets(self.Algorithm, insights)}
+
+    def Quantity(self, ticker, weight):
+        return PortfolioTarget.Percent(self.Algorithm, SymbolCache.GetSymbol(ticker), weight).Quantity
+
+    def testEqualWeightAcrossModels(self):
+        weight = self.Global.MarginMultiplier
+
+        self.Algorithm.SetDateTime(datetime(2021, 1, 4, 10, 0))
+        targets = self.CreateTargets([self.Insight('TQQQ', timedelta(hours=2), 'TQQQ Alpha Model')])
+        self.assertEqual(targets, {'TQQQ': self.Quantity('TQQQ', weight)})
+
+        # A second model's insight halves the weight of the first model's target
+        self.Algorithm.SetDateTime(datetime(2021, 1, 4, 10, 1))
+        targets = self.CreateTargets([self.Insight('SPXL', timedelta(minutes=30), 'SPXL Alpha Model')])
+        self.assertEqual(targets, {'TQQQ': self.Quantity('TQQQ', weight / 2), 'SPXL': self.Quantity('SPXL', weight / 2)})
+
+        # Nothing changed, so nothing is re-emitted
+        self.Algorithm.SetDateTime(datetime(2021, 1, 4, 10, 2))
+        self.assertEqual(self.CreateTargets([]), {})
+
+        # Once the second insight expires the first model's target gets the whole weight back
+        self.Algorithm.SetDateTime(datetime(2021, 1, 4, 10, 40))
+        targets = self.CreateTargets([])
+        self.assertEqual(targets, {'TQQQ': self.Quantity('TQQQ', weight), 'SPXL': 0})
+
+    def testUnmovedWeightsAreNotResized(self):
+        weight = self.Global.MarginMultiplier
+
+        self.Algorithm.SetDateTime(datetime(2021, 1, 4, 10, 0))
+        self.CreateTargets([self.Insight('TQQQ', timedelta(hours=2), 'TQQQ Alpha Model')])
+
+        # A flat insight takes no share of the weight, so only its own model emits a target
+        self.Algorithm.SetDateTime(datetime(2021, 1, 4, 10, 1))
+        targets = self.CreateTargets([self.Insight('SPXL', timedelta(minutes=30), 'SPXL Alpha Model', InsightDirection.Flat)])
+        self.assertEqual(targets, {'SPXL': 0})
+
+        # Its expiry leaves the first model's weight where it was
+        self.Algorithm.SetDateTime(datetime(2021, 1, 4, 10, 40))
+        self.assertEqual(self.CreateTargets([]), {'SPXL': 0})
+        self.assertEqual(list(self.Model.SourceModels['TQQQ Alpha Model'].Percents.values()), [weight])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import unittest
+import numpy as np
+
+from .Fixtures import Fixtures
+from ..Types import PortfolioTarget
+
+##-------------------Global variables---------------------------------------------------------##
+
+Tickers = ('UVXY', 'SPXL', 'SPXS', 'TQQQ', 'SQQQ')
+
+# Interactive Brokers style fees: half a cent per share, at least one dollar
+FeePerShare = 0.005
+MinimumFee = 1
+
+
+##-------------------TargetSizer against the quantities LEAN's PortfolioTarget.Percent returns---##
+
+class TestTargetSizer(unittest.TestCase):
+    '''
+    The portfolio is worth 1,000,000 with the 5% free buffer of main.py, so weights are sized against 950,000
+    '''
+
+    def setUp(self):
+        self.Algorithm = Fixtures.Algorithm()
+        self.TargetSizer = Fixtures.Module('SourceModelPortfolioConstruction').TargetSizer
+        self.Random = np.random.default_rng(23)
+
+        self.Algorithm.Portfolio.SetCash(1000000)
+        self.Algorithm.Settings.FreePortfolioValue = 50000
+        self.SetPrices(UVXY=12.34, SPXL=33.33, SPXS=40, TQQQ=100, SQQQ=7.77)
+
+    def SetPrices(self, **prices):
+        for ticker, price in prices.items():
+            self.Algorithm.Securities[ticker].Price = float(price)
+
+    def ChargeFees(self):
+        self.Algorithm.FeeModel = lambda quantity, price: max(MinimumFee, abs(quantity) * FeePerShare)
+
+    def Size(self, Weights):
+        sizer = self.TargetSizer(self.Algorithm)
+        targets = sizer.Size(self.Algorithm, Weights)
+
+        return sizer, [None if x is None else x.Quantity for x in targets]
+
+    def Compare(self, Weights):
+        sizer, quantities = self.Size(Weights)
+        baseline = [PortfolioTarget.Percent(self.Algorithm, symbol, weight) for symbol, weight in Weights]
+
+        self.assertEqual(quantities, [None if x is None else x.Quantity for x in baseline])
+
+        return sizer
+
+    ##-----------------Quantities worked out by hand------------------------------------------------------------##
+
+    def testQuantities(self):
+        self.Algorithm.Securities['SQQQ'].SymbolProperties.LotSize = 10
+        self.Algorithm.Securities['SPXS'].SymbolProperties.ContractMultiplier = 100
+
+        # 475,000 / 100 | 631,750 / 33.33 = 18954.4 | 285,000 / 7.77 = 36679.5 in lots of 10 | 190,000 / (40 x 100) = 47.5 | -332,500 / 12.34 = -26944.9
+        sizer, quantities = self.Size([('TQQQ', 0.5), ('SPXL', 0.665), ('SQQQ', 0.3), ('SPXS', 0.2), ('UVXY', -0.35), ('TQQQ', 0)])
+
+        self.assertEqual(quantities, [4750, 18954, 36670, 47, -26944, 0])
+        self.assertEqual(sizer.Fallbacks, 0)
+
+    def testTargetsAreAbsolute(self):
+        # 1,000 TQQQ bought at 100 leave the portfolio value unchanged
+        self.Algorithm.Securities['TQQQ'].Holdings.Fill(1000, 100.0)
+        self.Algorithm.Portfolio.Cash -= 100000
+
+        sizer, quantities = self.Size([('TQQQ', 0.5), ('TQQQ', 0.1)])
+
+        self.assertEqual(quantities, [4750, 950])
+        self.assertEqual(PortfolioTarget.Percent(self.Algorithm, 'TQQQ', 0.5, True).Quantity, 3750)
+
+    def testFees(self):
+        self.ChargeFees()
+        self.Algorithm.Securities['SQQQ'].SymbolProperties.LotSize = 10
+
+        # The fee comes off the portfolio value before sizing: 4750 shares cost 23.75, and 999,976.25 x 0.475 / 100 = 4749.9.
+        # 9,500 / 250 is exactly 38 shares until the one dollar minimum fee is paid. SQQQ keeps its lot: 999,816.65 x 0.285 / 7.77 = 36672.8
+        self.SetPrices(SPXS=250)
+        sizer, quantities = self.Size([('TQQQ', 0.5), ('SPXS', 0.01), ('SQQQ', 0.3)])
+
+        self.assertEqual(quantities, [4749, 37, 36670])
+        self.assertEqual(sizer.Fallbacks, 2)
+
+    def testRejectedTargets(self):
+        self.Algorithm.Settings.MaxAbsolutePortfolioTargetPercentage = 2
+        self.SetPrices(SQQQ=0)
+        errors = len(self.Algorithm.Logs)
+
+        sizer, quantities = self.Size([('SQQQ', 0.5), ('UVXY', -2.5), ('TQQQ', 0.00000000001), ('SPXL', 1.99)])
+
+        # Weights above the leverage are still sized, 1,890,500 / 33.33 = 56720.7. The brokerage rejects the order later
+        self.assertEqual(quantities, [None, None, None, 56720])
+        self.assertEqual(sizer.Fallbacks, 3)
+        self.assertEqual(len(self.Algorithm.Logs) - errors, 3)
+
+    ##-----------------Random weights against PortfolioTarget.Percent-------------------------------------------##
+
+    def testMatchesPercent(self):
+        self.Algorithm.Securities['TQQQ'].SymbolProperties.LotSize = 10
+        self.Algorithm.Securities['SPXL'].SymbolProperties.ContractMultiplier = 100
+
+        for i in range(200):
+            self.Compare([(ticker, float(self.Random.uniform(-1.5, 1.5))) for ticker in Tickers])
+
+    def testMatchesPercentWithFees(self):
+        self.ChargeFees()
+
+        for i in range(200):
+            self.Compare([(ticker, float(self.Random.uniform(-1.5, 1.5))) for ticker in Tickers])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import unittest
+from datetime import *
+
+from .Fixtures import Fixtures
+from ..SyntheticData import SyntheticData
+from ..Types import ExchangeHours
+
+##-------------------Global variables---------------------------------------------------------##
+
+OneDay = timedelta(days=1)
+
+
+##-------------------TradingCalendar against stepping through the exchange hours a day at a time##
+
+class TestTradingCalendar(unittest.TestCase):
+
+    def setUp(self):
+        self.Calendar = Fixtures.Module('TradingCalendar').TradingCalendar
+        ExchangeHours.SetTradingDays([x.date() for x in SyntheticData.Days(date(2017, 1, 1), date(2021, 12, 31))])
+        self.Hours = ExchangeHours()
+
+    def tearDown(self):
+        ExchangeHours.SetTradingDays([])
+
+    def Days(self):
+        day = date(2018, 12, 1)
+
+        while day < date(2021, 2, 1):
+            yield day
+            day += OneDay
+
+    def BaselineNext(self, day):
+        day += OneDay
+        while not self.Hours.IsDateOpen(day):
+            day += OneDay
+
+        return day
+
+    def BaselineBefore(self, day, count):
+        while count:
+            day -= OneDay
+            if self.Hours.IsDateOpen(day):
+                count -= 1
+
+        return day
+
+    def testTradingDays(self):
+        calendar = self.Calendar(self.Hours)
+
+        for day in self.Days():
+            self.assertEqual(calendar.IsTradingDay(day), self.Hours.IsDateOpen(day))
+            self.assertEqual(calendar.NextTradingDay(day), self.BaselineNext(day))
+
+            for count in (1, 5, 30, 300):
+                self.assertEqual(calendar.TradingDayBefore(day, count), self.BaselineBefore(day, count))
+
+    def testFirstTradingDay(self):
+        calendar = self.Calendar(self.Hours)
+
+        for year in range(2018, 2022):
+            self.assertEqual(calendar.FirstTradingDay(year), self.BaselineNext(date(year - 1, 12, 31)))
+
+    def testSession(self):
+        calendar = self.Calendar(self.Hours)
+
+        for day in self.Days():
+            for moment in (time(0, 0), time(9, 30), time(12, 0), time(16, 0), time(23, 59)):
+                now = datetime.combine(day, moment)
+                marketOpen = self.Hours.GetNextMarketOpen(now, False)
+                marketClose = self.Hours.GetNextMarketClose(marketOpen, False)
+
+                self.assertEqual(calendar.Session(now), (marketOpen, marketClose, self.Hours.GetNextMarketOpen(marketClose, False)))
+
+
+if __name__ == '__main__':
+    unittest.main()
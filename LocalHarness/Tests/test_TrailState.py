@@ -0,0 +1,127 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import unittest
+import numpy as np
+
+from .Fixtures import Fixtures
+
+##-------------------Global variables---------------------------------------------------------##
+
+Tickers = ('SPXL', 'SPXS', 'TQQQ', 'SQQQ', 'UVXY')
+
+
+##-------------------The per position dictionaries TrailingStop kept before TrailState----------##
+
+class BaselineTrails:
+
+    def __init__(self):
+        self.LongTrail = {}
+        self.ShortTrail = {}
+
+    def Flat(self, asset, price):
+        self.LongTrail[asset] = [price, 0]
+        self.ShortTrail[asset] = [price, 0]
+
+    def Stop(self, asset, price, quantity, threshold):
+        '''
+        Returns the extreme price when the stop triggers, otherwise None
+        '''
+        if quantity > 0:
+            if asset not in self.LongTrail or self.LongTrail[asset][1] == 0:
+                self.LongTrail[asset] = [price, quantity]
+
+            elif price > self.LongTrail[asset][0]:
+                self.LongTrail[asset][0] = price
+
+            elif price / self.LongTrail[asset][0] < 1 - threshold:
+                return self.LongTrail.pop(asset)[0]
+
+        else:
+            if asset not in self.ShortTrail or self.ShortTrail[asset][1] == 0:
+                self.ShortTrail[asset] = [price, quantity]
+
+            elif price < self.ShortTrail[asset][0]:
+                self.ShortTrail[asset][0] = price
+
+            elif price / self.ShortTrail[asset][0] > 1 + threshold:
+                return self.ShortTrail.pop(asset)[0]
+
+        return None
+
+
+##-------------------TrailState against the baseline on random price and position paths-------##
+
+class TestTrailState(unittest.TestCase):
+
+    def setUp(self):
+        self.TrailState = Fixtures.Module('RiskManagement').TrailState
+        self.Random = np.random.default_rng(17)
+
+    def Run(self, steps=3000):
+        '''
+        Drives both implementations the way TrailingStop.ManageRisk does: flat positions clear their trails and a triggered
+        stop closes the position on the next step. Returns the stops of each as (step, asset, extreme)
+        '''
+        trails = self.TrailState()
+        baseline = BaselineTrails()
+
+        prices = {asset: 50.0 for asset in Tickers}
+        quantities = {asset: 0 for asset in Tickers}
+        thresholds = {asset: float(self.Random.uniform(0.02, 0.12)) for asset in Tickers}
+        stops, baselineStops = [], []
+
+        for step in range(steps):
+            for asset in Tickers:
+                prices[asset] *= float(np.exp(self.Random.normal(0, 0.02)))
+
+                if quantities[asset] == 0 and self.Random.random() < 0.1:
+                    quantities[asset] = int(self.Random.choice([-1, 1])) * int(self.Random.integers(1, 100))
+                elif quantities[asset] != 0 and self.Random.random() < 0.05:
+                    quantities[asset] += int(np.sign(quantities[asset])) * int(self.Random.integers(1, 10))
+                elif quantities[asset] != 0 and self.Random.random() < 0.02:
+                    quantities[asset] = 0
+
+            invested = [asset for asset in Tickers if quantities[asset] != 0]
+
+            for asset in Tickers:
+                if quantities[asset] == 0:
+                    trails.Remove(asset)
+                    baseline.Flat(asset, prices[asset])
+
+            for asset in invested:
+                extreme = baseline.Stop(asset, prices[asset], quantities[asset], thresholds[asset])
+                if extreme is not None:
+                    baselineStops.append((step, asset, extreme))
+
+            if invested:
+                triggered = trails.Update(invested, np.array([prices[x] for x in invested]), np.array([float(quantities[x]) for x in invested]),
+                                          np.array([thresholds[x] for x in invested]))
+
+                for i, extreme in triggered:
+                    stops.append((step, invested[i], extreme))
+                    quantities[invested[i]] = 0
+
+        return stops, baselineStops
+
+    def testStopsMatchBaseline(self):
+        stops, baselineStops = self.Run()
+
+        self.assertGreater(len(baselineStops), 20)
+        self.assertEqual([x[:2] for x in stops], [x[:2] for x in baselineStops])
+        np.testing.assert_allclose([x[2] for x in stops], [x[2] for x in baselineStops], rtol=1e-12)
+
+    def testRemoveKeepsOtherRows(self):
+        trails = self.TrailState()
+        trails.Update(['SPXL', 'TQQQ', 'UVXY'], np.array([10.0, 20.0, 30.0]), np.array([1.0, 2.0, -3.0]), np.full(3, 0.1))
+        trails.Remove('SPXL')
+
+        self.assertEqual(sorted(trails.Symbols), ['TQQQ', 'UVXY'])
+        self.assertEqual(trails.Extreme[trails.Rows['UVXY']], 30.0)
+        self.assertEqual(trails.Quantity[trails.Rows['TQQQ']], 2.0)
+
+        stops = trails.Update(['UVXY'], np.array([35.0]), np.array([-3.0]), np.full(1, 0.1))
+        self.assertEqual(stops, [(0, 30.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
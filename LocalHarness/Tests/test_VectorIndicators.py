@@ -0,0 +1,60 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import unittest
+import numpy as np
+
+from .Fixtures import Fixtures
+
+
+##-------------------VectorIndicators against indicators updated one close at a time-----------##
+
+class TestVectorIndicators(unittest.TestCase):
+
+    def setUp(self):
+        self.Indicators = Fixtures.Module('VectorIndicators').VectorIndicators
+        self.Closes = 100 * np.exp(np.cumsum(np.random.default_rng(5).normal(0, 0.02, 500)))
+
+    def BaselineEMA(values, period):
+        k = 2 / (period + 1)
+        ema = values[0]
+        result = []
+
+        for value in values:
+            ema = ema + k * (value - ema)
+            result.append(ema)
+
+        return result
+
+    def BaselineRSI(values, period):
+        result = [float(100)]
+
+        for i in range(1, len(values)):
+            changes = np.diff(values[max(0, i - period):i + 1])
+            gain = sum(x for x in changes if x >= 0) / len(changes)
+            loss = sum(-x for x in changes if x < 0) / len(changes)
+            result.append(float(100) if loss == 0 else 100 - 100 / (1 + gain / loss))
+
+        return result
+
+    def testEMA(self):
+        for period in (1, 5, 20, 200):
+            np.testing.assert_allclose(self.Indicators.EMA(self.Closes, period),
+                                       TestVectorIndicators.BaselineEMA(self.Closes, period), rtol=1e-12)
+
+    def testRSI(self):
+        for period in (2, 14, 30):
+            np.testing.assert_allclose(self.Indicators.RSI(self.Closes, period),
+                                       TestVectorIndicators.BaselineRSI(self.Closes, period), rtol=1e-9)
+
+    def testRSIWithoutLosses(self):
+        rising = np.arange(1, 30, dtype=float)
+
+        np.testing.assert_array_equal(self.Indicators.RSI(rising, 14), np.full(len(rising), float(100)))
+
+    def testShortSeries(self):
+        self.assertEqual(len(self.Indicators.EMA([], 10)), 0)
+        np.testing.assert_array_equal(self.Indicators.RSI([5.0], 14), [float(100)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import unittest
+import numpy as np
+import pandas as pd
+from datetime import *
+
+from .Fixtures import Fixtures
+
+
+##-------------------RollingVixStatistics against the History based statistics of QCVix------##
+
+class TestRollingVixStatistics(unittest.TestCase):
+
+    def setUp(self):
+        self.Statistics = Fixtures.Module('VixStatistics').RollingVixStatistics
+        self.Closes = 19 * np.exp(np.cumsum(np.random.default_rng(3).normal(0, 0.06, 300)))
+
+    def Baseline(closes):
+        '''
+        Statistics the alpha model derived from the last six closes of a History request on every bar
+        '''
+        vixList = list(closes[-6:])
+        vixPercentMoveList = (pd.Series(vixList).pct_change().dropna() * 100).round(3).tolist()
+
+        return vixList, vixPercentMoveList, np.std(vixPercentMoveList), np.mean(vixPercentMoveList)
+
+    def testUpdateMatchesHistoryWindow(self):
+        statistics = self.Statistics()
+        start = datetime(2020, 1, 1)
+        statistics.Warm(start, self.Closes[:6])
+
+        for i in range(6, len(self.Closes)):
+            self.assertTrue(statistics.Update(start + timedelta(days=i), self.Closes[i]))
+
+            vixList, moves, std, mean = TestRollingVixStatistics.Baseline(self.Closes[:i + 1])
+            np.testing.assert_allclose(statistics.SpotList(), vixList, rtol=1e-12)
+            np.testing.assert_allclose(statistics.MoveList(), moves, atol=1e-12)
+            self.assertAlmostEqual(statistics.MoveSTD(), std, places=9)
+            self.assertAlmostEqual(statistics.MoveMean, mean, places=9)
+            self.assertEqual(statistics.LastSpot(), vixList[-1])
+
+    def testWarmMatchesHistoryWindow(self):
+        statistics = self.Statistics()
+        statistics.Warm(datetime(2020, 1, 1), self.Closes[:40])
+
+        vixList, moves, std, mean = TestRollingVixStatistics.Baseline(self.Closes[:40])
+        np.testing.assert_allclose(statistics.MoveList(), moves, atol=1e-12)
+        self.assertAlmostEqual(statistics.MoveSTD(), std, places=9)
+        self.assertAlmostEqual(statistics.MoveMean, mean, places=9)
+
+    def testRepeatedBarIsIgnored(self):
+        statistics = self.Statistics()
+        statistics.Warm(datetime(2020, 1, 1), self.Closes[:6])
+
+        self.assertFalse(statistics.Update(datetime(2020, 1, 1), self.Closes[6]))
+        np.testing.assert_allclose(statistics.SpotList(), self.Closes[:6], rtol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
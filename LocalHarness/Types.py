@@ -0,0 +1,1032 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import math
+import uuid
+from collections import deque
+from datetime import *
+from enum import IntEnum
+
+##-------------------Global variables---------------------------------------------------------##
+
+Zero = int(0)
+MarketOpen = time(9, 30)
+MarketClose = time(16, 0)
+
+
+'''
+Section 1:  Enumerations and static helpers
+'''
+
+class Resolution(IntEnum):
+    Tick = 0
+    Second = 1
+    Minute = 2
+    Hour = 3
+    Daily = 4
+
+
+class SecurityType(IntEnum):
+    Base = 0
+    Equity = 1
+    Index = 12
+
+
+class Market:
+    USA = 'usa'
+    CBOE = 'cboe'
+
+
+class InsightDirection(IntEnum):
+    Down = -1
+    Flat = 0
+    Up = 1
+
+
+class InsightType(IntEnum):
+    Price = 0
+    Volatility = 1
+
+
+class MovingAverageType(IntEnum):
+    Simple = 0
+    Exponential = 1
+    Wilders = 2
+
+
+class OrderStatus(IntEnum):
+    New = 0
+    Submitted = 1
+    PartiallyFilled = 2
+    Filled = 3
+    Canceled = 5
+    Invalid = 7
+    CancelPending = 8
+    UpdateSubmitted = 9
+
+
+class OrderType(IntEnum):
+    Market = 0
+    Limit = 1
+
+
+class Extensions:
+
+    def __init__(self):
+        pass
+
+    def ToTimeSpan(resolution):
+        return {Resolution.Tick: timedelta(0), Resolution.Second: timedelta(seconds=1), Resolution.Minute: timedelta(minutes=1),
+                Resolution.Hour: timedelta(hours=1), Resolution.Daily: timedelta(days=1)}[resolution]
+
+
+'''
+Section 2:  Symbols
+'''
+
+class Symbol:
+    '''
+    Compares and hashes like its ticker string, the way the Python wrapper of a LEAN Symbol does, so
+    frames indexed by symbol can be looked up with either the symbol or its string
+    '''
+
+    def __init__(self, value, securityType=SecurityType.Equity):
+        self.Value = value
+        self.SecurityType = securityType
+        self.ID = value
+
+    def __str__(self):
+        return self.Value
+
+    def __repr__(self):
+        return self.Value
+
+    def __hash__(self):
+        return hash(self.Value)
+
+    def __eq__(self, other):
+        if isinstance(other, Symbol):
+            return self.Value == other.Value
+        if isinstance(other, str):
+            return self.Value == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __lt__(self, other):
+        return str(self) < str(other)
+
+
+class SymbolCache:
+    Symbols = {}
+
+    def __init__(self):
+        pass
+
+    def Set(ticker, symbol):
+        SymbolCache.Symbols[ticker] = symbol
+
+    def GetSymbol(ticker):
+        if ticker not in SymbolCache.Symbols:
+            raise KeyError(f'The symbol {ticker} was not found in the symbol cache')
+
+        return SymbolCache.Symbols[ticker]
+
+    def TryGetSymbol(ticker, symbol=None):
+        return (ticker in SymbolCache.Symbols, SymbolCache.Symbols.get(ticker))
+
+    def Reset():
+        SymbolCache.Symbols = {}
+
+
+'''
+Section 3:  Events, indicators and rolling windows
+'''
+
+class Event:
+
+    def __init__(self):
+        self.Handlers = []
+
+    def __iadd__(self, handler):
+        self.Handlers.append(handler)
+        return self
+
+    def __isub__(self, handler):
+        if handler in self.Handlers:
+            self.Handlers.remove(handler)
+        return self
+
+    def Fire(self, *args):
+        for handler in self.Handlers:
+            handler(*args)
+
+
+class IndicatorDataPoint:
+
+    def __init__(self, time=datetime.min, value=float(0), symbol=None):
+        self.Time = time
+        self.EndTime = time
+        self.Value = float(value)
+        self.Symbol = symbol
+
+    def __float__(self):
+        return self.Value
+
+    def __repr__(self):
+        return f'{self.Time} - {self.Value}'
+
+
+class IndicatorBase:
+    '''
+    Update accepts either (time, value) or a data point and fires Updated after every computed value
+    '''
+
+    def __init__(self, name, period=1):
+        self.Name = name
+        self.Period = period
+        self.Samples = 0
+        self.Current = IndicatorDataPoint()
+        self.Updated = Event()
+
+    @property
+    def IsReady(self):
+        return self.Samples >= self.Period
+
+    def Update(self, time, value=None):
+        if value is None:
+            time, value = time.EndTime, getattr(time, 'Value', getattr(time, 'Close', None))
+
+        self.Samples += 1
+        self.Current = IndicatorDataPoint(time, self.ComputeNextValue(float(value)))
+        self.Updated.Fire(self, self.Current)
+
+        return self.IsReady
+
+    def ComputeNextValue(self, value):
+        return value
+
+    def Reset(self):
+        self.Samples = 0
+        self.Current = IndicatorDataPoint()
+
+    def __float__(self):
+        return self.Current.Value
+
+
+class Identity(IndicatorBase):
+
+    def __init__(self, name='Identity'):
+        super().__init__(name, 1)
+
+
+class SimpleMovingAverage(IndicatorBase):
+
+    def __init__(self, name, period=None):
+        if period is None:
+            name, period = f'SMA({name})', name
+
+        super().__init__(name, period)
+        self.Window = deque(maxlen=period)
+
+    def ComputeNextValue(self, value):
+        self.Window.append(value)
+        return sum(self.Window) / len(self.Window)
+
+
+class ExponentialMovingAverage(IndicatorBase):
+    '''
+    Seeded with the first value, as the QuantConnect version the algorithm was written against
+    '''
+
+    def __init__(self, name, period=None):
+        if period is None:
+            name, period = f'EMA({name})', name
+
+        super().__init__(name, period)
+        self.K = 2 / (period + 1)
+
+    def ComputeNextValue(self, value):
+        if self.Samples == 1:
+            return value
+
+        return value * self.K + self.Current.Value * (1 - self.K)
+
+
+class RelativeStrengthIndex(IndicatorBase):
+
+    def __init__(self, name, period=None, movingAverageType=MovingAverageType.Simple):
+        if period is None or isinstance(name, int):
+            name, period, movingAverageType = f'RSI({name})', name, period if period is not None else movingAverageType
+
+        super().__init__(name, period)
+        self.AverageGain = SimpleMovingAverage(f'{name}_Gain', period)
+        self.AverageLoss = SimpleMovingAverage(f'{name}_Loss', period)
+        self.Previous = None
+
+    @property
+    def IsReady(self):
+        return self.Samples > self.Period
+
+    def ComputeNextValue(self, value):
+        if self.Previous is not None:
+            change = value - self.Previous
+            self.AverageGain.Update(self.Current.Time, max(change, 0))
+            self.AverageLoss.Update(self.Current.Time, max(-change, 0))
+
+        self.Previous = value
+
+        if self.AverageLoss.Current.Value == 0:
+            return float(100)
+
+        return 100 - 100 / (1 + self.AverageGain.Current.Value / self.AverageLoss.Current.Value)
+
+
+class CompositeIndicator(IndicatorBase):
+    '''
+    Computes the composer of the two inputs whenever both have reported a value for the same time
+    '''
+
+    def __init__(self, name, left, right, composer):
+        super().__init__(name, 1)
+        self.Left = left
+        self.Right = right
+        self.Composer = composer
+
+        left.Updated += self.InputUpdated
+        right.Updated += self.InputUpdated
+
+    @property
+    def IsReady(self):
+        return self.Left.IsReady and self.Right.IsReady
+
+    def InputUpdated(self, sender, updated):
+        if self.Left.Samples == 0 or self.Right.Samples == 0 or self.Left.Current.Time != self.Right.Current.Time:
+            return
+
+        self.Samples += 1
+        self.Current = IndicatorDataPoint(updated.Time, self.Composer(self.Left.Current.Value, self.Right.Current.Value))
+        self.Updated.Fire(self, self.Current)
+
+
+class IndicatorExtensions:
+
+    def __init__(self):
+        pass
+
+    def Over(left, right, name=None):
+        return CompositeIndicator(name or f'OVER({left.Name},{right.Name})', left, right,
+                                  lambda x, y: x / y if y != 0 else float(0))
+
+    def Minus(left, right, name=None):
+        return CompositeIndicator(name or f'MINUS({left.Name},{right.Name})', left, right, lambda x, y: x - y)
+
+
+class RollingWindow:
+    '''
+    Index 0 is the most recent item. Subscripting the class with a type, as in RollingWindow[float](3), returns the class
+    '''
+
+    def __init__(self, size):
+        self.Size = size
+        self.Items = deque(maxlen=size)
+        self.Samples = 0
+
+    def __class_getitem__(cls, item):
+        return cls
+
+    def Add(self, item):
+        self.Items.appendleft(item)
+        self.Samples += 1
+
+    @property
+    def Count(self):
+        return len(self.Items)
+
+    @property
+    def IsReady(self):
+        return len(self.Items) == self.Size
+
+    def __getitem__(self, i):
+        return self.Items[i]
+
+    def __iter__(self):
+        return iter(self.Items)
+
+    def __len__(self):
+        return len(self.Items)
+
+    def Reset(self):
+        self.Items.clear()
+        self.Samples = 0
+
+
+'''
+Section 4:  Market data
+'''
+
+class TradeBar:
+
+    def __init__(self, time, symbol, open, high, low, close, volume, period=timedelta(minutes=1)):
+        self.Time = time
+        self.EndTime = time + period
+        self.Period = period
+        self.Symbol = symbol
+        self.Open = open
+        self.High = high
+        self.Low = low
+        self.Close = close
+        self.Volume = volume
+        self.Value = close
+        self.Price = close
+
+    def __repr__(self):
+        return f'{self.Symbol}: O: {self.Open} H: {self.High} L: {self.Low} C: {self.Close} V: {self.Volume}'
+
+
+class TradeBarConsolidator:
+    '''
+    Aggregates bars into periods aligned to midnight and fires DataConsolidated when a period closes
+    '''
+
+    def __init__(self, period):
+        self.Period = period if isinstance(period, timedelta) else Extensions.ToTimeSpan(period)
+        self.Working = None
+        self.Consolidated = None
+        self.DataConsolidated = Event()
+
+    def Update(self, bar):
+        if self.Working is None:
+            start = datetime.combine(bar.Time.date(), time.min)
+            start += ((bar.Time - start) // self.Period) * self.Period
+            self.Working = TradeBar(start, bar.Symbol, bar.Open, bar.High, bar.Low, bar.Close, bar.Volume, self.Period)
+
+        else:
+            self.Working.High = max(self.Working.High, bar.High)
+            self.Working.Low = min(self.Working.Low, bar.Low)
+            self.Working.Close = self.Working.Value = self.Working.Price = bar.Close
+            self.Working.Volume += bar.Volume
+
+        if bar.EndTime >= self.Working.EndTime:
+            self.Consolidated, self.Working = self.Working, None
+            self.DataConsolidated.Fire(self, self.Consolidated)
+
+
+class CBOE:
+    '''
+    Marker type for the custom CBOE daily VIX data
+    '''
+    pass
+
+
+class Slice:
+
+    def __init__(self, time, bars):
+        self.Time = time
+        self.Bars = bars
+
+    def ContainsKey(self, symbol):
+        return symbol in self.Bars
+
+    def __contains__(self, symbol):
+        return symbol in self.Bars
+
+    def __getitem__(self, symbol):
+        return self.Bars[symbol]
+
+    def get(self, symbol, default=None):
+        return self.Bars.get(symbol, default)
+
+    @property
+    def Keys(self):
+        return list(self.Bars)
+
+    def Values(self):
+        return list(self.Bars.values())
+
+
+'''
+Section 5:  Exchange hours
+'''
+
+class ExchangeHours:
+    '''
+    Regular 9:30 to 16:00 sessions. Inside the range of the loaded equity data the trading days are the dates that hold
+    bars, so holidays follow the data; outside it every weekday is open. AlwaysOpen models the custom CBOE data exchange.
+    '''
+
+    TradingDays = None
+    FirstDay = None
+    LastDay = None
+
+    def __init__(self, AlwaysOpen=False):
+        self.AlwaysOpen = AlwaysOpen
+
+    def SetTradingDays(days):
+        days = sorted(days)
+        ExchangeHours.TradingDays = set(days) if days else None
+        ExchangeHours.FirstDay = days[0] if days else None
+        ExchangeHours.LastDay = days[-1] if days else None
+
+    def IsDateOpen(self, day):
+        if isinstance(day, datetime):
+            day = day.date()
+
+        if self.AlwaysOpen:
+            return True
+
+        if ExchangeHours.TradingDays is not None and ExchangeHours.FirstDay <= day <= ExchangeHours.LastDay:
+            return day in ExchangeHours.TradingDays
+
+        return day.weekday() < 5
+
+    def IsOpen(self, localDateTime, extendedMarket=False):
+        if self.AlwaysOpen:
+            return True
+
+        return self.IsDateOpen(localDateTime.date()) and MarketOpen <= localDateTime.time() < MarketClose
+
+    def GetNextMarketOpen(self, localDateTime, extendedMarket=False):
+        day = localDateTime.date()
+
+        while True:
+            if self.IsDateOpen(day):
+                marketOpen = datetime.combine(day, time.min if self.AlwaysOpen else MarketOpen)
+                if marketOpen > localDateTime:
+                    return marketOpen
+
+            day += timedelta(days=1)
+
+    def GetNextMarketClose(self, localDateTime, extendedMarket=False):
+        day = localDateTime.date()
+
+        while True:
+            if self.IsDateOpen(day):
+                marketClose = datetime.combine(day + timedelta(days=1), time.min) if self.AlwaysOpen else datetime.combine(day, MarketClose)
+                if marketClose > localDateTime:
+                    return marketClose
+
+            day += timedelta(days=1)
+
+
+class Exchange:
+
+    def __init__(self, hours):
+        self.Hours = hours
+        self.TimeZone = 'America/New_York'
+
+
+class MarketHoursDatabase:
+    Hours = ExchangeHours()
+
+    def __init__(self):
+        pass
+
+    def FromDataFolder():
+        return MarketHoursDatabase()
+
+    def GetExchangeHours(self, market, symbol, securityType):
+        return MarketHoursDatabase.Hours
+
+
+'''
+Section 6:  Insights and portfolio targets
+'''
+
+class Insight:
+
+    def __init__(self, symbol, period, type, direction, magnitude=None, confidence=None, sourceModel=None, weight=None):
+        self.Id = uuid.uuid4()
+        self.Symbol = symbol
+        self.Period = period
+        self.Type = type
+        self.Direction = direction
+        self.Magnitude = magnitude
+        self.Confidence = confidence
+        self.SourceModel = sourceModel
+        self.Weight = weight
+        self.GeneratedTimeUtc = None
+        self.CloseTimeUtc = None
+
+    def Price(symbol, period, direction, magnitude=None, confidence=None, sourceModel=None, weight=None):
+        return Insight(symbol, period, InsightType.Price, direction, magnitude, confidence, sourceModel, weight)
+
+    def SetTimes(self, utcTime):
+        self.GeneratedTimeUtc = utcTime
+        self.CloseTimeUtc = utcTime + (self.Period if isinstance(self.Period, timedelta) else Extensions.ToTimeSpan(self.Period))
+
+    def IsActive(self, utcTime):
+        return self.CloseTimeUtc > utcTime
+
+    def IsExpired(self, utcTime):
+        return self.CloseTimeUtc <= utcTime
+
+    def __repr__(self):
+        return f'{self.Symbol}: {self.Direction.name if isinstance(self.Direction, InsightDirection) else self.Direction} {self.Period} from {self.SourceModel}'
+
+
+class InsightCollection:
+
+    def __init__(self):
+        self.Insights = []
+
+    def Add(self, insight):
+        self.Insights.append(insight)
+
+    def AddRange(self, insights):
+        self.Insights.extend(insights)
+
+    def Remove(self, insight):
+        if insight in self.Insights:
+            self.Insights.remove(insight)
+            return True
+        return False
+
+    def Clear(self, symbols=None):
+        self.Insights = [] if symbols is None else [x for x in self.Insights if x.Symbol not in symbols]
+
+    def ContainsKey(self, symbol):
+        return any(x.Symbol == symbol for x in self.Insights)
+
+    def HasActiveInsights(self, symbol, utcTime):
+        return any(x.Symbol == symbol and x.IsActive(utcTime) for x in self.Insights)
+
+    def GetActiveInsights(self, utcTime):
+        return [x for x in self.Insights if x.IsActive(utcTime)]
+
+    def RemoveExpiredInsights(self, utcTime):
+        expired = [x for x in self.Insights if x.IsExpired(utcTime)]
+        self.Insights = [x for x in self.Insights if not x.IsExpired(utcTime)]
+        return expired
+
+    def GetNextExpiryTime(self):
+        return min((x.CloseTimeUtc for x in self.Insights), default=None)
+
+    @property
+    def Count(self):
+        return len(self.Insights)
+
+    def __iter__(self):
+        return iter(self.Insights)
+
+    def __len__(self):
+        return len(self.Insights)
+
+
+class PortfolioTarget:
+
+    def __init__(self, symbol, quantity, tag=''):
+        self.Symbol = symbol
+        self.Quantity = quantity
+        self.Tag = tag
+
+    def Percent(algorithm, symbol, percent, returnDeltaQuantity=False, tag=''):
+        '''
+        Follows LEAN: rejects weights outside the target percentage settings and securities without a price, scales the weight by
+        the free buffer and the leverage into a margin target, and asks the buying power model for the order that reaches it.
+        Rejections are logged as errors and return None
+        '''
+        settings = algorithm.Settings
+        absolute = abs(float(percent))
+
+        if absolute > settings.MaxAbsolutePortfolioTargetPercentage or (absolute != 0 and absolute < settings.MinAbsolutePortfolioTargetPercentage):
+            algorithm.Error(f'The portfolio target percent: {percent}, does not comply with the current Algorithm.Settings '
+                            f'MinAbsolutePortfolioTargetPercentage or MaxAbsolutePortfolioTargetPercentage. Skipping')
+            return None
+
+        security = algorithm.Securities[symbol]
+
+        if float(security.Price) == 0:
+            algorithm.Error(f'{symbol}: The security does not have an accurate price as it has not yet received a bar of data')
+            return None
+
+        portfolio = algorithm.Portfolio
+        adjusted = float(percent) * float(portfolio.TotalPortfolioValueLessFreeBuffer) / float(portfolio.TotalPortfolioValue)
+        target = adjusted / float(security.BuyingPowerModel.GetLeverage(security))
+
+        result = security.BuyingPowerModel.GetMaximumOrderQuantityForTargetBuyingPower(
+            GetMaximumOrderQuantityForTargetBuyingPowerParameters(portfolio, security, target, True))
+
+        if result.IsError:
+            algorithm.Error(f'Unable to compute order quantity of {symbol}. Reason: {result.Reason} Returning null.')
+            return None
+
+        quantity = result.Quantity if returnDeltaQuantity else result.Quantity + float(security.Holdings.Quantity)
+        return PortfolioTarget(symbol, quantity, tag)
+
+    def __repr__(self):
+        return f'{self.Symbol}: {self.Quantity}'
+
+
+class PortfolioTargetCollection:
+
+    def __init__(self):
+        self.Targets = {}
+
+    def Add(self, target):
+        self.Targets[target.Symbol] = target
+
+    def AddRange(self, targets):
+        for target in targets:
+            self.Targets[target.Symbol] = target
+
+    def ContainsKey(self, symbol):
+        return symbol in self.Targets
+
+    def Remove(self, symbol):
+        return self.Targets.pop(symbol, None) is not None
+
+    def Clear(self):
+        self.Targets = {}
+
+    @property
+    def Count(self):
+        return len(self.Targets)
+
+    @property
+    def IsEmpty(self):
+        return not self.Targets
+
+    def __getitem__(self, symbol):
+        return self.Targets[symbol]
+
+    def __iter__(self):
+        return iter(list(self.Targets.values()))
+
+    def __len__(self):
+        return len(self.Targets)
+
+    def OrderByMarginImpact(self, algorithm):
+        '''
+        Targets with an unordered quantity and data, orders that reduce exposure first
+        '''
+        impacts = []
+
+        for target in self.Targets.values():
+            security = algorithm.Securities[target.Symbol]
+            quantity = OrderSizing.GetUnorderedQuantity(algorithm, target)
+
+            if quantity == Zero or not security.HasData:
+                continue
+
+            holding = float(security.Holdings.Quantity)
+            impacts.append(((abs(holding + quantity) - abs(holding)) * float(security.Price), len(impacts), target))
+
+        return [x[2] for x in sorted(impacts)]
+
+    def ClearFulfilled(self, algorithm):
+        for symbol in [symbol for symbol, target in self.Targets.items() if OrderSizing.GetUnorderedQuantity(algorithm, target) == Zero]:
+            self.Targets.pop(symbol)
+
+
+class SecurityChanges:
+
+    def __init__(self, added, removed):
+        self.AddedSecurities = added
+        self.RemovedSecurities = removed
+
+
+'''
+Section 7:  Orders and buying power
+'''
+
+class MarketOrder:
+    Type = OrderType.Market
+
+    def __init__(self, symbol, quantity, time, tag=''):
+        self.Id = 0
+        self.Symbol = symbol
+        self.Quantity = quantity
+        self.Time = time
+        self.Tag = tag
+        self.Status = OrderStatus.New
+        self.Price = float(0)
+
+    @property
+    def AbsoluteQuantity(self):
+        return abs(self.Quantity)
+
+
+class OrderTicket:
+
+    def __init__(self, order):
+        self.Order = order
+        self.OrderId = order.Id
+        self.Symbol = order.Symbol
+        self.Quantity = order.Quantity
+        self.Tag = order.Tag
+        self.Status = OrderStatus.New
+        self.QuantityFilled = Zero
+        self.AverageFillPrice = float(0)
+        self.Message = ''
+
+    def __repr__(self):
+        return f'Order {self.OrderId}: {self.Symbol} {self.Quantity} {self.Status.name}'
+
+
+class OrderEvent:
+
+    def __init__(self, ticket, status, utcTime, fillPrice=float(0), fillQuantity=Zero, message=''):
+        self.OrderId = ticket.OrderId
+        self.Symbol = ticket.Symbol
+        self.Status = status
+        self.UtcTime = utcTime
+        self.FillPrice = fillPrice
+        self.FillQuantity = fillQuantity
+        self.Quantity = ticket.Quantity
+        self.Message = message
+
+    def __repr__(self):
+        return f'{self.UtcTime} Order {self.OrderId}: {self.Symbol} {self.Status.name} {self.FillQuantity} @ {self.FillPrice}'
+
+
+class SubmitOrderRequest:
+
+    def __init__(self, orderType, securityType, symbol, quantity, stopPrice, limitPrice, time, tag):
+        self.OrderType = orderType
+        self.SecurityType = securityType
+        self.Symbol = symbol
+        self.Quantity = quantity
+        self.StopPrice = stopPrice
+        self.LimitPrice = limitPrice
+        self.Time = time
+        self.Tag = tag
+
+
+class OrderSizing:
+
+    def __init__(self):
+        pass
+
+    def GetUnorderedQuantity(algorithm, target, security=None):
+        '''
+        Target quantity less holdings and open orders, rounded toward zero to whole lots
+        '''
+        if security is None:
+            security = algorithm.Securities[target.Symbol]
+
+        quantity = float(target.Quantity) - float(security.Holdings.Quantity) - algorithm.Transactions.GetOpenOrdersRemainingQuantity(target.Symbol)
+        lot = float(security.SymbolProperties.LotSize)
+
+        return math.trunc(round(quantity / lot, 8)) * lot
+
+
+class CashAmount:
+
+    def __init__(self, amount, currency='USD'):
+        self.Amount = amount
+        self.Currency = currency
+
+
+class OrderFee:
+
+    def __init__(self, value):
+        self.Value = value
+
+
+class OrderFeeParameters:
+
+    def __init__(self, security, order):
+        self.Security = security
+        self.Order = order
+
+
+class FeeModel:
+    '''
+    Charges Fee(quantity, price) in the account currency, nothing by default
+    '''
+
+    def __init__(self, Fee=None):
+        self.Fee = Fee
+
+    def GetOrderFee(self, parameters):
+        amount = float(0) if self.Fee is None else float(self.Fee(parameters.Order.Quantity, float(parameters.Security.Price)))
+        return OrderFee(CashAmount(amount))
+
+
+class HasSufficientBuyingPowerForOrderParameters:
+
+    def __init__(self, portfolio, security, order):
+        self.Portfolio = portfolio
+        self.Security = security
+        self.Order = order
+
+
+class HasSufficientBuyingPowerForOrderResult:
+
+    def __init__(self, isSufficient, reason=''):
+        self.IsSufficient = isSufficient
+        self.Reason = reason
+
+
+class GetMaximumOrderQuantityForTargetBuyingPowerParameters:
+
+    def __init__(self, portfolio, security, targetBuyingPower, silenceNonErrorReasons=False):
+        self.Portfolio = portfolio
+        self.Security = security
+        self.TargetBuyingPower = targetBuyingPower
+        self.SilenceNonErrorReasons = silenceNonErrorReasons
+
+
+class GetMaximumOrderQuantityResult:
+
+    def __init__(self, quantity, reason='', isError=False):
+        self.Quantity = quantity
+        self.Reason = reason
+        self.IsError = isError
+
+
+class BuyingPowerModel:
+    '''
+    Initial margin of the position increase over the leverage, against the portfolio's remaining margin
+    '''
+
+    def __init__(self, security):
+        self.Security = security
+
+    def GetLeverage(self, security):
+        return security.Leverage
+
+    def GetInitialMarginRequirement(self, security, quantity):
+        return abs(float(quantity)) * float(security.Price) * float(security.SymbolProperties.ContractMultiplier) / float(security.Leverage)
+
+    def GetMaximumOrderQuantityForTargetBuyingPower(self, parameters):
+        '''
+        Order that brings the position's margin to TargetBuyingPower of the portfolio value in whole lots. The order fee comes off the
+        portfolio value, repeated until the fee of the resulting order is covered
+        '''
+        security = parameters.Security
+        holdings = float(security.Holdings.Quantity)
+        total = float(parameters.Portfolio.TotalPortfolioValue)
+
+        if parameters.TargetBuyingPower == 0:
+            return GetMaximumOrderQuantityResult(-holdings)
+
+        unit = self.GetInitialMarginRequirement(security, 1)
+        if unit == 0:
+            return GetMaximumOrderQuantityResult(0, f'The price of the {security.Symbol} security is zero', True)
+
+        lot = float(security.SymbolProperties.LotSize)
+        fee = float(0)
+
+        while True:
+            quantity = math.trunc((total - fee) * parameters.TargetBuyingPower / unit / lot) * lot
+            order = quantity - holdings
+
+            if order == 0:
+                return GetMaximumOrderQuantityResult(0, '' if parameters.SilenceNonErrorReasons else 'The order quantity is less than the lot size')
+
+            orderFee = float(security.FeeModel.GetOrderFee(OrderFeeParameters(security, MarketOrder(security.Symbol, order, None))).Value.Amount)
+            if orderFee <= fee:
+                return GetMaximumOrderQuantityResult(order)
+
+            fee = orderFee
+
+    def HasSufficientBuyingPowerForOrder(self, parameters):
+        security = parameters.Security
+        holding = float(security.Holdings.Quantity)
+        quantity = float(parameters.Order.Quantity)
+        increase = abs(holding + quantity) - abs(holding)
+
+        if increase <= 0:
+            return HasSufficientBuyingPowerForOrderResult(True)
+
+        required = increase * float(security.Price) * float(security.SymbolProperties.ContractMultiplier) / float(security.Leverage)
+        remaining = parameters.Portfolio.MarginRemaining
+
+        if required > remaining:
+            return HasSufficientBuyingPowerForOrderResult(False, f'Initial margin {round(required, 2)} exceeds the remaining margin {round(remaining, 2)}')
+
+        return HasSufficientBuyingPowerForOrderResult(True)
+
+
+class SymbolProperties:
+
+    def __init__(self, LotSize=1, ContractMultiplier=1):
+        self.LotSize = LotSize
+        self.ContractMultiplier = ContractMultiplier
+        self.MinimumPriceVariation = 0.01
+
+
+'''
+Section 8:  Framework model base classes and brokerage stand-ins
+'''
+
+class AlphaModel:
+
+    def Update(self, algorithm, data):
+        return []
+
+    def OnSecuritiesChanged(self, algorithm, changes):
+        pass
+
+
+class PortfolioConstructionModel:
+
+    def CreateTargets(self, algorithm, insights):
+        return []
+
+    def OnSecuritiesChanged(self, algorithm, changes):
+        pass
+
+
+class RiskManagementModel:
+
+    def ManageRisk(self, algorithm, targets):
+        return []
+
+    def OnSecuritiesChanged(self, algorithm, changes):
+        pass
+
+
+class NullRiskManagementModel(RiskManagementModel):
+    pass
+
+
+class ExecutionModel:
+
+    def Execute(self, algorithm, targets):
+        pass
+
+    def OnSecuritiesChanged(self, algorithm, changes):
+        pass
+
+    def OnOrderEvent(self, algorithm, orderEvent):
+        pass
+
+
+class UniverseSelectionModel:
+
+    def __init__(self):
+        self.Symbols = []
+
+
+class ManualUniverseSelectionModel(UniverseSelectionModel):
+
+    def __init__(self, symbols):
+        self.Symbols = list(symbols)
+
+
+class DefaultBrokerageModel:
+
+    def __init__(self, *args):
+        self.ShortableProvider = None
+
+
+class InteractiveBrokersBrokerageModel(DefaultBrokerageModel):
+    pass
+
+
+class AlphaStreamsBrokerageModel(DefaultBrokerageModel):
+    pass
+
+
+class AtreyuShortableProvider:
+
+    def __init__(self, securityType, market):
+        self.SecurityType = securityType
+        self.Market = market
+
+    def ShortableQuantity(self, symbol, localTime):
+        return None
@@ -0,0 +1,25 @@
+'''
+Offline harness to run the algorithm and its framework models without LEAN, clr or network access.
+
+    Loader: Installs stand-ins for the clr, System and QuantConnect modules and loads the project files
+    Harness: Drives an algorithm through scheduled events, OnData and the framework pipeline on local bars
+    DataFeed: Reads daily and minute CSV or Parquet bars and answers History requests
+    SyntheticData: Writes reproducible bar files to run against
+    Benchmarks: Times the hot paths against a stored baseline, run with python -m LocalHarness.Benchmarks
+    Tests: Checks the optimized components against the implementations they replaced, run with python -m pytest LocalHarness/Tests
+
+Example:
+
+    from LocalHarness import Harness, SyntheticData
+    SyntheticData.Write('data', start=date(2010, 1, 1), end=date(2021, 12, 31))
+    result = Harness('data', Start='2021-10-01', End='2021-12-31').Run()
+    print(result.Summary())
+
+Requires numpy, pandas, scipy and pytz, which the QuantConnect environment provides. Parquet files need pyarrow.
+'''
+
+from .Types import Resolution
+from .Loader import Loader
+from .DataFeed import DataFeed
+from .Harness import Harness, BacktestResult
+from .SyntheticData import SyntheticData
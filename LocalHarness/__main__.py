@@ -0,0 +1,39 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import argparse
+import os
+from datetime import *
+
+from .Types import Resolution
+from .Harness import Harness
+from .SyntheticData import SyntheticData
+
+
+##-------------------Command line entry point--------------------------------------------------##
+
+def Main():
+    parser = argparse.ArgumentParser(prog='python -m LocalHarness', description='Runs the algorithm locally on bars from disk')
+    parser.add_argument('--data', default='data', help='Folder holding daily/ and minute/ bar files')
+    parser.add_argument('--start', help='Start date, YYYY-MM-DD. Defaults to the date set in Initialize')
+    parser.add_argument('--end', help='End date, YYYY-MM-DD. Defaults to the last daily bar')
+    parser.add_argument('--cash', type=float)
+    parser.add_argument('--daily', action='store_true', help='Step once per day at the close instead of every minute')
+    parser.add_argument('--synthetic', action='store_true', help='Write synthetic bars to the data folder when it is empty')
+    parser.add_argument('--parameter', action='append', default=[], help='NAME=VALUE returned by GetParameter')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    if args.synthetic and not os.path.isdir(os.path.join(args.data, 'daily')):
+        end = date.fromisoformat(args.end) if args.end else date(2021, 12, 31)
+        SyntheticData.Write(args.data, start=date(end.year - 20, 1, 1), end=end)
+
+    harness = Harness(args.data, Start=args.start, End=args.end, Cash=args.cash,
+                      StepResolution=Resolution.Daily if args.daily else Resolution.Minute,
+                      Parameters=dict(x.split('=', 1) for x in args.parameter), Verbose=args.verbose)
+
+    result = harness.Run()
+    print(result.Summary())
+
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,152 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+from datetime import *
+
+##-------------------Global variables---------------------------------------------------------##
+
+Zero = int(0)
+
+# QuantConnect keeps at most this many points of a series in a backtest chart
+MaxPlotPoints = int(4000)
+
+# Lines joined into one algorithm.Log call, and the limits of the channels the models write to
+BatchSize = int(20)
+DefaultChannels = {
+    'VIX': {'Limit': 4, 'Sample': 1},
+    'Overnight': {'Limit': 2, 'Sample': 1},
+    'Targets': {'Limit': 50, 'Sample': 1},
+    'Orders': {'Limit': 50, 'Sample': 1},
+    'Margin': {'Limit': 20, 'Sample': 1}}
+
+
+##-------------------Limits of one log channel--------------------------------------------------##
+
+class LogChannel:
+    '''
+        Limit: Most messages emitted per day, None for no limit
+        Sample: Emits every Sample-th message offered to the channel
+    '''
+
+    def __init__(self, Limit=None, Sample=1):
+        self.Limit = Limit
+        self.Sample = max(int(Sample), 1)
+        self.Offered = Zero
+        self.Emitted = Zero
+        self.Suppressed = Zero
+
+    def Accept(self):
+        self.Offered += 1
+
+        if (self.Offered - 1) % self.Sample or (self.Limit is not None and self.Emitted >= self.Limit):
+            self.Suppressed += 1
+            return False
+
+        self.Emitted += 1
+        return True
+
+    def NewDay(self):
+        self.Emitted = Zero
+        self.Suppressed = Zero
+
+
+##-------------------Buffered, rate limited logging and downsampled charts---------------------##
+
+class LogSink:
+    '''
+    Replaces inline algorithm.Log and algorithm.Plot calls on the hot paths.
+
+    Log passes a message through its channel's sampling and daily limit before the message is formatted, so a
+    suppressed message never builds its string. In backtests accepted lines are buffered and written BatchSize at a
+    time as a single algorithm.Log call. In live mode they are written at once, so order and margin messages are
+    neither late nor lost with the process. Flush, called at the market close and at the end of the algorithm,
+    writes the rest along with the number of messages each channel suppressed that day.
+
+    Plot keeps the first point of every series in each PlotInterval, which spreads MaxPlotPoints evenly over the
+    backtest. In live mode every point is plotted.
+    '''
+
+    Channels = {}
+    Buffer = []
+    Plotted = {}
+    PlotInterval = timedelta(0)
+    Batched = True
+
+    def __init__(self):
+        pass
+
+    def Initialize(algorithm, **channels):
+        '''
+        Channels passed as keyword arguments, such as VIX={'Sample': 5}, override DefaultChannels
+        '''
+        LogSink.Buffer = []
+        LogSink.Plotted = {}
+        LogSink.Channels = {name: LogChannel(**settings) for name, settings in {**DefaultChannels, **channels}.items()}
+        LogSink.Batched = not algorithm.LiveMode
+
+        if algorithm.LiveMode:
+            LogSink.PlotInterval = timedelta(0)
+        else:
+            end = algorithm.EndDate or datetime.now()
+            LogSink.PlotInterval = max(end - algorithm.StartDate, timedelta(0)) / MaxPlotPoints
+
+    ##-----------------Logging-----------------------------------------------------------------------##
+
+    def Log(algorithm, channel, message, *args):
+        '''
+        Message is a format string for args, or a callable returning the message. Both are only evaluated when emitted
+        '''
+        gate = LogSink.Channels.get(channel)
+
+        if gate is None:
+            gate = LogSink.Channels[channel] = LogChannel()
+
+        if not gate.Accept():
+            return
+
+        text = message() if callable(message) else message.format(*args) if args else message
+
+        if not LogSink.Batched:
+            algorithm.Log(text)
+            return
+
+        LogSink.Buffer.append((algorithm.Time, text))
+
+        if len(LogSink.Buffer) >= BatchSize:
+            LogSink.Write(algorithm)
+
+    def Write(algorithm):
+        if not LogSink.Buffer:
+            return
+
+        # Lines buffered at an earlier time keep their own time stamp
+        now = algorithm.Time
+        lines = [text if when == now else f'{when} {text}' for when, text in LogSink.Buffer]
+        LogSink.Buffer = []
+
+        algorithm.Log('\n'.join(lines))
+
+    def Flush(algorithm):
+        '''
+        Writes the buffered lines and the suppressed counts, then starts a new day for every channel
+        '''
+        suppressed = [f'{name}: {channel.Suppressed}' for name, channel in LogSink.Channels.items() if channel.Suppressed]
+
+        if suppressed:
+            LogSink.Buffer.append((algorithm.Time, f'Suppressed log messages || {" | ".join(suppressed)}'))
+
+        LogSink.Write(algorithm)
+
+        for channel in LogSink.Channels.values():
+            channel.NewDay()
+
+    ##-----------------Charting----------------------------------------------------------------------##
+
+    def Plot(algorithm, chart, series, value):
+        key = (chart, series)
+        last = LogSink.Plotted.get(key)
+
+        if last is not None and algorithm.Time - last < LogSink.PlotInterval:
+            return
+
+        LogSink.Plotted[key] = algorithm.Time
+        algorithm.Plot(chart, series, value)
@@ -0,0 +1,245 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import functools
+from time import perf_counter_ns
+
+##-------------------Global variables---------------------------------------------------------##
+
+Zero = int(0)
+
+# Each power of two of nanoseconds is split into 2**SubBucketBits buckets, a relative error of at most 12.5%
+SubBucketBits = 3
+SubBuckets = 1 << SubBucketBits
+Buckets = 64 * SubBuckets
+EnabledValues = ('1', 'true', 'yes', 'on')
+
+
+##-------------------Log bucketed latency histogram--------------------------------------------##
+
+class LatencyHistogram:
+    '''
+    HDR style histogram of nanosecond latencies. Values below 2 * SubBuckets are counted exactly, larger values in
+    SubBuckets linear buckets per power of two, so recording is one bit_length and one list increment
+    '''
+
+    def __init__(self):
+        self.Counts = [Zero] * Buckets
+        self.Count = Zero
+        self.Total = Zero
+        self.Max = Zero
+        self.HistoryRequests = Zero
+
+    def Record(self, value):
+        shift = value.bit_length() - SubBucketBits - 1
+
+        if shift <= 0:
+            self.Counts[value] += 1
+        else:
+            self.Counts[(shift << SubBucketBits) + (value >> shift)] += 1
+
+        self.Count += 1
+        self.Total += value
+
+        if value > self.Max:
+            self.Max = value
+
+    def UpperBound(bucket):
+        '''
+        Largest value counted in the bucket
+        '''
+        if bucket < 2 * SubBuckets:
+            return bucket
+
+        shift = (bucket >> SubBucketBits) - 1
+        return ((bucket - (shift << SubBucketBits) + 1) << shift) - 1
+
+    def Percentile(self, q):
+        if not self.Count:
+            return Zero
+
+        rank = max(1, int(round(q / 100 * self.Count)))
+        seen = Zero
+
+        for bucket, count in enumerate(self.Counts):
+            seen += count
+            if seen >= rank:
+                return min(LatencyHistogram.UpperBound(bucket), self.Max)
+
+        return self.Max
+
+    def Merge(self, other):
+        for bucket, count in enumerate(other.Counts):
+            if count:
+                self.Counts[bucket] += count
+
+        self.Count += other.Count
+        self.Total += other.Total
+        self.Max = max(self.Max, other.Max)
+        self.HistoryRequests += other.HistoryRequests
+
+    def Duration(value):
+        if value < 1000:
+            return f'{value}ns'
+        if value < 1000000:
+            return f'{value / 1000:.1f}us'
+        if value < 1000000000:
+            return f'{value / 1000000:.1f}ms'
+
+        return f'{value / 1000000000:.2f}s'
+
+    def Summary(self):
+        return (f'n={self.Count} p50={LatencyHistogram.Duration(self.Percentile(50))} p99={LatencyHistogram.Duration(self.Percentile(99))} '
+                f'max={LatencyHistogram.Duration(self.Max)} total={LatencyHistogram.Duration(self.Total)} hist={self.HistoryRequests}')
+
+
+##-------------------Opt-in timing of the hot paths--------------------------------------------##
+
+class Profiler:
+    '''
+    Times the decorated framework methods and the Section blocks into one LatencyHistogram per name, and counts the
+    History requests made inside each of them. History requests made outside any timed call, such as in scheduled
+    events, are counted under "Other".
+
+    Profiling is off unless Initialize finds the "profile" parameter set to 1, true, yes or on. While it is off a
+    decorated method costs one attribute check and Section returns a shared no-op context manager.
+
+    EndOfDay logs the day's histograms and folds them into the totals that EndOfAlgorithm logs.
+    '''
+
+    Enabled = False
+    Day = {}
+    Totals = {}
+    Stack = []
+    OtherHistoryRequests = Zero
+    TotalOtherHistoryRequests = Zero
+
+    def __init__(self):
+        pass
+
+    def Initialize(algorithm, parameter='profile'):
+        Profiler.Reset()
+        Profiler.Enabled = str(algorithm.GetParameter(parameter) or '').strip().lower() in EnabledValues
+
+        if Profiler.Enabled:
+            Profiler.CountHistory(algorithm)
+            algorithm.Log('PROFILE: Hot path profiling enabled')
+
+    def Reset():
+        Profiler.Enabled = False
+        Profiler.Day = {}
+        Profiler.Totals = {}
+        Profiler.Stack = []
+        Profiler.OtherHistoryRequests = Zero
+        Profiler.TotalOtherHistoryRequests = Zero
+
+    def CountHistory(algorithm):
+        '''
+        Replaces History on the algorithm instance with a wrapper that charges each request to the innermost timed call
+        '''
+        History = algorithm.History
+
+        def CountedHistory(*args, **kwargs):
+            if Profiler.Stack:
+                Profiler.Stack[-1].HistoryRequests += 1
+            else:
+                Profiler.OtherHistoryRequests += 1
+
+            return History(*args, **kwargs)
+
+        algorithm.History = CountedHistory
+
+    ##-----------------Decorator and context manager---------------------------------------------##
+
+    def Timed(name):
+        def Decorator(function):
+
+            @functools.wraps(function)
+            def Wrapper(*args, **kwargs):
+                if not Profiler.Enabled:
+                    return function(*args, **kwargs)
+
+                histogram = Profiler.Histogram(name)
+                Profiler.Stack.append(histogram)
+                started = perf_counter_ns()
+
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    histogram.Record(perf_counter_ns() - started)
+                    Profiler.Stack.pop()
+
+            return Wrapper
+
+        return Decorator
+
+    def Section(name):
+        return TimedSection(name) if Profiler.Enabled else NoSection
+
+    def Histogram(name):
+        histogram = Profiler.Day.get(name)
+
+        if histogram is None:
+            histogram = Profiler.Day[name] = LatencyHistogram()
+
+        return histogram
+
+    ##-----------------Summaries-------------------------------------------------------------------##
+
+    def EndOfDay(algorithm, scope=None):
+        if not Profiler.Enabled:
+            return
+
+        Profiler.Log(algorithm, scope or f'Day {algorithm.Time.date()}', Profiler.Day, Profiler.OtherHistoryRequests)
+
+        for name, histogram in Profiler.Day.items():
+            Profiler.Totals.setdefault(name, LatencyHistogram()).Merge(histogram)
+
+        Profiler.TotalOtherHistoryRequests += Profiler.OtherHistoryRequests
+        Profiler.Day = {}
+        Profiler.OtherHistoryRequests = Zero
+
+    def EndOfAlgorithm(algorithm):
+        if not Profiler.Enabled:
+            return
+
+        # Calls after the last market close event, such as the closing bar, still belong in the totals
+        if Profiler.Day or Profiler.OtherHistoryRequests:
+            Profiler.EndOfDay(algorithm, 'After close')
+
+        Profiler.Log(algorithm, 'Total', Profiler.Totals, Profiler.TotalOtherHistoryRequests)
+
+    def Log(algorithm, scope, histograms, other):
+        for name, histogram in sorted(histograms.items(), key=lambda x: -x[1].Total):
+            algorithm.Log(f'PROFILE {scope}: {name} {histogram.Summary()}')
+
+        algorithm.Log(f'PROFILE {scope}: Other hist={other}')
+
+
+##-------------------Context managers returned by Profiler.Section----------------------------##
+
+class TimedSection:
+
+    def __init__(self, name):
+        self.Histogram = Profiler.Histogram(name)
+
+    def __enter__(self):
+        Profiler.Stack.append(self.Histogram)
+        self.Started = perf_counter_ns()
+        return self
+
+    def __exit__(self, *args):
+        self.Histogram.Record(perf_counter_ns() - self.Started)
+        Profiler.Stack.pop()
+        return False
+
+
+class NullSection:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+NoSection = NullSection()
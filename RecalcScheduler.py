@@ -0,0 +1,40 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+from DailyBarCache import DailyBarCache
+
+
+##-------------------Class to dispatch the annual statistic recalculation----------------------##
+
+class RecalcScheduler:
+    '''
+    Registers one scheduled event that fires after the open on the first trading day of each month and,
+    in January, invalidates the shared daily bars and calls every registered statistic provider.
+
+    Providers are callables taking the algorithm, registered once by name.
+    '''
+
+    Providers = {}
+
+    def __init__(self):
+        pass
+
+    def Initialize(algorithm, ticker="TQQQ"):
+        RecalcScheduler.Providers = {}
+        algorithm.Schedule.On(algorithm.DateRules.MonthStart(ticker), algorithm.TimeRules.AfterMarketOpen(ticker, 1),
+                              lambda: RecalcScheduler.Dispatch(algorithm))
+
+    def Register(name, provider):
+        RecalcScheduler.Providers[name] = provider
+
+    ##-----------------Runs every provider on the first trading day of the year-------------------##
+
+    def Dispatch(algorithm):
+        if algorithm.Time.month != 1:
+            return
+
+        DailyBarCache.Invalidate(algorithm)
+
+        for name, provider in RecalcScheduler.Providers.items():
+            provider(algorithm)
+
+        algorithm.Log(f'Annual recalculation completed for: {list(RecalcScheduler.Providers)} || Year: {algorithm.Time.year}')
@@ -1,4 +1,5 @@
 # Imports
+import numpy as np
 from datetime import datetime, timedelta
 
 from clr import AddReference
@@ -12,6 +13,12 @@ from QuantConnect import Resolution, Extensions
 from QuantConnect.Algorithm.Framework.Portfolio import *
 from QuantConnect.Algorithm.Framework.Risk import *
 
+from DailyBarCache import DailyBarCache
+from StatisticsStore import StatisticsStore
+from RecalcScheduler import RecalcScheduler
+from HoldingsIndex import HoldingsIndex
+from Profiling import Profiler
+
 # Global variables
 Zero = int(0)
 
@@ -28,13 +35,14 @@ class TrailingStop(RiskManagementModel):
         '''
 
         # Long Position Variables
-        self.LongTrail = {}
         self.LongTrailingDrawdown = float(0.20)
 
         # Short Position Variables
-        self.ShortTrail = {}
         self.ShortTrailingDrawdown = float(0.20)
 
+        # Trail state for every open position
+        self.Trails = TrailState()
+
         # Asset specific metrics
         self.DynamicDrawdown = DynamicDrawdown
         self.Deviations = Deviations
@@ -42,8 +50,9 @@ class TrailingStop(RiskManagementModel):
         self.AssetData = {}
 
         # Other variables
-        self.timer = None
+        self.Tracked = set()
 
+    @Profiler.Timed('TrailingStop.ManageRisk')
     def ManageRisk(self, algorithm, targets):
         '''
         Main risk management handler. Passes algorithm and targets
@@ -51,109 +60,71 @@ class TrailingStop(RiskManagementModel):
         '''
         RiskAdjustedTargets = []
 
-        for asset in algorithm.Securities.Keys:
-            if not algorithm.Portfolio[asset].Invested:
-                self.LongTrail[asset] = [algorithm.Securities[asset].Price, 0]
-                self.ShortTrail[asset] = [algorithm.Securities[asset].Price, 0]
+        invested = HoldingsIndex.Current(algorithm)
 
-            if asset in self.AssetData and self.DynamicDrawdown:
-                self.AssetData[asset].AnnualRecalc(asset, algorithm)
+        # Clear the trails of positions closed since the last call so they restart on the next entry
+        for asset in self.Tracked - invested:
+            self.Trails.Remove(asset)
 
-        invested = [x.Key for x in algorithm.Portfolio if x.Value.Invested]
+        self.Tracked = set(invested)
 
         if invested:
-            for asset in invested:
-
-                if self.DynamicDrawdown:
-                    self.CalculatedStop(algorithm, asset, RiskAdjustedTargets)
-
-                else:
-                    if not self.timer == algorithm.Time.day:
-                        for asset in invested:
-                            self.AssetData[asset].GetPerformanceData(algorithm)
-                        self.timer = algorithm.Time.day
-
-                    self.SpecificStop(algorithm, asset, RiskAdjustedTargets)
+            self.EvaluateStops(algorithm, list(invested), RiskAdjustedTargets)
 
         return RiskAdjustedTargets
 
-    def SpecificStop(self, algorithm, asset, RiskAdjustedTargets):
+    def EvaluateStops(self, algorithm, assets, RiskAdjustedTargets):
         '''
-        Uses a static drawdown set by the user for all assets
+        Gathers each position's price and quantity once, then updates every trail and checks every stop in a single pass.
+        Uses the static drawdowns set by the user for all assets, or the derived drawdown of each asset when DynamicDrawdown is True
         '''
 
-        if algorithm.Portfolio[asset].IsLong:
-            if asset not in self.LongTrail or self.LongTrail[asset][1] == 0:
-                self.LongTrail[asset] = [algorithm.Portfolio[asset].Price, algorithm.Portfolio[asset].Quantity]
+        holdings = [algorithm.Portfolio[asset] for asset in assets]
+        prices = np.array([float(x.Price) for x in holdings])
+        quantities = np.array([float(x.Quantity) for x in holdings])
 
-            elif algorithm.Portfolio[asset].Price > self.LongTrail[asset][0]:
-                self.LongTrail[asset][0] = algorithm.Portfolio[asset].Price
+        if self.DynamicDrawdown:
+            thresholds = np.array([self.AssetData[asset].TrailingDrawdown for asset in assets])
+        else:
+            thresholds = np.where(quantities > 0, max(self.MinimumRisk, self.LongTrailingDrawdown),
+                                  max(self.MinimumRisk, self.ShortTrailingDrawdown))
 
-            elif algorithm.Portfolio[asset].Price / self.LongTrail[asset][0] < min(1 - self.MinimumRisk,
-                                                                                   (1 - self.LongTrailingDrawdown)):
-                RiskAdjustedTargets.append(PortfolioTarget(asset, 0))
-                algorithm.Log(
-                    f'Long trailing Stop Triggered for {asset}.  Current Price: {algorithm.Portfolio[asset].Price} | Highest Price: {self.LongTrail[asset][0]} | Loss: {abs(round((algorithm.Portfolio[asset].Price / self.LongTrail[asset][0]) - 1, 3)) * 100}% | Date: {algorithm.Time}')
-                self.LongTrail.pop(asset)
+        for i, extreme in self.Trails.Update(assets, prices, quantities, thresholds):
+            asset = assets[i]
+            RiskAdjustedTargets.append(PortfolioTarget(asset, 0))
 
-
-        elif algorithm.Portfolio[asset].IsShort:
-            if asset not in self.ShortTrail or self.ShortTrail[asset][1] == 0:
-                self.ShortTrail[asset] = [algorithm.Portfolio[asset].Price, algorithm.Portfolio[asset].Quantity]
-
-            elif algorithm.Portfolio[asset].Price < self.ShortTrail[asset][0]:
-                self.ShortTrail[asset][0] = algorithm.Portfolio[asset].Price
-
-            elif algorithm.Portfolio[asset].Price / self.ShortTrail[asset][0] > max(1 + self.MinimumRisk,
-                                                                                    (1 + self.ShortTrailingDrawdown)):
-                RiskAdjustedTargets.append(PortfolioTarget(asset, 0))
+            if quantities[i] > 0:
                 algorithm.Log(
-                    f'Short trailing Stop Triggered for {asset}. Current Price: {algorithm.Portfolio[asset].Price} | Lowest Price: {self.ShortTrail[asset][0]} | Loss: {abs(round((algorithm.Portfolio[asset].Price / self.ShortTrail[asset][0]) - 1, 3)) * 100}% | Date: {algorithm.Time}')
-                self.ShortTrail.pop(asset)
+                    f'Long trailing Stop Triggered for {asset}.  Current Price: {prices[i]} | Highest Price: {extreme} | Loss: {abs(round((prices[i] / extreme) - 1, 3)) * 100}% | Date: {algorithm.Time}')
+            else:
+                algorithm.Log(
+                    f'Short trailing Stop Triggered for {asset}. Current Price: {prices[i]} | Lowest Price: {extreme} | Loss: {abs(round((prices[i] / extreme) - 1, 3)) * 100}% | Date: {algorithm.Time}')
 
-    def CalculatedStop(self, algorithm, asset, RiskAdjustedTargets):
+    def AnnualRecalc(self, algorithm):
         '''
-        Uses a derived drawdown set by the user for each asset
+        Adjusts the asset specific drawdowns once per year and stores them. Called by RecalcScheduler on the first trading day of the year
         '''
 
-        if algorithm.Portfolio[asset].IsLong:
-            if asset not in self.LongTrail or self.LongTrail[asset][1] == 0:
-                self.LongTrail[asset] = [algorithm.Portfolio[asset].Price, algorithm.Portfolio[asset].Quantity]
-
-            elif algorithm.Portfolio[asset].Price > self.LongTrail[asset][0]:
-                self.LongTrail[asset][0] = algorithm.Portfolio[asset].Price
+        SymbolData.PerformanceData(algorithm, list(self.AssetData.values()))
 
-            elif algorithm.Portfolio[asset].Price / self.LongTrail[asset][0] < (
-                    1 - self.AssetData[asset].TrailingDrawdown):
-                RiskAdjustedTargets.append(PortfolioTarget(asset, 0))
-                algorithm.Log(
-                    f'Long trailing Stop Triggered for {asset}.  Current Price: {algorithm.Portfolio[asset].Price} | Highest Price: {self.LongTrail[asset][0]} | Loss: {abs(round((algorithm.Portfolio[asset].Price / self.LongTrail[asset][0]) - 1, 3)) * 100}% | Date: {algorithm.Time}')
-                self.LongTrail.pop(asset)
-
-
-        elif algorithm.Portfolio[asset].IsShort:
-            if asset not in self.ShortTrail or self.ShortTrail[asset][1] == 0:
-                self.ShortTrail[asset] = [algorithm.Portfolio[asset].Price, algorithm.Portfolio[asset].Quantity]
-
-            elif algorithm.Portfolio[asset].Price < self.ShortTrail[asset][0]:
-                self.ShortTrail[asset][0] = algorithm.Portfolio[asset].Price
-
-            elif algorithm.Portfolio[asset].Price / self.ShortTrail[asset][0] > (
-                    1 + self.AssetData[asset].TrailingDrawdown):
-                RiskAdjustedTargets.append(PortfolioTarget(asset, 0))
-                algorithm.Log(
-                    f'Short trailing Stop Triggered for {asset}. Current Price: {algorithm.Portfolio[asset].Price} | Lowest Price: {self.ShortTrail[asset][0]} | Loss: {abs(round((algorithm.Portfolio[asset].Price / self.ShortTrail[asset][0]) - 1, 3)) * 100}% | Date: {algorithm.Time}')
-                self.ShortTrail.pop(asset)
+        for symbolData in self.AssetData.values():
+            symbolData.SaveStatistics(algorithm)
 
     def OnSecuritiesChanged(self, algorithm, changes):
 
+        # Static drawdowns never read the asset specific ones
+        if not self.DynamicDrawdown:
+            return
+
         for added in changes.AddedSecurities:
             # Get performance data and derive risk boundaries
             symbolData = SymbolData(added, self.Deviations, self.MinimumRisk)
-            symbolData.GetPerformanceData(algorithm)
+            symbolData.LoadPerformanceData(algorithm)
 
             self.AssetData[added.Symbol] = symbolData
 
+        RecalcScheduler.Register('Trailing Stop Risk Model', self.AnnualRecalc)
+
 
 class ManageDrawdownRisk(RiskManagementModel):
 
@@ -169,6 +140,7 @@ class ManageDrawdownRisk(RiskManagementModel):
         # Short Position Variables
         self.ShortDrawdownLimit = -float(0.15)
 
+    @Profiler.Timed('ManageDrawdownRisk.ManageRisk')
     def ManageRisk(self, algorithm, targets):
         '''
         Main risk management handler. Passes algorithm and targets
@@ -177,10 +149,10 @@ class ManageDrawdownRisk(RiskManagementModel):
 
         RiskAdjustedTargets = []
 
-        invested = [x.Key for x in algorithm.Portfolio if x.Value.Invested]
+        invested = HoldingsIndex.Current(algorithm)
 
         if invested:
-            for asset in invested:
+            for asset in list(invested):
 
                 if algorithm.Portfolio[asset].IsLong:
                     self.LongPositions(algorithm, asset, RiskAdjustedTargets)
@@ -217,49 +189,143 @@ class ManageDrawdownRisk(RiskManagementModel):
         return RiskAdjustedTargets
 
 
+class TrailState:
+    '''
+    Struct-of-arrays trailing stop state. Each open position owns one row holding its side, extreme price and quantity.
+    Drawdown thresholds are passed to Update on every call.
+    Rows are removed by swapping in the last row so the arrays stay compact.
+    '''
+
+    def __init__(self):
+        self.Rows = {}
+        self.Symbols = []
+        self.Side = np.zeros(0)
+        self.Extreme = np.zeros(0)
+        self.Quantity = np.zeros(0)
+
+    def Row(self, symbol):
+        if symbol not in self.Rows:
+            self.Rows[symbol] = len(self.Symbols)
+            self.Symbols.append(symbol)
+            self.Side = np.append(self.Side, 0)
+            self.Extreme = np.append(self.Extreme, 0)
+            self.Quantity = np.append(self.Quantity, 0)
+
+        return self.Rows[symbol]
+
+    def Remove(self, symbol):
+        row = self.Rows.pop(symbol, None)
+        if row is None:
+            return
+
+        last = len(self.Symbols) - 1
+        if row != last:
+            moved = self.Symbols[last]
+            self.Symbols[row] = moved
+            self.Rows[moved] = row
+            for array in (self.Side, self.Extreme, self.Quantity):
+                array[row] = array[last]
+
+        self.Symbols.pop()
+        self.Side = self.Side[:last]
+        self.Extreme = self.Extreme[:last]
+        self.Quantity = self.Quantity[:last]
+
+    def Update(self, symbols, prices, quantities, thresholds):
+        '''
+        Starts trails for new positions or positions that changed side, moves the extremes of the others and returns (position, extreme)
+        for every triggered stop. Triggered trails are removed so they restart on the next entry
+        '''
+
+        rows = np.array([self.Row(symbol) for symbol in symbols], dtype=int)
+        sides = np.sign(quantities)
+
+        fresh = (self.Side[rows] != sides) | (self.Quantity[rows] == 0)
+        extremes = np.where(fresh, prices, self.Extreme[rows])
+        ratios = prices / extremes
+
+        longs = ~fresh & (sides > 0)
+        shorts = ~fresh & (sides < 0)
+        triggered = (longs & (prices <= extremes) & (ratios < 1 - thresholds)) | (shorts & (prices >= extremes) & (ratios > 1 + thresholds))
+
+        extremes = np.where(longs, np.maximum(extremes, prices), np.where(shorts, np.minimum(extremes, prices), extremes))
+
+        self.Side[rows] = sides
+        self.Extreme[rows] = extremes
+        self.Quantity[rows] = np.where(fresh, quantities, self.Quantity[rows])
+
+        stops = [(i, float(extremes[i])) for i in np.flatnonzero(triggered)]
+        for i, extreme in stops:
+            self.Remove(symbols[i])
+
+        return stops
+
+
 class SymbolData:
 
     def __init__(self, security, Deviations, MinimumRisk):
-        self.Reset = False
         self.Symbol = security.Symbol
         self.Deviations = Deviations
         self.TrailingDrawdown = float(1.0)
         self.MinimumRisk = MinimumRisk
 
-    def AnnualRecalc(self, symbol, algorithm):
+    def LoadPerformanceData(self, algorithm):
         '''
-        Adjusts the annual statistics once per year on the first trading day of the year
+        Restores the trailing drawdown saved by a previous run when still valid, otherwise derives it from price data
         '''
 
-        # Once per year update the VIX statistics with the previuos 4000 days data
-        firstTradingDay = date(algorithm.Time.year, 1, 3)
-        if algorithm.Time.date() == self.GetNextWeekday(firstTradingDay):
-            self.Reset = True
+        Snapshot = StatisticsStore.Load(algorithm, 'TrailingDrawdown', self.Symbol, self.StatisticsKey())
 
-        if (self.Reset and algorithm.Time.date() == self.GetNextWeekday(firstTradingDay) + timedelta(days=1)):
+        if Snapshot is None:
             self.GetPerformanceData(algorithm)
-            self.Reset = False
+            self.SaveStatistics(algorithm)
+        else:
+            self.TrailingDrawdown = Snapshot['TrailingDrawdown']
+
+    def StatisticsKey(self):
+        return f'{self.Deviations}-{self.MinimumRisk}'
 
     def GetPerformanceData(self, algorithm):
         '''
         Defines asset specific drawdowns based on historic price data. Looks at the percent change from day high to day low individusally.
         '''
 
-        History = algorithm.History(self.Symbol, timedelta(days=365), Resolution.Daily)
-        IntradayHighLow = abs(History['high'] / History['low'] - 1)
+        SymbolData.PerformanceData(algorithm, [self])
 
-        MeanIntradayHighLow = round(IntradayHighLow.mean(), 3)
-        STDIntradayHighLow = round(IntradayHighLow.std(), 3)
+    def PerformanceData(algorithm, symbolDatas):
+        '''
+        Derives the drawdowns of several assets at once. The daily bars are loaded or topped up with a single request and the
+        previous year of intraday ranges is stacked into one NaN padded matrix so every mean and STD comes from one vectorized pass.
+        '''
+
+        if not symbolDatas:
+            return
+
+        DailyBarCache.Preload(algorithm, [x.Symbol for x in symbolDatas])
+
+        start = algorithm.Time - timedelta(days=365)
+        ranges = []
+        for symbolData in symbolDatas:
+            Bars = DailyBarCache.Bars[symbolData.Symbol]
+            Window = Bars.Since(start)
+            ranges.append(np.abs(Bars.High[Window] / Bars.Low[Window] - 1))
 
+        IntradayHighLow = np.full((len(ranges), max(1, max(len(x) for x in ranges))), np.nan)
+        for i, values in enumerate(ranges):
+            IntradayHighLow[i, :len(values)] = values
+
+        MeanIntradayHighLow = np.round(np.nanmean(IntradayHighLow, axis=1), 3)
+        STDIntradayHighLow = np.round(np.nanstd(IntradayHighLow, axis=1, ddof=1), 3)
+
+        for symbolData, mean, std in zip(symbolDatas, MeanIntradayHighLow, STDIntradayHighLow):
+            symbolData.SetTrailingDrawdown(algorithm, float(mean), float(std))
+
+    def SetTrailingDrawdown(self, algorithm, MeanIntradayHighLow, STDIntradayHighLow):
         self.TrailingDrawdown = max(self.MinimumRisk,
                                     float(round(MeanIntradayHighLow + self.Deviations * STDIntradayHighLow, 3)))
         algorithm.Log(
             f'{self.Symbol} | Mean: {MeanIntradayHighLow} | STD: {STDIntradayHighLow} | Drawdown: {self.TrailingDrawdown}')
 
-    def GetNextWeekday(self, RandomDate):
-        RandomDate += timedelta(days=1)
-
-        while RandomDate.weekday() > int(4):  # Mon-Fri are 0-4
-            RandomDate += timedelta(days=1)
-
-        return RandomDate
+    def SaveStatistics(self, algorithm):
+        StatisticsStore.Save(algorithm, 'TrailingDrawdown', self.Symbol, self.StatisticsKey(),
+                             {'TrailingDrawdown': self.TrailingDrawdown})
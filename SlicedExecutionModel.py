@@ -0,0 +1,199 @@
+from clr import AddReference
+
+AddReference("System")
+AddReference("QuantConnect.Common")
+AddReference("QuantConnect.Algorithm")
+AddReference("QuantConnect.Algorithm.Framework")
+
+from System import *
+from QuantConnect import *
+from QuantConnect.Orders import *
+from QuantConnect.Algorithm import *
+from QuantConnect.Data.Consolidators import *
+from datetime import timedelta
+
+from LogSink import LogSink
+
+# Global variables
+Zero = int(0)
+Closed = (OrderStatus.Filled, OrderStatus.Canceled, OrderStatus.Invalid)
+
+
+class SlicedExecutionModel(ExecutionModel):
+    '''
+    Solution 2: Slice each target into child market orders over a fixed horizon and report the realized slippage against the arrival price
+
+        Horizon: Time over which each target is worked
+        Interval: Spacing of child orders and size of the consolidated bars used to measure traded volume
+        Schedule: 'TWAP' submits an equal share of the target every interval. 'Participation' submits ParticipationRate of the volume
+                  traded since the target arrived. Whatever is left when the horizon ends is submitted at once under both schedules.
+
+        A rejected child order stops its parent at the quantity already submitted, instead of resubmitting the rejected quantity
+        every interval. The next target for the symbol starts a new parent.
+    '''
+
+    def __init__(self, Horizon=timedelta(minutes=30), Interval=timedelta(minutes=1), Schedule='TWAP', ParticipationRate=0.1):
+        self.Horizon = Horizon
+        self.Interval = Interval
+        self.Schedule = Schedule
+        self.ParticipationRate = ParticipationRate
+        self.Parents = {}
+        self.Consolidators = {}
+        self.Slippage = []
+
+    def Execute(self, algorithm, targets):
+
+        # Every new target replaces the parent order working its symbol
+        for target in targets:
+            self.StartParent(algorithm, target)
+
+        for symbol, parent in list(self.Parents.items()):
+            if not parent.Stopped and parent.Rejected():
+                self.StopParent(algorithm, parent)
+
+            quantity = Zero if parent.Stopped else parent.ChildQuantity(algorithm, self)
+
+            if quantity != Zero and (quantity > 0 or algorithm.Shortable(symbol, quantity)):
+                ticket = algorithm.MarketOrder(symbol, quantity, False, f'Slice {len(parent.Tickets) + 1}')
+                parent.Tickets.append(ticket)
+
+                if ticket.Status == OrderStatus.Invalid:
+                    self.StopParent(algorithm, parent)
+
+            if parent.IsComplete():
+                self.CompleteParent(algorithm, parent)
+
+    ##-----------------Parent order bookkeeping---------------------------------------------------------------------##
+
+    def StartParent(self, algorithm, target):
+        symbol = target.Symbol
+
+        if symbol in self.Parents:
+            self.CompleteParent(algorithm, self.Parents[symbol])
+
+        quantity = OrderSizing.GetUnorderedQuantity(algorithm, target)
+        if quantity != Zero:
+            security = algorithm.Securities[symbol]
+            self.Parents[symbol] = ParentOrder(symbol, quantity, float(security.Price), algorithm.UtcTime, algorithm.Time,
+                                               self.Horizon, float(security.SymbolProperties.LotSize))
+
+    def StopParent(self, algorithm, parent):
+        target = parent.Quantity
+        parent.Stop()
+
+        LogSink.Log(algorithm, 'Orders', '{0} slice rejected by the brokerage. Stopping the parent order at {1} of {2} after {3} orders',
+                    parent.Symbol, parent.Quantity, target, len(parent.Tickets))
+
+    def CompleteParent(self, algorithm, parent):
+        self.Parents.pop(parent.Symbol, None)
+
+        if parent.Filled() == Zero:
+            return
+
+        slippage = parent.SlippageBps()
+        self.Slippage.append((parent.Symbol, parent.Start, parent.Filled(), slippage))
+        LogSink.Log(algorithm, 'Orders', lambda: f'{parent.Symbol} sliced {parent.Filled()} of {parent.Quantity} over {len(parent.Tickets)} orders. '
+                    f'Arrival: {parent.ArrivalPrice} | Average Fill: {round(parent.AverageFillPrice(), 4)} | Slippage: {round(slippage, 2)} bps')
+
+    ##-----------------Consolidated volume for the participation schedule-------------------------------------------##
+
+    def OnDataConsolidated(self, sender, bar):
+        parent = self.Parents.get(bar.Symbol)
+
+        if parent is not None and bar.EndTime > parent.StartLocal:
+            parent.Volume += float(bar.Volume)
+
+    def OnSecuritiesChanged(self, algorithm, changes):
+
+        for added in changes.AddedSecurities:
+            if added.Symbol not in self.Consolidators:
+                consolidator = TradeBarConsolidator(self.Interval)
+                consolidator.DataConsolidated += self.OnDataConsolidated
+                algorithm.SubscriptionManager.AddConsolidator(added.Symbol, consolidator)
+                self.Consolidators[added.Symbol] = consolidator
+
+        for removed in changes.RemovedSecurities:
+            consolidator = self.Consolidators.pop(removed.Symbol, None)
+            if consolidator is not None:
+                algorithm.SubscriptionManager.RemoveConsolidator(removed.Symbol, consolidator)
+
+            self.Parents.pop(removed.Symbol, None)
+
+
+class ParentOrder:
+
+    def __init__(self, symbol, quantity, arrivalPrice, start, startLocal, horizon, lotSize):
+        self.Symbol = symbol
+        self.Quantity = quantity
+        self.ArrivalPrice = arrivalPrice
+        self.Start = start
+        self.StartLocal = startLocal
+        self.End = start + horizon
+        self.LotSize = lotSize
+        self.Volume = float(0)
+        self.Tickets = []
+        self.Stopped = False
+
+    def ChildQuantity(self, algorithm, model):
+        '''
+        Quantity still due under the schedule, rounded down to whole lots
+        '''
+        if algorithm.UtcTime >= self.End:
+            due = self.Quantity
+
+        elif model.Schedule == 'Participation':
+            due = min(abs(self.Quantity), model.ParticipationRate * self.Volume) * (1 if self.Quantity > 0 else -1)
+
+        else:
+            slices = max(1, int(model.Horizon / model.Interval))
+            elapsed = int((algorithm.UtcTime - self.Start) / model.Interval) + 1
+            due = self.Quantity * min(1, elapsed / slices)
+
+        quantity = due - self.Submitted()
+        return int(quantity / self.LotSize) * self.LotSize
+
+    def Submitted(self):
+        submitted = 0
+
+        for ticket in self.Tickets:
+            if ticket.Status == OrderStatus.Invalid:
+                continue
+            elif ticket.Status == OrderStatus.Canceled:
+                submitted += ticket.QuantityFilled
+            else:
+                submitted += ticket.Quantity
+
+        return submitted
+
+    def Rejected(self):
+        return any(ticket.Status == OrderStatus.Invalid for ticket in self.Tickets)
+
+    def Stop(self):
+        '''
+        Shrinks the parent to the quantity already submitted, so it completes once the outstanding slices fill
+        '''
+        self.Quantity = self.Submitted()
+        self.Stopped = True
+
+    def Filled(self):
+        return sum(ticket.QuantityFilled for ticket in self.Tickets)
+
+    def IsComplete(self):
+        return self.Submitted() == self.Quantity and all(ticket.Status in Closed for ticket in self.Tickets)
+
+    def AverageFillPrice(self):
+        filled = self.Filled()
+        if filled == 0:
+            return float(0)
+
+        return sum(float(ticket.QuantityFilled) * float(ticket.AverageFillPrice) for ticket in self.Tickets) / float(filled)
+
+    def SlippageBps(self):
+        '''
+        Positive values are a cost: buying above or selling below the arrival price
+        '''
+        if self.ArrivalPrice == 0:
+            return float(0)
+
+        side = 1 if self.Quantity > 0 else -1
+        return side * (self.AverageFillPrice() / self.ArrivalPrice - 1) * 10000
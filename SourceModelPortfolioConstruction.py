@@ -12,11 +12,15 @@ AddReference("QuantConnect.Algorithm.Framework")
 from QuantConnect import Resolution, Extensions
 from QuantConnect.Algorithm.Framework.Alphas import *
 from QuantConnect.Algorithm.Framework.Portfolio import *
-from itertools import groupby
+from QuantConnect.Orders import MarketOrder
+from QuantConnect.Orders.Fees import OrderFeeParameters
 from datetime import datetime, timedelta
 from pytz import utc
 
 from Global import Global
+from InsightIndex import InsightIndex
+from Profiling import Profiler
+from LogSink import LogSink
 
 ##-----------------Global variables-------------------------------------------------------------------------------##
 
@@ -35,7 +39,7 @@ class SourceModelPortfolioConstructionModel(PortfolioConstructionModel):
     def __init__(self):
 
         # Static Variables
-        self.CummulativeInsightCollection = InsightCollection()
+        self.CummulativeInsightCollection = InsightIndex()
         self.FlatInsightCollection = InsightCollection()
         self.ShortWeight = Global.ShortUVXY
         self.NextExpiryTime = UTCMIN
@@ -50,17 +54,14 @@ class SourceModelPortfolioConstructionModel(PortfolioConstructionModel):
 
     def DetermineTargetPercent(self, algorithm, insights):
 
-        # Add every insight to a cummulative insight collection
-        for insight in insights:
-            self.CummulativeInsightCollection.Add(insight)
+        # Add every insight to a cummulative insight index
+        self.CummulativeInsightCollection.AddRange(insights)
 
         # Screen out all insights that are no longer active and have expired
-        ActiveInsights = self.CummulativeInsightCollection.GetActiveInsights(algorithm.UtcTime)
+        Expired = self.CummulativeInsightCollection.RemoveExpired(algorithm.UtcTime)
 
-        # Get the most recent insight for each asset with an active insighta
-        LastActiveInsights = []
-        for symbol, g in groupby(ActiveInsights, lambda x: x.Symbol):
-            LastActiveInsights.append(sorted(g, key=lambda x: x.GeneratedTimeUtc)[-1])
+        # Get the most recent insight for each asset with an active insight
+        LastActiveInsights = self.CummulativeInsightCollection.LatestActive()
 
         # Give equal weighting to each asset
         count = sum(x.Direction != InsightDirection.Flat for x in LastActiveInsights)
@@ -83,6 +84,7 @@ class SourceModelPortfolioConstructionModel(PortfolioConstructionModel):
 
     ##-----------------Creates and returns Portfolio Targets------------------------------------------------------------##
 
+    @Profiler.Timed('CreateTargets')
     def CreateTargets(self, algorithm, insights):
 
         self.ErrorSymbols = {}
@@ -107,10 +109,13 @@ class SourceModelPortfolioConstructionModel(PortfolioConstructionModel):
         # Determine the weights for active insights
         self.DetermineTargetPercent(algorithm, insights)
 
+        # Portfolio value and security properties are read once and shared by every alpha model this time step
+        Sizer = TargetSizer(algorithm)
+
         # Create a target for each alpha model
         for SourceModel, AlphaInsights in self.SourceModels.items():
             AlphaInsights.NextExpiryTime = self.NextExpiryTime
-            results = AlphaInsights.CreatePositions(algorithm, insights, self.Percents, self.RemovedSymbols)
+            results = AlphaInsights.CreatePositions(algorithm, insights, self.Percents, self.RemovedSymbols, Sizer)
             targets.extend(results)
 
             if AlphaInsights.NextExpiryTime > UTCMIN:
@@ -129,9 +134,6 @@ class SourceModelPortfolioConstructionModel(PortfolioConstructionModel):
             targets.extend(universeDeselectionTargets)
             self.RemovedSymbols = None
 
-        # Remove expired insights
-        self.CummulativeInsightCollection.RemoveExpiredInsights(algorithm.UtcTime)
-
         # Clear the weights dictionary so that active insight weights are re-calculated at each time step. Particulalry useful when using a dynamic weight based on risk models that may change frequently.
         self.Percents = {}
 
@@ -154,79 +156,202 @@ class SourceModelPortfolioConstructionModel(PortfolioConstructionModel):
 
 class DynamicTargets:
 
-    def __init__(self, Symbol, SourceModel, res=Resolution.Daily):
+    def __init__(self, Symbol, SourceModel, res=Resolution.Daily, EventDriven=True, WeightTolerance=0.01):
+        '''
+        EventDriven: When True targets are only recalculated when an insight of the source model arrives or expires, the
+                     universe changes, or the model's weights in Percents or Global.ShortUVXY/Global.MarginMultiplier move by more than
+                     WeightTolerance from the last ones sized. Weights are shared across source models, so an arrival or expiry elsewhere
+                     only recalculates the models whose weight it moved. Otherwise the source model emits no new targets for the time step.
+        '''
         self.Symbol = Symbol
         self.SourceModel = SourceModel
-        self.insightCollection = InsightCollection()
+        self.insightCollection = InsightIndex()
         self.NextExpiryTime = UTCMIN
         self.RebalancingTime = UTCMIN
         self.RebalancingFunc = lambda dt: dt + Extensions.ToTimeSpan(res) * 2
         self.ErrorSymbols = {}
+        self.EventDriven = EventDriven
+        self.WeightTolerance = WeightTolerance
+        self.Weights = None
+        self.Percents = {}
 
-    def CreatePositions(self, algorithm, insights, Percents, RemovedSymbols):
+    def CreatePositions(self, algorithm, insights, Percents, RemovedSymbols, Sizer=None):
 
         Targets = []
 
         # Get expired insights and create flatten targets for each symbol
         ExpiredTargets = []
-        ExpiredInsights = self.insightCollection.RemoveExpiredInsights(algorithm.UtcTime)
+        ExpiredInsights = self.insightCollection.RemoveExpired(algorithm.UtcTime)
 
-        for symbol, f in groupby(ExpiredInsights, lambda x: x.Symbol):
-            if not self.insightCollection.HasActiveInsights(symbol, algorithm.UtcTime):
+        for symbol in {x.Symbol for x in ExpiredInsights}:
+            if not self.insightCollection.HasActiveInsights(symbol):
                 ExpiredTargets.append(PortfolioTarget(symbol, Zero))
 
         Targets.extend(ExpiredTargets)
 
+        NewInsights = [x for x in insights if x.SourceModel == self.SourceModel]
+
+        if self.EventDriven:
+            # Only recalculate when one of the target inputs changed since the last calculation
+            if not (NewInsights or ExpiredInsights or RemovedSymbols is not None or self.WeightsMoved()
+                    or self.PercentsMoved(Percents)):
+                self.NextExpiryTime = self.insightCollection.NextExpiryTime() or UTCMIN
+                return Targets
+
         # Simultaneously, the current time must be less than the next expiration time and next rebalancing time as well as no new insights and no changes to the universe.  If so, do nothing.
-        if (algorithm.UtcTime <= self.NextExpiryTime and algorithm.UtcTime <= self.RebalancingTime and len(
+        elif (algorithm.UtcTime <= self.NextExpiryTime and algorithm.UtcTime <= self.RebalancingTime and len(
                 insights) == Zero and RemovedSymbols is None):
             return Targets
 
-        else:
-            # Collect source model specific insights
-            for insight in insights:
-                if insight.SourceModel == self.SourceModel:
-                    self.insightCollection.Add(insight)
-
-            # Get insights that haven't expired for each symbol that is still in the universe
-            ActiveInsights = self.insightCollection.GetActiveInsights(algorithm.UtcTime)
-
-            # Get the last generated active insight
-            LastActiveInsights = []
-            for symbol, g in groupby(ActiveInsights, lambda x: x.Symbol):
-                LastActiveInsights.append(sorted(g, key=lambda x: x.GeneratedTimeUtc)[-1])
-
-            # Create a target for the insight. Errors are stored in a dictionary to avoid crashing.  The dictionary is cleared each time new targets are generated.
-            self.ErrorSymbols = {}
-            for insight in LastActiveInsights:
-                if insight in Percents:
-                    symbol = insight.Symbol
-                    target = PortfolioTarget.Percent(algorithm, symbol, Percents[insight])
-
-                    if not target is None:
-                        Targets.append(target)
-                        if algorithm.LiveMode:
-                            algorithm.Log(f'Target created for {symbol} at {algorithm.Time.time()}')
-
-                    else:
-                        self.ErrorSymbols[symbol] = symbol
-                        self.insightCollection.Remove(insight)
-                        algorithm.Log(
-                            f'{symbol} had an error when generating a target for {insight}. Insight removed from collection')
+        # Collect source model specific insights
+        self.insightCollection.AddRange(NewInsights)
+
+        # Get the last generated active insight for each symbol that is still in the universe
+        LastActiveInsights = self.insightCollection.LatestActive()
+
+        # Size every weighted insight in one pass
+        if Sizer is None:
+            Sizer = TargetSizer(algorithm)
+
+        Weighted = [insight for insight in LastActiveInsights if insight in Percents]
+        SizedTargets = dict(zip(Weighted, Sizer.Size(algorithm, [(x.Symbol, Percents[x]) for x in Weighted])))
+
+        # Create a target for the insight. Errors are stored in a dictionary to avoid crashing.  The dictionary is cleared each time new targets are generated.
+        self.ErrorSymbols = {}
+        for insight in LastActiveInsights:
+            symbol = insight.Symbol
+
+            if insight in Percents:
+                target = SizedTargets[insight]
+
+                if not target is None:
+                    Targets.append(target)
+                    if algorithm.LiveMode:
+                        LogSink.Log(algorithm, 'Targets', 'Target created for {0} at {1}', symbol, algorithm.Time.time())
 
                 else:
                     self.ErrorSymbols[symbol] = symbol
                     self.insightCollection.Remove(insight)
+                    LogSink.Log(algorithm, 'Targets', '{0} had an error when generating a target for {1}. Insight removed from collection',
+                                symbol, insight)
+
+            else:
+                self.ErrorSymbols[symbol] = symbol
+                self.insightCollection.Remove(insight)
+
+        # Capture the next expiration time and rebalancing time then return source model targets
+        self.NextExpiryTime = self.insightCollection.NextExpiryTime()
+
+        if self.NextExpiryTime is None:
+            self.NextExpiryTime = UTCMIN
+
+        # # Set the next rebalance time
+        if algorithm.UtcTime >= self.RebalancingTime:
+            self.RebalancingTime = self.RebalancingFunc(algorithm.UtcTime)
+            # algorithm.Log(f'{self.SourceModel} rebalance time created at: {algorithm.UtcTime}. || Next rebalance time: {self.RebalancingTime}')
+
+        self.Weights = (Global.ShortUVXY, Global.MarginMultiplier)
+        self.Percents = {insight: Percents[insight] for insight in Weighted}
 
-            # Capture the next expiration time and rebalancing time then return source model targets
-            self.NextExpiryTime = self.insightCollection.GetNextExpiryTime()
+        return Targets
 
-            if self.NextExpiryTime is None:
-                self.NextExpiryTime = UTCMIN
+    ##-----------------Checks whether the global weight inputs moved beyond the tolerance------------------------------##
 
-            # # Set the next rebalance time
-            if algorithm.UtcTime >= self.RebalancingTime:
-                self.RebalancingTime = self.RebalancingFunc(algorithm.UtcTime)
-                # algorithm.Log(f'{self.SourceModel} rebalance time created at: {algorithm.UtcTime}. || Next rebalance time: {self.RebalancingTime}')
+    def WeightsMoved(self):
+        if self.Weights is None:
+            return True
 
-        return Targets
\ No newline at end of file
+        return (abs(Global.ShortUVXY - self.Weights[0]) > self.WeightTolerance
+                or abs(Global.MarginMultiplier - self.Weights[1]) > self.WeightTolerance)
+
+    ##-----------------Checks whether the weights of the active insights differ from the last ones sized----------------##
+
+    def PercentsMoved(self, Percents):
+        Current = {insight: Percents[insight] for insight in self.insightCollection.LatestActive() if insight in Percents}
+
+        if Current.keys() != self.Percents.keys():
+            return True
+
+        return any(abs(Current[insight] - self.Percents[insight]) > self.WeightTolerance for insight in Current)
+
+
+##-----------------Class to size portfolio targets in batches------------------------------------------------------##
+
+class TargetSizer:
+    '''
+    Snapshots the portfolio once per time step and converts target weights into share quantities with array arithmetic, the way
+    PortfolioTarget.Percent sizes them through the margin model: the weight of TotalPortfolioValueLessFreeBuffer over the price,
+    contract multiplier and lot size of the security. Each security's properties are read once and reused across source models.
+
+    PortfolioTarget.Percent stays the authority wherever its validation could differ. Weights outside the Min/MaxAbsolutePortfolioTargetPercentage
+    settings, securities without a price, and orders whose fee would take a lot off the quantity are sized by Percent, which logs and
+    returns None for the targets LEAN rejects.
+    '''
+
+    def __init__(self, algorithm):
+        self.Total = float(algorithm.Portfolio.TotalPortfolioValue)
+        self.Value = float(algorithm.Portfolio.TotalPortfolioValueLessFreeBuffer)
+        self.Limits = (float(algorithm.Settings.MinAbsolutePortfolioTargetPercentage), float(algorithm.Settings.MaxAbsolutePortfolioTargetPercentage))
+        self.Properties = {}
+        self.Fallbacks = 0
+
+    def Snapshot(self, algorithm, symbol):
+        if symbol not in self.Properties:
+            security = algorithm.Securities[symbol]
+            properties = security.SymbolProperties
+            self.Properties[symbol] = (float(security.Price), float(properties.LotSize),
+                                       float(properties.ContractMultiplier), float(security.Holdings.Quantity))
+
+        return self.Properties[symbol]
+
+    ##-----------------Returns a target, or None, for each (symbol, weight) pair------------------------------------##
+
+    def Size(self, algorithm, Weights):
+        if not Weights:
+            return []
+
+        Properties = np.array([self.Snapshot(algorithm, symbol) for symbol, weight in Weights])
+        Percents = np.array([float(weight) for symbol, weight in Weights])
+        Prices, LotSizes, Multipliers, Holdings = Properties.T
+        Minimum, Maximum = self.Limits
+
+        Absolute = np.abs(Percents)
+        Valid = (Prices > 0) & (LotSizes > 0) & (self.Total > 0) & (Absolute <= Maximum) & ((Absolute == 0) | (Absolute >= Minimum))
+
+        Quantities = np.zeros(len(Weights))
+        Quantities[Valid] = self.Quantities(Percents[Valid], Prices[Valid], Multipliers[Valid], LotSizes[Valid])
+
+        Targets = []
+        for i, (symbol, weight) in enumerate(Weights):
+            if Valid[i] and self.FeeKeepsQuantity(algorithm, symbol, Percents[i], Quantities[i], Holdings[i], Properties[i]):
+                Targets.append(PortfolioTarget(symbol, float(Quantities[i])))
+
+            else:
+                self.Fallbacks += 1
+                Targets.append(PortfolioTarget.Percent(algorithm, symbol, weight))
+
+        return Targets
+
+    def Quantities(self, Percents, Prices, Multipliers, LotSizes, Fees=0):
+        '''
+        Whole lots of the target value, which the margin model reduces by the order fee
+        '''
+        Value = (self.Total - Fees) * Percents * self.Value / self.Total
+
+        return np.trunc(Value / (Prices * Multipliers * LotSizes)) * LotSizes
+
+    def FeeKeepsQuantity(self, algorithm, symbol, percent, quantity, holdings, properties):
+        '''
+        True when the fee of the order, which only shrinks as the order does, leaves the sized quantity unchanged
+        '''
+        order = quantity - holdings
+        if order == 0:
+            return True
+
+        security = algorithm.Securities[symbol]
+        fee = float(security.FeeModel.GetOrderFee(OrderFeeParameters(security, MarketOrder(symbol, order, algorithm.UtcTime))).Value.Amount)
+        if fee == 0:
+            return True
+
+        price, lot, multiplier, holdings = properties
+        return self.Quantities(percent, price, multiplier, lot, fee) == quantity
@@ -0,0 +1,68 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import json
+from datetime import *
+
+from TradingCalendar import TradingCalendar
+
+
+##-------------------Class to persist annual statistics between algorithm runs----------------##
+
+class StatisticsStore:
+    '''
+    Versioned ObjectStore snapshots of the annual statistics, keyed by name, symbol and parameters.
+
+    A snapshot is only used while its as-of date falls between the most recent annual recalculation date
+    and the current algorithm date, so backtests never read statistics saved from a later period.
+    Bump Version whenever the way a statistic is computed changes.
+    '''
+
+    Version = 1
+    Enabled = True
+
+    def __init__(self):
+        pass
+
+    def Key(name, symbol, params):
+        return f'statistics/v{StatisticsStore.Version}/{name}/{symbol}/{params}'.replace(' ', '')
+
+    ##-----------------Returns the stored values when still valid, otherwise None-----------------##
+
+    def Load(algorithm, name, symbol, params):
+        if not StatisticsStore.Enabled:
+            return None
+
+        key = StatisticsStore.Key(name, symbol, params)
+        if not algorithm.ObjectStore.ContainsKey(key):
+            return None
+
+        try:
+            snapshot = json.loads(algorithm.ObjectStore.Read(key))
+            asOf = date.fromisoformat(snapshot['AsOf'])
+
+        except (ValueError, KeyError, TypeError):
+            return None
+
+        today = algorithm.Time.date()
+        if not StatisticsStore.LastRecalcDate(today) <= asOf <= today:
+            return None
+
+        algorithm.Log(f'Loaded {name} statistics for {symbol} as of {asOf}')
+        return snapshot['Values']
+
+    def Save(algorithm, name, symbol, params, values):
+        if not StatisticsStore.Enabled:
+            return
+
+        snapshot = {'AsOf': algorithm.Time.date().isoformat(), 'Values': values}
+        algorithm.ObjectStore.Save(StatisticsStore.Key(name, symbol, params), json.dumps(snapshot))
+
+    ##-----------------Date of the most recent annual recalculation on or before today------------##
+
+    def LastRecalcDate(today):
+        recalc = TradingCalendar.Equity().FirstTradingDay(today.year)
+
+        if today < recalc:
+            recalc = TradingCalendar.Equity().FirstTradingDay(today.year - 1)
+
+        return recalc
@@ -0,0 +1,144 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+from bisect import bisect_left, bisect_right
+from datetime import *
+
+from clr import AddReference
+
+AddReference("System")
+AddReference("QuantConnect.Common")
+
+from QuantConnect import *
+from QuantConnect.Securities import *
+
+##-------------------Global variables---------------------------------------------------------##
+
+OneDay = timedelta(days=1)
+
+
+##-------------------Class to hold one year of trading sessions--------------------------------##
+
+class TradingYear:
+
+    def __init__(self, hours, year):
+        self.Year = year
+        self.Days = []
+        self.Opens = []
+        self.Closes = []
+
+        day = datetime(year, 1, 1)
+
+        while day.year == year:
+            if hours.IsDateOpen(day):
+                marketOpen = hours.GetNextMarketOpen(day, False)
+                self.Days.append(day.date())
+                self.Opens.append(marketOpen)
+                self.Closes.append(hours.GetNextMarketClose(marketOpen, False))
+
+            day += OneDay
+
+
+##-------------------Class to answer calendar questions from precomputed tables---------------##
+
+class TradingCalendar:
+    '''
+    Precomputes, once per year, the trading days and regular session opens and closes of an exchange
+    into sorted lists, and answers next-day and market-hours questions with a binary search.
+
+    Calendars are shared per symbol through For, and Equity returns the US equity calendar for callers
+    that have no security at hand.
+    '''
+
+    Calendars = {}
+
+    def __init__(self, hours):
+        self.Hours = hours
+        self.Years = {}
+
+    ##-----------------Shared calendars-----------------------------------------------------------##
+
+    def For(algorithm, symbol):
+        key = str(symbol)
+
+        if key not in TradingCalendar.Calendars:
+            TradingCalendar.Calendars[key] = TradingCalendar(algorithm.Securities[symbol].Exchange.Hours)
+
+        return TradingCalendar.Calendars[key]
+
+    def Equity():
+        if 'Equity' not in TradingCalendar.Calendars:
+            hours = MarketHoursDatabase.FromDataFolder().GetExchangeHours(Market.USA, None, SecurityType.Equity)
+            TradingCalendar.Calendars['Equity'] = TradingCalendar(hours)
+
+        return TradingCalendar.Calendars['Equity']
+
+    def Year(self, year):
+        if year not in self.Years:
+            self.Years[year] = TradingYear(self.Hours, year)
+
+        return self.Years[year]
+
+    ##-----------------Trading day lookups---------------------------------------------------------##
+
+    def IsTradingDay(self, day):
+        days = self.Year(day.year).Days
+        i = bisect_left(days, day)
+
+        return i < len(days) and days[i] == day
+
+    def FirstTradingDay(self, year):
+        return self.Year(year).Days[0]
+
+    def NextTradingDay(self, day):
+        '''
+        Returns the first trading day strictly after the specified date
+        '''
+        year = day.year
+
+        while True:
+            days = self.Year(year).Days
+            i = bisect_right(days, day)
+
+            if i < len(days):
+                return days[i]
+
+            year += 1
+
+    def TradingDayBefore(self, day, count):
+        '''
+        Returns the trading day count sessions before the specified date, not counting the date itself
+        '''
+        year = day.year
+        days = self.Year(year).Days
+        i = bisect_left(days, day) - count
+
+        while i < 0:
+            year -= 1
+            days = self.Year(year).Days
+            i += len(days)
+
+        return days[i]
+
+    ##-----------------Market hours lookups--------------------------------------------------------##
+
+    def Session(self, time):
+        '''
+        Returns the next market open after the specified time, the close of that session and the open following it
+        '''
+        year = time.year
+
+        while True:
+            table = self.Year(year)
+            i = bisect_right(table.Opens, time)
+
+            if i < len(table.Opens):
+                break
+
+            year += 1
+
+        if i + 1 < len(table.Opens):
+            nextOpen = table.Opens[i + 1]
+        else:
+            nextOpen = self.Year(year + 1).Opens[0]
+
+        return table.Opens[i], table.Closes[i], nextOpen
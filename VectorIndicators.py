@@ -0,0 +1,60 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import numpy as np
+from scipy.signal import lfilter
+
+
+##-------------------Array implementations of the indicators used for statistics-------------##
+
+class VectorIndicators:
+    '''
+    Computes full indicator series from a close array in one pass. Results match the values the
+    QuantConnect indicators would report after each Update, without registering anything with the engine.
+    '''
+
+    def __init__(self):
+        pass
+
+    ##-----------------Exponential moving average seeded with the first value like LEAN---------##
+
+    def EMA(values, period):
+        values = np.asarray(values, dtype=float)
+        result = np.empty_like(values)
+
+        if len(values) == 0:
+            return result
+
+        k = 2 / (period + 1)
+        result[0] = values[0]
+        result[1:], _ = lfilter([k], [1, k - 1], values[1:], zi=[(1 - k) * values[0]])
+
+        return result
+
+    ##-----------------Relative strength index with simple moving averages of gains and losses--##
+
+    def RSI(values, period):
+        '''
+        Matches RelativeStrengthIndex with MovingAverageType.Simple. The first value reports 100 and
+        the averages cover however many changes are available until the period is filled.
+        '''
+        values = np.asarray(values, dtype=float)
+        result = np.full(len(values), float(100))
+
+        if len(values) < 2:
+            return result
+
+        changes = np.diff(values)
+        gains = np.cumsum(np.concatenate(([0], np.where(changes >= 0, changes, 0))))
+        losses = np.cumsum(np.concatenate(([0], np.where(changes < 0, -changes, 0))))
+
+        ends = np.arange(1, len(values))
+        starts = np.maximum(ends - period, 0)
+        counts = ends - starts
+
+        averageGain = (gains[ends] - gains[starts]) / counts
+        averageLoss = (losses[ends] - losses[starts]) / counts
+
+        hasLoss = averageLoss != 0
+        result[1:][hasLoss] = 100 - 100 / (1 + averageGain[hasLoss] / averageLoss[hasLoss])
+
+        return result
@@ -0,0 +1,122 @@
+##-------------------Imports-------------------------------------------------------------------##
+
+import numpy as np
+
+from Global import VixHandler
+
+
+##-------------------Class to maintain rolling VIX statistics one close at a time--------------##
+
+class RollingVixStatistics:
+    '''
+    Ring buffers holding the last Days VIX closes and the Days-1 percent moves between them.
+
+    The mean and standard deviation of the percent moves are maintained with a sliding Welford
+    update, so each new close costs O(1) and no History request is needed after the warm-up.
+    '''
+
+    def __init__(self, Days=6):
+        self.Days = Days
+        self.Spot = np.zeros(Days)
+        self.Moves = np.zeros(Days - 1)
+        self.LastTime = None
+        self.Reset()
+
+    def Reset(self):
+        self.SpotCount = 0
+        self.SpotHead = 0
+        self.MoveCount = 0
+        self.MoveHead = 0
+        self.MoveMean = float(0)
+        self.MoveM2 = float(0)
+        self.LastTime = None
+
+    @property
+    def IsReady(self):
+        return self.SpotCount == self.Days
+
+    ##-----------------Seeds the buffers from a block of historical closes------------------------##
+
+    def Warm(self, time, closes):
+        self.Reset()
+
+        for close in closes[-self.Days:]:
+            self.Ingest(float(close))
+
+        self.LastTime = time
+
+    ##-----------------Adds a new daily close. Repeated bars for the same time are ignored--------##
+
+    def Update(self, time, close):
+        if self.LastTime is not None and time <= self.LastTime:
+            return False
+
+        self.Ingest(float(close))
+        self.LastTime = time
+
+        return True
+
+    def Ingest(self, close):
+        if self.SpotCount > 0:
+            previous = self.Spot[(self.SpotHead - 1) % self.Days]
+            self.AddMove(round((close / previous - 1) * float(100), 3))
+
+        self.Spot[self.SpotHead] = close
+        self.SpotHead = (self.SpotHead + 1) % self.Days
+        self.SpotCount = min(self.SpotCount + 1, self.Days)
+
+    def AddMove(self, move):
+        size = self.Days - 1
+
+        if self.MoveCount < size:
+            # Window still filling: standard Welford step
+            self.MoveCount += 1
+            delta = move - self.MoveMean
+            self.MoveMean += delta / self.MoveCount
+            self.MoveM2 += delta * (move - self.MoveMean)
+
+        else:
+            # Window full: replace the oldest move in place
+            oldest = self.Moves[self.MoveHead]
+            previousMean = self.MoveMean
+            self.MoveMean += (move - oldest) / size
+            self.MoveM2 += (move - oldest) * (move - self.MoveMean + oldest - previousMean)
+
+        self.MoveM2 = max(self.MoveM2, float(0))
+        self.Moves[self.MoveHead] = move
+        self.MoveHead = (self.MoveHead + 1) % size
+
+    ##-----------------Chronologically ordered views of the buffers------------------------------##
+
+    def SpotList(self):
+        if self.SpotCount < self.Days:
+            return self.Spot[:self.SpotCount].tolist()
+
+        return np.roll(self.Spot, -self.SpotHead).tolist()
+
+    def MoveList(self):
+        size = self.Days - 1
+
+        if self.MoveCount < size:
+            return self.Moves[:self.MoveCount].tolist()
+
+        return np.roll(self.Moves, -self.MoveHead).tolist()
+
+    def LastSpot(self):
+        return float(self.Spot[(self.SpotHead - 1) % self.Days])
+
+    def LastMove(self):
+        return float(self.Moves[(self.MoveHead - 1) % (self.Days - 1)])
+
+    def MoveSTD(self):
+        return float(np.sqrt(self.MoveM2 / self.MoveCount)) if self.MoveCount else float(0)
+
+    ##-----------------Writes the current state to the shared VixHandler-------------------------##
+
+    def Publish(self, time):
+        VixHandler.vixList = self.SpotList()
+        VixHandler.vixPercentMoveList = self.MoveList()
+        VixHandler.PreviousVixClose.Update(time, self.LastSpot())
+        VixHandler.vixPercentMove = self.LastMove()
+        VixHandler.FiveDayVixPercentMoveSTD = self.MoveSTD()
+        VixHandler.SixDayVixAverage = self.MoveMean
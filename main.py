@@ -24,6 +24,15 @@ from QuantConnect.Algorithm.Framework.Selection import *
 from Global import VixHandler
 from Global import Global
 from Global import DefaultValues
+from VixStatistics import RollingVixStatistics
+from HistoryService import HistoryService
+from DailyBarCache import DailyBarCache
+from StatisticsStore import StatisticsStore
+from RecalcScheduler import RecalcScheduler
+from EquityTracker import EquityTracker
+from HoldingsIndex import HoldingsIndex
+from Profiling import Profiler
+from LogSink import LogSink
 
 import LevSpy
 import LevQ
@@ -37,6 +46,7 @@ from SourceModelPortfolioConstruction import SourceModelPortfolioConstructionMod
 
 from ImmediateExecution import ImmediateExecutionModel
 from LimitOrderExecutionModel import LimitOrderExecutionModel
+from SlicedExecutionModel import SlicedExecutionModel
 
 ##-------------------Risk Management Files----------------------------------------------------##
 
@@ -47,7 +57,6 @@ from ProfitCapture import ProfitCapture
 
 Zero = int(0)
 One = int(1)
-OneDay = timedelta(days=1)
 StatPeriod = timedelta(days=365)
 
 
@@ -73,11 +82,18 @@ class AdvancedIndexing(QCAlgorithm):
         # Optional Settings
         self.Settings.FreePortfolioValuePercentage = 0.05
 
+        # Hot path latency histograms, enabled with the "profile" parameter
+        Profiler.Initialize(self)
+
+        # Rate limited logs and downsampled charts. The daily VIX summary is sampled in backtests
+        LogSink.Initialize(self, VIX={'Limit': 4, 'Sample': 1 if self.LiveMode else 5})
+
         # Variables
         self.Zero = int(0)
         self.InitialPortfolioValue = self.Portfolio.TotalPortfolioValue
         self.ClosingPortfolioValue = self.Portfolio.TotalPortfolioValue
         self.WeightOffset = float(0)
+        self.EquityCurve = EquityTracker(self.InitialPortfolioValue)
 
         # Lists
         self.TimeBounds = [time(9, 30), time(9, 31)]
@@ -94,14 +110,13 @@ class AdvancedIndexing(QCAlgorithm):
             self.AddEquity("TQQQ"),
             self.AddEquity("SQQQ")]
 
-        # Booleans
-        self.VixReset = False
-        self.OnStartUp = True
-
         self.ManualSymbols = []
 
         DefaultValues.ResetGlobal()
         DefaultValues.ResetVixHandler()
+        DailyBarCache.Reset()
+        HoldingsIndex.Reset()
+        self.VixStatistics = RollingVixStatistics(6)
         self.FillVixList()
 
         for x in self.Assets:
@@ -128,6 +143,7 @@ class AdvancedIndexing(QCAlgorithm):
         # Execution
         self.SetExecution(ImmediateExecutionModel())
         # self.SetExecution(LimitOrderExecutionModel())
+        # self.SetExecution(SlicedExecutionModel(Horizon=timedelta(minutes=30), Schedule='TWAP'))
 
         # Risk Management
         self.SetRiskManagement(ManageDrawdownRisk())
@@ -148,28 +164,21 @@ class AdvancedIndexing(QCAlgorithm):
                          self.GetClosePrice)
         self.Schedule.On(self.DateRules.EveryDay("TQQQ"), self.TimeRules.BeforeMarketClose("TQQQ", 0), self.MarketClose)
 
+        RecalcScheduler.Initialize(self)
+
         VIX = SymbolCache.GetSymbol("VIX.CBOE")
-        self.AnnualRecalc(VIX)
+        self.AnnualRecalc(VIX, OnStartUp=True)
+        RecalcScheduler.Register('VIX', lambda algorithm: self.AnnualRecalc(VIX))
 
         # Set Warmup
         self.SetWarmup(5, Resolution.Daily)
 
     ##-------------------On Data------------------------------------------------------------------##
 
+    @Profiler.Timed('OnData')
     def OnData(self, data):
-        if self.Portfolio.TotalPortfolioValue > Global.PortfolioHigh:
-            Global.PortfolioHigh = self.Portfolio.TotalPortfolioValue
-
-            if round((Global.PortfolioHigh / self.InitialPortfolioValue) - 1, 3) > Global.PortfolioGains:
-                new_gains = round((Global.PortfolioHigh / self.InitialPortfolioValue) - 1, 3) - Global.PortfolioGains
-                Global.InitialDrawdown = min(0, round(Global.InitialDrawdown + new_gains, 3))
-                Global.PortfolioGains = round((Global.PortfolioHigh / self.InitialPortfolioValue) - 1, 3)
-
-        else:
-            Global.PortfolioDrawdown = round((self.Portfolio.TotalPortfolioValue / Global.PortfolioHigh) - 1,
-                                             3) + Global.InitialDrawdown
-
-        Global.MarginMultiplier = max(1.33, 1.33 * (1 + Global.PortfolioDrawdown))
+        # Running peak, drawdown and margin multiplier from a single portfolio value read
+        self.EquityCurve.Update(self.Time, self.Portfolio.TotalPortfolioValue)
 
         ##-------------------Manage and plot VIX data-------------------------------------------------##
 
@@ -180,6 +189,8 @@ class AdvancedIndexing(QCAlgorithm):
 
     def MarketClose(self):
         Global.MarketIsOpen = False
+        LogSink.Flush(self)
+        Profiler.EndOfDay(self)
 
     ##-------------------Manage symbol overnight gaps---------------------------------------------##
     def GetOpenPrice(self):
@@ -196,14 +207,14 @@ class AdvancedIndexing(QCAlgorithm):
         else:
             Global.ShortUVXY = min(Global.ShortUVXY - self.WeightOffset, 0.78)
 
-        self.Log(
-            f'Overnight change in portfolio value: {self.WeightOffset} | Adjusted Short Weight: {Global.ShortUVXY}')
-        self.Plot('Weights', 'Adjusted Short Weights', Global.ShortUVXY * 100)
+        LogSink.Log(self, 'Overnight', 'Overnight change in portfolio value: {0} | Adjusted Short Weight: {1}', self.WeightOffset,
+                    Global.ShortUVXY)
+        LogSink.Plot(self, 'Weights', 'Adjusted Short Weights', Global.ShortUVXY * 100)
 
         for key in Global.OpenClose:
 
             if np.isinf(Global.OpenClose[key][1]):
-                history = self.History(key, timedelta(days=5), Resolution.Daily)['close'][-1]
+                history = self.History(key, timedelta(days=5), Resolution.Daily)['close'].iloc[-1]
                 Global.OpenClose[key][0] = self.Securities[key].Open
                 Global.OpenClose[key][1] = history
                 Global.OpenClose[key][2] = round((Global.OpenClose[key][0] / Global.OpenClose[key][1]) - 1, 2)
@@ -229,19 +240,19 @@ class AdvancedIndexing(QCAlgorithm):
         VIX = SymbolCache.GetSymbol("VIX.CBOE")
         UVXY = SymbolCache.GetSymbol("UVXY")
         days = 6
-        self.AnnualRecalc(VIX)
 
         if data.ContainsKey(VIX) or not VixHandler.vixList:
             VixHandler.Symbol = VIX
 
-            VixHistory = self.VixHistory(days, VIX)
-            VixHandler.vixList = VixHistory.values.flatten().tolist()
-            VixHandler.vixPercentMoveList = VixHistory.pct_change().dropna().apply(
-                lambda x: x * float(100)).values.flatten().round(3).tolist()
-            VixHandler.PreviousVixClose.Update(self.Time, VixHandler.vixList[-1])
-            VixHandler.vixPercentMove = VixHandler.vixPercentMoveList[-1]
-            VixHandler.FiveDayVixPercentMoveSTD = np.std(VixHandler.vixPercentMoveList)
-            VixHandler.SixDayVixAverage = np.mean(VixHandler.vixPercentMoveList)
+            # Roll the statistics forward with the new close. History is only requested to (re)seed the window.
+            # A bar the statistics already hold leaves the published values as they are
+            if data.ContainsKey(VIX) and self.VixStatistics.IsReady:
+                if self.VixStatistics.Update(self.Time, data[VIX].Close):
+                    self.VixStatistics.Publish(self.Time)
+
+            else:
+                self.VixStatistics.Warm(self.Time, self.VixHistory(days, VIX).values.flatten())
+                self.VixStatistics.Publish(self.Time)
 
             # Position weights
             if VixHandler.PreviousVixClose.Current.Value >= VixHandler.DeviationVix[2]:
@@ -258,19 +269,19 @@ class AdvancedIndexing(QCAlgorithm):
                     Global.ShortUVXY = 0.4
 
             # Charts
-            self.Plot('VIX Spot', 'VixPercentMove', VixHandler.vixPercentMove)
-            self.Plot('VIX Spot', 'Previous Day Closing VIX', VixHandler.PreviousVixClose.Current.Value)
-            self.Plot('VIX 5-Day', '% Move Standard Deviation', VixHandler.FiveDayVixPercentMoveSTD)
-            self.Plot('VIX 5-Day', '% Move Average', VixHandler.SixDayVixAverage)
-            self.Plot('Weights', 'UnAdjusted Short Weights', Global.ShortUVXY * 100)
+            LogSink.Plot(self, 'VIX Spot', 'VixPercentMove', VixHandler.vixPercentMove)
+            LogSink.Plot(self, 'VIX Spot', 'Previous Day Closing VIX', VixHandler.PreviousVixClose.Current.Value)
+            LogSink.Plot(self, 'VIX 5-Day', '% Move Standard Deviation', VixHandler.FiveDayVixPercentMoveSTD)
+            LogSink.Plot(self, 'VIX 5-Day', '% Move Average', VixHandler.SixDayVixAverage)
+            LogSink.Plot(self, 'Weights', 'UnAdjusted Short Weights', Global.ShortUVXY * 100)
             # self.Plot('Studies', '% Move STD*AVG', VixHandler.FiveDayVixPercentMoveSTD*VixHandler.SixDayVixAverage)
             # self.Plot('Weights', 'Long Weights', Global.MarginMultiplier*100)
 
-            self.Log(
-                "At {0} the VIX list Populated. The current lists are: Spot - {1} | %Change - {2} | FiveDayVixPercentMoveSTD - {3} | SixDayVixAverage - {4} | Unadjusted Short Weight - {5} | Current Drawdown - {6}".format(
-                    self.Time, VixHandler.vixList, VixHandler.vixPercentMoveList,
-                    round(VixHandler.FiveDayVixPercentMoveSTD, 4), round(VixHandler.SixDayVixAverage, 4),
-                    Global.ShortUVXY, Global.PortfolioDrawdown))
+            LogSink.Log(self, 'VIX',
+                "At {0} the VIX list Populated. The current lists are: Spot - {1} | %Change - {2} | FiveDayVixPercentMoveSTD - {3} | SixDayVixAverage - {4} | Unadjusted Short Weight - {5} | Current Drawdown - {6}",
+                self.Time, VixHandler.vixList, VixHandler.vixPercentMoveList,
+                round(VixHandler.FiveDayVixPercentMoveSTD, 4), round(VixHandler.SixDayVixAverage, 4),
+                Global.ShortUVXY, Global.PortfolioDrawdown)
 
         elif data.ContainsKey(self.vix):
 
@@ -293,66 +304,64 @@ class AdvancedIndexing(QCAlgorithm):
         days = 6
         VixHandler.Symbol = VIX
 
-        VixHistory = self.VixHistory(days, VIX)
-        VixHandler.vixList = VixHistory.values.flatten().tolist()
-        VixHandler.vixPercentMoveList = VixHistory.pct_change().dropna().apply(
-            lambda x: x * float(100)).values.flatten().round(3).tolist()
-        VixHandler.PreviousVixClose.Update(self.Time, VixHandler.vixList[-1])
-        VixHandler.vixPercentMove = VixHandler.vixPercentMoveList[-1]
-        VixHandler.FiveDayVixPercentMoveSTD = np.std(VixHandler.vixPercentMoveList)
-        VixHandler.SixDayVixAverage = np.mean(VixHandler.vixPercentMoveList)
+        self.VixStatistics.Warm(self.Time, self.VixHistory(days, VIX).values.flatten())
+        self.VixStatistics.Publish(self.Time)
 
         # Charts
-        self.Plot('VIX Spot', 'VixPercentMove', VixHandler.vixPercentMove)
-        self.Plot('VIX Spot', 'Previous Day Closing VIX', VixHandler.PreviousVixClose.Current.Value)
-        self.Plot('VIX 5-Day', '% Move Standard Deviation', VixHandler.FiveDayVixPercentMoveSTD)
-        self.Plot('VIX 5-Day', '% Move Average', VixHandler.SixDayVixAverage)
-        self.Plot('Weights', 'Short Weights', Global.ShortUVXY * 100)
+        LogSink.Plot(self, 'VIX Spot', 'VixPercentMove', VixHandler.vixPercentMove)
+        LogSink.Plot(self, 'VIX Spot', 'Previous Day Closing VIX', VixHandler.PreviousVixClose.Current.Value)
+        LogSink.Plot(self, 'VIX 5-Day', '% Move Standard Deviation', VixHandler.FiveDayVixPercentMoveSTD)
+        LogSink.Plot(self, 'VIX 5-Day', '% Move Average', VixHandler.SixDayVixAverage)
+        LogSink.Plot(self, 'Weights', 'Short Weights', Global.ShortUVXY * 100)
         # self.Plot('Studies', '% Move STD*AVG', VixHandler.FiveDayVixPercentMoveSTD*VixHandler.SixDayVixAverage)
         # self.Plot('Weights', 'Long Weights', Global.MarginMultiplier*100)
 
-        self.Log(
-            "At {0} the VIX list Populated. The current lists are: Spot - {1} | %Change - {2} | FiveDayVixPercentMoveSTD - {3} | SixDayVixAverage - {4} | Short Weight - {5} | Current Drawdown - {6}".format(
-                self.Time, VixHandler.vixList, VixHandler.vixPercentMoveList,
-                round(VixHandler.FiveDayVixPercentMoveSTD, 4), round(VixHandler.SixDayVixAverage, 4), Global.ShortUVXY,
-                Global.PortfolioDrawdown))
+        LogSink.Log(self, 'VIX',
+            "At {0} the VIX list Populated. The current lists are: Spot - {1} | %Change - {2} | FiveDayVixPercentMoveSTD - {3} | SixDayVixAverage - {4} | Short Weight - {5} | Current Drawdown - {6}",
+            self.Time, VixHandler.vixList, VixHandler.vixPercentMoveList,
+            round(VixHandler.FiveDayVixPercentMoveSTD, 4), round(VixHandler.SixDayVixAverage, 4), Global.ShortUVXY,
+            Global.PortfolioDrawdown)
 
     ##-----------------Annual recalculation of various statistics----------------------------------##
 
-    def AnnualRecalc(self, symbol):
+    def AnnualRecalc(self, symbol, OnStartUp=False):
 
-        # Once per year update the VIX statistics with the previuos 4000 days data
-        if self.Time.date() == self.GetNextWeekday(
-                date(self.Time.year, 1, 3)):  # and self.TimeBounds[0] <= self.Time.time() <= self.TimeBounds[1]:
-            self.VixReset = True
+        # Once per year update the VIX statistics with the previuos 4000 days data. Scheduled through RecalcScheduler
+        Snapshot = StatisticsStore.Load(self, 'VixDeviations', symbol, 4000) if OnStartUp else None
 
-        if (self.VixReset and self.Time.date() == self.GetNextWeekday(
-                date(self.Time.year, 1, 3)) + OneDay) or self.OnStartUp:
+        if Snapshot is not None:
+            VixHandler.DeviationVix = Snapshot['DeviationVix']
+            VixHandler.DeviationVixChange = Snapshot['DeviationVixChange']
 
-            # Base Data
-            vix_history = self.History(symbol, 4000, Resolution.Daily).reset_index(level=0, drop=True)
-            vix_percent_change = vix_history["close"].pct_change()
+        else:
+            self.VixDeviations(symbol)
+            StatisticsStore.Save(self, 'VixDeviations', symbol, 4000,
+                                 {'DeviationVix': VixHandler.DeviationVix,
+                                  'DeviationVixChange': VixHandler.DeviationVixChange})
 
-            # Stat levels
-            AverageVix = np.mean(vix_history["close"])
-            STDVix = np.std(vix_history["close"])
-            AverageChange = np.mean(vix_percent_change)
-            STDChange = np.std(vix_percent_change)
+        self.Log("VOL: VIX Spot Deviations: {0} || VIX Change Deviations: {1} || Year: {2}".format(
+            VixHandler.DeviationVix, VixHandler.DeviationVixChange, self.Time.year))
 
-            VixHandler.DeviationVix = []
-            VixHandler.DeviationVixChange = []
+    def VixDeviations(self, symbol):
 
-            for i in np.arange(-1, 4, 0.5):
-                VixHandler.DeviationVix.append(round(AverageVix + (STDVix * i), 2))
+        # Base Data
+        vix_history = self.History(symbol, 4000, Resolution.Daily).reset_index(level=0, drop=True)
+        vix_percent_change = vix_history["close"].pct_change()
 
-            for i in range(-3, 5):
-                VixHandler.DeviationVixChange.append(round(((AverageChange + (STDChange * i)) * 100), 2))
+        # Stat levels
+        AverageVix = np.mean(vix_history["close"])
+        STDVix = np.std(vix_history["close"])
+        AverageChange = np.mean(vix_percent_change)
+        STDChange = np.std(vix_percent_change)
 
-            self.Log("VOL: VIX Spot Deviations: {0} || VIX Change Deviations: {1} || Year: {2}".format(
-                VixHandler.DeviationVix, VixHandler.DeviationVixChange, self.Time.year))
+        VixHandler.DeviationVix = []
+        VixHandler.DeviationVixChange = []
 
-            self.VixReset = False
-            self.OnStartUp = False
+        for i in np.arange(-1, 4, 0.5):
+            VixHandler.DeviationVix.append(float(round(AverageVix + (STDVix * i), 2)))
+
+        for i in range(-3, 5):
+            VixHandler.DeviationVixChange.append(float(round(((AverageChange + (STDChange * i)) * 100), 2)))
 
     ##-------------------Method to capture previous month average VIX spot---------------------------##
 
@@ -367,24 +376,15 @@ class AdvancedIndexing(QCAlgorithm):
     ##-------------------Method to capture the desired amount of VIX history-------------------------##
 
     def VixHistory(self, Days, symbol, resolution=Resolution.Daily):
-        startingDays = Days
-        history = self.History(symbol, Days, resolution)
-
-        while len(history) < Days:
-            startingDays = startingDays + 1
-            history = self.History(symbol, startingDays, resolution)
+        history = HistoryService.Bars(self, symbol, Days, resolution)
 
         return history["close"]
 
-    ##-----------------Return the next weekday from specified date------------------------------------##
+    ##-----------------Keeps the invested symbol index and the pending execution tickets current------##
 
-    def GetNextWeekday(self, RandomDate):
-        RandomDate += OneDay
-
-        while RandomDate.weekday() > int(4):  # Mon-Fri are 0-4
-            RandomDate += OneDay
-
-        return RandomDate
+    def OnOrderEvent(self, orderEvent):
+        HoldingsIndex.OnOrderEvent(self, orderEvent)
+        self.Execution.OnOrderEvent(self, orderEvent)
 
     ##-----------------Handles margin call warnings---------------------------------------------------##
 
@@ -418,3 +418,9 @@ class AdvancedIndexing(QCAlgorithm):
                 or re.search("Order held while securities are located", message, re.IGNORECASE)):
             Global.NoSharesAvailable = True
             self.Log(f'No shares of UVXY available to short. Generating similar insight')
+
+    ##-----------------Logs the profiling totals of the run-------------------------------------------##
+
+    def OnEndOfAlgorithm(self):
+        LogSink.Flush(self)
+        Profiler.EndOfAlgorithm(self)